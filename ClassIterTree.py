@@ -1,8 +1,9 @@
 #-- CLASS PROGRAM TO ITERATE ON THE TREE
 
 import ast
-import csv
-import json
+import math
+import time
+from array import array
 import levels
 
 #-- Static type map to avoid eval() calls
@@ -42,23 +43,232 @@ TYPE_MAP = {
 REVERSE_TYPE_MAP = {v: k for k, v in TYPE_MAP.items()}
 
 
-class IterTree():
-    """ Class to iterate tree. """
+class StringTable():
+    """ Interned strings: each distinct value is stored once, rows keep codes. """
 
-    def __init__(self, tree, attrib, file, repo, abs_path=None, nodes=None):
+    __slots__ = ('codes', 'values')
+
+    def __init__(self):
+        """ Class constructor. """
+        self.codes = {}
+        self.values = []
+
+    def code(self, value):
+        """ Integer code of a value, added on first use. """
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+#-- Tables shared by every result of the process, for the values of a fixed
+#-- set (rule IDs and levels); classes may embed identifiers of the analyzed
+#-- code, so they are kept by each result and freed with it
+CLASS_ID_TABLE = StringTable()
+LEVEL_TABLE = StringTable()
+
+
+class FileResult():
+    """ Compact elements of one file: one header, the class of each element
+    and integer columns. """
+
+    __slots__ = ('repo', 'abs_path', 'name', 'classes', 'class_ids',
+                 'starts', 'ends', 'offsets', 'levels')
+
+    def __init__(self, repo, abs_path, name):
+        """ Class constructor. """
+        self.repo = repo
+        self.abs_path = abs_path
+        self.name = name
+        self.classes = []
+        self.class_ids = array('i')
+        self.starts = array('i')
+        self.ends = array('i')
+        self.offsets = array('i')
+        self.levels = array('i')
+
+    def __len__(self):
+        """ Number of elements. """
+        return len(self.levels)
+
+    def append(self, clase, class_id, start, end, offset, level):
+        """ Add one classified element. """
+        self.classes.append(clase)
+        self.class_ids.append(CLASS_ID_TABLE.code(class_id))
+        self.starts.append(start)
+        self.ends.append(end)
+        self.offsets.append(offset)
+        self.levels.append(LEVEL_TABLE.code(level))
+
+    def extend(self, other):
+        """ Add the elements of another result of the same file. """
+        for column in FileResult.__slots__[3:]:
+            getattr(self, column).extend(getattr(other, column))
+
+    def level_Names(self):
+        """ Level of each element. """
+        values = LEVEL_TABLE.values
+        return [values[code] for code in self.levels]
+
+    def csv_Rows(self):
+        """ Elements in the data.csv layout. """
+        class_ids = CLASS_ID_TABLE.values
+        level_values = LEVEL_TABLE.values
+        categories = levels.get_Categories()
+        rows = []
+        for i in range(len(self.levels)):
+            class_id = class_ids[self.class_ids[i]]
+            rows.append([self.repo, self.abs_path, self.name,
+                         self.classes[i], self.starts[i], self.ends[i],
+                         self.offsets[i], level_values[self.levels[i]],
+                         class_id, categories.get(class_id, 'Other')])
+        return rows
+
+    def json_Elements(self):
+        """ Elements in the data.json layout. """
+        return [{'Class'       : row[3],
+                 'Start Line'  : str(row[4]),
+                 'End Line'    : str(row[5]),
+                 'Displacement': str(row[6]),
+                 'Level'       : row[7],
+                 'Class ID'    : row[8],
+                 'Category'    : row[9]} for row in self.csv_Rows()]
+
+    def add_Json(self, json_data):
+        """ Merge the elements into a data.json dictionary. """
+        if len(self):
+            json_data.setdefault(self.repo, {}).setdefault(
+                self.name, []).extend(self.json_Elements())
+
+
+#-- What to do with a file exceeding its budget
+SKIP = 'skip'
+SAMPLE = 'sample'
+DEGRADE = 'degrade'
+#-- Node types still classified in the degraded mode
+LITERAL_TYPES = (ast.List, ast.Tuple, ast.Dict)
+#-- Nodes classified between two checks of the time budget
+CLOCK_STRIDE = 256
+
+
+class Budget():
+    """ Per-file limits (None = no limit) and the policy beyond them. """
+
+    __slots__ = ('max_bytes', 'max_nodes', 'max_seconds', 'policy')
+
+    def __init__(self, max_bytes=None, max_nodes=None, max_seconds=None,
+                 policy=SKIP):
+        """ Class constructor. """
+        self.max_bytes = max_bytes
+        self.max_nodes = max_nodes
+        self.max_seconds = max_seconds
+        self.policy = policy
+
+
+class FileAnalyzer():
+    """ Classify every analyzed node of one file into a single result. """
+
+    __slots__ = ('tree', 'name', 'repo', 'abs_path', 'node', 'level', 'clase',
+                 'class_id', 'result', 'limit')
+
+    def __init__(self, tree, file, repo, abs_path=None):
         """ Class constructor. """
         self.tree = tree
-        self.attrib = attrib
         self.name = file
         self.repo = repo
         self.abs_path = abs_path if abs_path else repo
-        
-        # Instance level storage instead of global/class level
-        self.csv_rows = []
-        self.json_data = {}
-        
+        self.result = FileResult(self.repo, self.abs_path, self.name)
+        #-- Exceeded limit: (limit, measured value, action taken) or None
+        self.limit = None
+
+    def analyze(self, budget=None, start=None):
+        """ Walk the tree once and classify the nodes, grouped by type. """
+        max_nodes = budget.max_nodes if budget else None
+        #-- Elements are grouped in TYPE_MAP order, the order of the outputs
+        buckets = {node_type: [] for node_type in TYPE_MAP.values()}
+        count = 0
+        #-- ast.walk is iterative: deep trees cannot exceed the recursion limit
+        nodes = ast.walk(self.tree)
+        for node in nodes:
+            count += 1
+            bucket = buckets.get(type(node))
+            if bucket is not None:
+                bucket.append(node)
+            if (max_nodes is not None and count > max_nodes
+                    and budget.policy == SKIP):
+                #-- Nothing is classified, the rest is only counted
+                count += sum(1 for _ in nodes)
+                self.limit = ('nodes', count, 'skipped')
+                return self.result
+        if max_nodes is not None and count > max_nodes:
+            buckets = self.reduce_Nodes(buckets, budget.policy, max_nodes)
+            self.limit = ('nodes', count, 'sampled' if budget.policy == SAMPLE
+                          else 'degraded')
+        deadline = None
+        if budget and budget.max_seconds is not None:
+            deadline = (start or time.perf_counter()) + budget.max_seconds
+        for nodes in buckets.values():
+            if not self.classify(nodes, deadline):
+                self.over_Time(budget, start)
+                break
+        return self.result
+
+    def reduce_Nodes(self, buckets, policy, max_nodes):
+        """ Nodes kept for a file with too many nodes. """
+        if policy == DEGRADE:
+            #-- Only the cheap literal rules
+            return {node_type: buckets[node_type] for node_type in LITERAL_TYPES}
+        #-- A regular stride over every type keeps the mix of elements
+        total = sum(len(nodes) for nodes in buckets.values())
+        step = max(1, math.ceil(total / max_nodes))
+        return {node_type: nodes[::step] for node_type, nodes in buckets.items()}
+
+    def over_Time(self, budget, start):
+        """ Apply the policy to a file that used up its time budget. """
+        elapsed = time.perf_counter() - start if start else budget.max_seconds
+        if budget.policy == SKIP:
+            self.result = FileResult(self.repo, self.abs_path, self.name)
+            self.limit = ('seconds', elapsed, 'skipped')
+        else:
+            #-- The elements classified so far are kept
+            self.limit = ('seconds', elapsed, 'truncated')
+
+    def classify(self, nodes, deadline=None):
+        """ Assign a level to each node; False if the deadline passed. """
+        result = self.result
+        for i, node in enumerate(nodes):
+            if (deadline is not None and not i % CLOCK_STRIDE
+                    and time.perf_counter() > deadline):
+                return False
+            self.node = node
+            self.level = ''
+            self.clase = ''
+            self.class_id = ''
+            levels.levels(self)
+            if (self.clase != '') and (self.level != ''):
+                result.append(str(self.clase), self.class_id, node.lineno,
+                              node.end_lineno, node.col_offset, str(self.level))
+        return True
+
+    def get_results(self):
+        """ Return collected data in the data.csv and data.json layouts """
+        json_data = {}
+        self.result.add_Json(json_data)
+        return self.result.csv_Rows(), json_data
+
+
+class IterTree(FileAnalyzer):
+    """ Legacy analyzer of a single attribute type. """
+
+    __slots__ = ('attrib',)
+
+    def __init__(self, tree, attrib, file, repo, abs_path=None, nodes=None):
+        """ Class constructor. """
+        FileAnalyzer.__init__(self, tree, file, repo, abs_path)
+        self.attrib = attrib
         if nodes is not None:
-            self._process_nodes(nodes)
+            self.classify(nodes)
         else:
             self.locate_Tree()
 
@@ -67,48 +277,5 @@ class IterTree():
         target_type = TYPE_MAP.get(self.attrib)
         if target_type is None:
             return
-        for self.node in ast.walk(self.tree):
-            #-- Find attributes using direct type comparison
-            if type(self.node) is target_type:
-                self._process_single_node()
-
-    def _process_nodes(self, nodes):
-        """ Process pre-collected nodes (single-pass mode). """
-        for self.node in nodes:
-            self._process_single_node()
-
-    def _process_single_node(self):
-        """ Process a single matching node. """
-        self.level = ''
-        self.clase = ''
-        levels.levels(self)
-        self.assign_List()
-        self.assign_Dict()
-
-    def assign_List(self):
-        """ Create object list. """
-        if (self.clase != '') and (self.level != ''):
-            self.list = [self.repo, self.abs_path, self.name, self.clase, self.node.lineno,
-                        self.node.end_lineno, self.node.col_offset, self.level]
-            # Accumulate instead of writing immediately
-            self.csv_rows.append(self.list)
-
-    def assign_Dict(self):
-        """ Create object dictionary. """
-        if (self.clase != '') and (self.level != ''):
-            if not self.repo in self.json_data:
-                self.json_data[self.repo] = {}
-
-            if not self.name in self.json_data[self.repo]:
-                self.json_data[self.repo][self.name] = []
-
-            self.json_data[self.repo][self.name].append({
-                'Class'       : str(self.clase),
-                'Start Line'  : str(self.node.lineno),
-                'End Line'    : str(self.node.end_lineno),
-                'Displacement': str(self.node.col_offset),
-                'Level'       : str(self.level)})
-
-    def get_results(self):
-        """ Return collected data """
-        return self.csv_rows, self.json_data
+        self.classify([node for node in ast.walk(self.tree)
+                       if type(node) is target_type])
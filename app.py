@@ -1,6 +1,4 @@
 import streamlit as st
-import subprocess
-import sys
 import os
 import json
 import pandas as pd
@@ -10,6 +8,11 @@ import plotly.express as px
 import psutil
 import time
 import re
+import queue
+import threading
+import dirtree
+import events
+import pycerfl
 
 st.set_page_config(page_title="PyCEFRL - Python Code Level Analyzer", layout="wide")
 
@@ -28,6 +31,9 @@ gpu_metric = st.empty()
 with st.sidebar:
     st.header("Settings")
     mode = st.selectbox("Select Analysis Mode", ["Directory", "Single File", "GitHub Repository", "GitHub User"])
+    #-- 0 = no deadline; otherwise partial results are shown on time
+    time_limit = st.number_input("Time limit (seconds, 0 = none)", min_value=0,
+                                 value=0, step=10)
     
     st.divider()
     # Button to clear data
@@ -47,6 +53,7 @@ with st.sidebar:
                     fpath = os.path.join(data_csv_dir, fname)
                     if os.path.isfile(fpath):
                         os.remove(fpath)
+            st.session_state['show_results'] = False
             st.success("Data cleared.")
         except Exception as e:
             st.error(f"Error clearing data: {e}")
@@ -68,85 +75,359 @@ st.markdown("""
 This tool analyzes the level of Python code inspired by the CEFR (Common European Framework of Reference for Languages).
 """)
 
-# Ensure dict.py has been run
-if not os.path.exists('dicc.txt'):
-    with st.spinner('Generating level dictionary...'):
-        subprocess.run([sys.executable, 'dict.py'], check=True)
-    st.success('Level dictionary generated!')
+#-- Seconds between two redraws of the progress widgets
+REFRESH_INTERVAL = 0.25
+
+
+def format_event(event):
+    """ Human readable log line for a progress event. """
+    kind = event['event']
+    if kind == events.DISCOVERED:
+        return f"📊 Found {event['total']} Python file(s) to analyze"
+    if kind == events.FILE_DONE and event.get('skipped'):
+        return f"⏱ {event['file']}: skipped, over its budget"
+    if kind == events.FILE_DONE:
+        return (f"✓ {event['file']}: {event['elements']} element(s) "
+                f"in {event['duration'] * 1000:.1f} ms")
+    if kind == events.ERROR:
+        return f"✗ {event.get('path', '')}: {event['message']}"
+    if kind == events.SUMMARY:
+        return event['result']
+    return str(event)
+
 
 def run_analysis(mode_arg, value_arg):
-    cmd = [sys.executable, '-u', 'pycerfl.py', mode_arg, value_arg]
-    
     st.write(f"🚀 Starting analysis on {value_arg}...")
     
     # Create containers for different parts
     progress_bar = st.progress(0)
     status_text = st.empty()
     log_container = st.sidebar.expander("Real-time Analysis Logs", expanded=True)
+    with log_container:
+        log_tail = st.empty()
     
     logs = []
     total_files = 0
     processed_files = 0
-    
-    process = subprocess.Popen(
-        cmd, 
-        stdout=subprocess.PIPE, 
-        stderr=subprocess.STDOUT, 
-        text=True, 
-        bufsize=1, 
-        universal_newlines=True
-    )
-    
-    # Read output line by line
+    failure = []
+    deadline = []
+    # Files that could not be analyzed; the run itself goes on
+    errors = []
+
+    # The analysis runs in a worker thread and reports through a queue;
+    # only this thread touches Streamlit widgets.
+    event_queue = queue.Queue()
+
+    def worker():
+        # Subscribed by analyze once it holds the lock: the events of a run
+        # of another session never reach this queue
+        try:
+            pycerfl.analyze(mode_arg, value_arg, quiet_mode=True,
+                            deadline=time_limit or None,
+                            listener=event_queue.put)
+        except BaseException as e:
+            failure.append(e)
+            event_queue.put({'event': events.ERROR, 'message': str(e)})
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+
     while True:
-        line = process.stdout.readline()
-        if not line and process.poll() is not None:
-            break
-        if line:
-            logs.append(line)
-            
-            # Extract progress information from log lines
-            if 'Found' in line and 'Python file(s) to analyze' in line:
-                try:
-                    total_files = int(line.split('Found ')[1].split(' Python')[0])
-                except (ValueError, IndexError) as e:
-                    # Failed to parse file count - log for debugging but continue
-                    st.warning(f"Could not parse file count from: {line.strip()}")
-            
-            if 'Processing:' in line and processed_files < total_files:
+        finished = not thread.is_alive()
+        # Drain everything queued since the last redraw
+        while True:
+            try:
+                event = event_queue.get_nowait()
+            except queue.Empty:
+                break
+            logs.append(format_event(event))
+            if event['event'] == events.DISCOVERED:
+                total_files = event['total']
+            elif event['event'] == events.FILE_DONE:
                 processed_files += 1
-                if total_files > 0:
-                    progress = min(processed_files / total_files, 1.0)  # Cap at 100%
-                    progress_bar.progress(progress)
-                    status_text.text(f"Processing file {processed_files}/{total_files}...")
-            
-            # Update log display - show last 25 lines for "tail" effect
-            with log_container:
-                st.code(logs[-1] if logs else "")
-            
-            # Update system stats occasionally
-            if len(logs) % 5 == 0:  # Update every 5 lines to avoid too much overhead
-                c, r = get_system_stats()
-                cpu_metric.metric("CPU Usage", f"{c}%")
-                ram_metric.metric("RAM Usage", f"{r}%")
+            elif event['event'] == events.ERROR:
+                errors.append(event)
+            elif event['event'] == events.SUMMARY and event.get('deadline'):
+                deadline.append(event['deadline'])
+
+        if total_files > 0:
+            progress_bar.progress(min(processed_files / total_files, 1.0))
+            status_text.text(f"Processing file {processed_files}/{total_files}...")
+        log_tail.code("\n".join(logs[-25:]))
+        c, r = get_system_stats()
+        cpu_metric.metric("CPU Usage", f"{c}%")
+        ram_metric.metric("RAM Usage", f"{r}%")
 
-    if process.returncode != 0:
+        if finished:
+            break
+        thread.join(REFRESH_INTERVAL)
+
+    if failure:
         progress_bar.progress(0)
         status_text.text("❌ Analysis failed")
         st.error("Error during analysis:")
-        st.code("".join(logs)) # Show full logs on error
+        st.code("\n".join(logs)) # Show full logs on error
         return False
     
+    failed = "\n".join(f"{e.get('path', '')}: {e['message']}" for e in errors)
+    if errors and not processed_files:
+        progress_bar.progress(0)
+        status_text.text("❌ No file could be analyzed")
+        st.error(f"❌ {len(errors)} file(s) could not be analyzed:")
+        st.code(failed)
+        return False
+
     progress_bar.progress(1.0)
     status_text.text("✅ Analysis complete!")
     
     # Show full logs in an expander after completion
     with st.expander("View Complete Analysis Logs"):
-        st.code("".join(logs))
-        
-    st.success(f"✅ Analysis complete! Processed {processed_files} file(s).")
+        st.code("\n".join(logs))
+
+    if errors:
+        st.warning(f"⚠ {len(errors)} file(s) could not be analyzed; "
+                   f"{processed_files} file(s) were.")
+        st.code(failed)
+    partial = deadline and deadline[0]['partial']
+    if partial:
+        st.warning(f"⏰ Partial results: {deadline[0]['coverage']}% of the files "
+                   f"were analyzed within {deadline[0]['seconds']:g} s.")
+    if not errors and not partial:
+        st.success(f"✅ Analysis complete! Processed {processed_files} file(s).")
     return True
 
+#-- Files listed per page in the per-file picker
+FILES_PER_PAGE = 50
+#-- Default number of rows/elements drawn by the heatmap and treemap
+TOP_N = 30
+LEVEL_ORDER = ['A1', 'A2', 'B1', 'B2', 'C1', 'C2']
+LEVEL_COLORS = {
+    'A1': '#1f77b4', 'A2': '#2ca02c',
+    'B1': '#ff7f0e', 'B2': '#d62728',
+    'C1': '#9467bd', 'C2': '#8c564b'
+}
+
+
+# --- Cached loaders, keyed by file modification time ---
+@st.cache_data(show_spinner=False)
+def load_json(path, mtime):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+@st.cache_data(show_spinner=False)
+def load_elements(path, mtime):
+    df = pd.read_csv(path)
+    # Drop rows with missing Level to avoid Sankey errors
+    df = df.dropna(subset=['Level'])
+    if 'Category' in df.columns:
+        # Emitted by the analyzer from the rule table
+        df['Category'] = df['Category'].fillna('Other').astype('category')
+    elif 'Class' in df.columns:
+        # Older results: categorize each distinct class once and map
+        classes = df['Class'].astype('category')
+        mapping = {c: categorize_class(c) for c in classes.cat.categories}
+        df['Category'] = classes.map(mapping).astype('category')
+    return df
+
+
+def order_levels(table):
+    """ Columns of a level table in CEFR order. """
+    known = [level for level in LEVEL_ORDER if level in table.columns]
+    return table[known + [c for c in table.columns if c not in known]]
+
+
+def cap_rows(table, rank, top_n, other_label):
+    """ Keep the top_n rows by rank and sum the rest into one bucket. """
+    order = rank.sort_values(ascending=False, kind='stable').index
+    top = table.loc[order[:top_n]]
+    rest = table.loc[order[top_n:]]
+    if len(rest):
+        other = rest.sum().to_frame(other_label.format(len(rest))).T
+        top = pd.concat([top, other])
+    return top
+
+
+@st.cache_data(show_spinner=False)
+def heatmap_table(path, mtime, group_by, top_n):
+    """ Level counts per directory or file, capped to top_n rows. """
+    df = load_elements(path, mtime)
+    paths = df['Absolute Path'].astype(str).astype('category')
+    by_file = pd.crosstab(paths, df['Level'])
+    by_file.index = by_file.index.astype(str)
+    if group_by == "Directory":
+        table = by_file.groupby(by_file.index.map(os.path.dirname)).sum()
+        rank = table.sum(axis=1)
+        label = "Other ({} directories)"
+    else:
+        table = by_file
+        c_levels = [level for level in ('C1', 'C2') if level in table.columns]
+        rank = table[c_levels].sum(axis=1) if c_levels else table.sum(axis=1)
+        label = "Other ({} files)"
+    return order_levels(cap_rows(table, rank, top_n, label))
+
+
+@st.cache_data(show_spinner=False)
+def treemap_table(path, mtime, top_n):
+    """ Element counts per Level/Category, top_n elements each plus 'Other'. """
+    df = load_elements(path, mtime)
+    element = 'Class ID' if 'Class ID' in df.columns else 'Class'
+    counts = (df.groupby(['Level', 'Category', element], observed=True).size()
+              .reset_index(name='Count')
+              .rename(columns={element: 'Element'}))
+    counts['Category'] = counts['Category'].astype(str)
+    counts = counts.sort_values('Count', ascending=False, kind='stable')
+    rank = counts.groupby(['Level', 'Category']).cumcount()
+    rest = (counts[rank >= top_n].groupby(['Level', 'Category'])['Count'].sum()
+            .reset_index())
+    rest['Element'] = 'Other'
+    return pd.concat([counts[rank < top_n], rest], ignore_index=True)
+
+
+def cached_json(path):
+    """ Cached contents of a JSON file, or None if it does not exist. """
+    if not os.path.exists(path):
+        return None
+    return load_json(path, os.stat(path).st_mtime_ns)
+
+
+# --- Helper to categorize classes of results without a Category column ---
+def categorize_class(class_name):
+    class_name = str(class_name).lower()
+    if any(x in class_name for x in ['list', 'tuple', 'dict', 'set', 'array']):
+        return 'Data Structures'
+    elif any(x in class_name for x in ['if', 'else', 'loop', 'for', 'while', 'try', 'except', 'break', 'continue', 'pass']):
+        return 'Control Flow'
+    elif any(x in class_name for x in ['function', 'lambda', 'class', 'method', 'return', 'yield', 'super', 'decorator', 'init', 'self']):
+        return 'OOP & Functions'
+    elif any(x in class_name for x in ['print', 'file', 'open', 'read', 'write', 'input']):
+        return 'I/O'
+    elif any(x in class_name for x in ['import', 'from', 'module']):
+        return 'Modules'
+    elif any(x in class_name for x in ['assign', 'operator', 'compare', 'binop']):
+        return 'Operations'
+    else:
+        return 'Other'
+
+
+def level_distribution_chart(df_file, title):
+    """ Bar chart of the levels of already loaded element rows. """
+    level_dist = df_file['Level'].value_counts().reset_index()
+    level_dist.columns = ['Level', 'Count']
+    level_dist['Level'] = pd.Categorical(level_dist['Level'], categories=LEVEL_ORDER, ordered=True)
+    level_dist = level_dist.sort_values('Level')
+    fig_bar = px.bar(
+        level_dist,
+        x='Level',
+        y='Count',
+        color='Level',
+        color_discrete_map=LEVEL_COLORS,
+        title=title
+    )
+    fig_bar.update_layout(showlegend=False, height=300)
+    return fig_bar
+
+
+def display_file_picker(df_csv):
+    """ Searchable, paginated file picker showing one file on demand. """
+    st.subheader("Per-File Element Details")
+    files = sorted(df_csv['Absolute Path'].astype(str).unique())
+    query = st.text_input("Search files", key="file_search", placeholder="part of a path")
+    if query:
+        files = [f for f in files if query.lower() in f.lower()]
+    if not files:
+        st.info("No file matches the search.")
+        return
+
+    num_pages = (len(files) - 1) // FILES_PER_PAGE + 1
+    page = st.number_input(f"Page (of {num_pages})", min_value=1, max_value=num_pages,
+                           value=1, step=1, key="file_page")
+    page_files = files[(page - 1) * FILES_PER_PAGE:page * FILES_PER_PAGE]
+    st.caption(f"{len(files)} file(s)")
+    selected = st.selectbox("File", page_files, key="file_selected")
+    if not selected:
+        return
+
+    df_file = df_csv[df_csv['Absolute Path'].astype(str) == selected]
+    st.dataframe(df_file, use_container_width=True)
+    if 'Level' in df_file.columns and not df_file.empty:
+        st.plotly_chart(
+            level_distribution_chart(df_file, f"Level Distribution for {os.path.basename(selected)}"),
+            use_container_width=True)
+
+
+def open_tree_node(node_id):
+    """ Show another directory of the drill-down. """
+    st.session_state['tree_node'] = node_id
+    st.session_state['tree_open'] = None
+
+
+def open_selected_node():
+    """ Show the subdirectory picked in the drill-down. """
+    if st.session_state.get('tree_open') is not None:
+        open_tree_node(st.session_state['tree_open'])
+
+
+def display_tree():
+    """ Directory drill-down over the rollups written by the analyzer. """
+    tree = cached_json(os.path.join('DATA_JSON', dirtree.TREE_FILE))
+    if tree is None or tree.get('version') != dirtree.VERSION:
+        return
+    nodes = tree['nodes']
+    st.subheader("Directory Drill-down")
+    node_id = st.session_state.get('tree_node', 0)
+    if not 0 <= node_id < len(nodes):
+        node_id = 0
+    node = nodes[node_id]
+
+    # Breadcrumb from the root to the open directory
+    trail = [node_id]
+    while nodes[trail[-1]]['parent'] is not None:
+        trail.append(nodes[trail[-1]]['parent'])
+    crumbs = st.columns(len(trail))
+    for col, crumb in zip(crumbs, reversed(trail)):
+        with col:
+            st.button(nodes[crumb]['name'], key=f"tree_crumb_{crumb}",
+                      disabled=crumb == node_id, on_click=open_tree_node,
+                      args=(crumb,))
+
+    st.caption(f"{node['path']}: {node['files']} file(s)")
+    levels = {level: node['Levels'].get(level, 0) for level in tree['levels']}
+    cols = st.columns(max(len(levels), 1))
+    for i, (level, count) in enumerate(levels.items()):
+        with cols[i]:
+            st.metric(label=f"Level {level}", value=count)
+
+    # One row per subdirectory, read from its stored rollup
+    children = node['children']
+    if children:
+        table = pd.DataFrame({'Directory': [nodes[c]['name'] for c in children],
+                              'Files': [nodes[c]['files'] for c in children]})
+        levels_table = pd.DataFrame([nodes[c]['Levels'] for c in children])
+        table = pd.concat([table, order_levels(levels_table.fillna(0))], axis=1)
+        st.dataframe(table, hide_index=True)
+        names = {child: nodes[child]['name'] for child in children}
+        st.selectbox("Open subdirectory", [None] + children,
+                     format_func=lambda child: "" if child is None
+                     else names[child],
+                     key="tree_open", on_change=open_selected_node)
+
+    # Files directly in the directory, from the prefix sums of the levels
+    files = [(i, path) for i, (path, owner)
+             in enumerate(tree['files'][node['first']:node['last']],
+                          node['first'])
+             if owner == node_id]
+    if files:
+        shown = files[:FILES_PER_PAGE]
+        table = pd.DataFrame({'File': [os.path.basename(p) for _, p in shown]})
+        levels_table = pd.DataFrame([dirtree.range_Levels(tree, i, i + 1)
+                                     for i, _ in shown])
+        table = pd.concat([table, order_levels(levels_table.fillna(0))], axis=1)
+        st.dataframe(table, hide_index=True)
+        if len(files) > FILES_PER_PAGE:
+            st.caption(f"First {FILES_PER_PAGE} of {len(files)} files")
+
+
 def display_results():
     # Check if results exist
     if not os.path.exists('data.json'):
@@ -154,10 +435,8 @@ def display_results():
         return
 
     # Load summary data
-    if os.path.exists('DATA_JSON/summary_data.json'):
-        with open('DATA_JSON/summary_data.json', 'r') as f:
-            summary = json.load(f)
-        
+    summary = cached_json('DATA_JSON/summary_data.json')
+    if summary is not None:
         # Display overall levels
         if 'Levels' in summary:
             st.subheader("Level Distribution")
@@ -177,34 +456,13 @@ def display_results():
             # st.pyplot(fig)
 
     # Sankey Diagram
+    df_csv = None
     if os.path.exists('data.csv'):
         st.subheader("Visualizations")
         
         try:
-            df_csv = pd.read_csv('data.csv')
-            # Drop rows with missing Level to avoid Sankey errors
-            df_csv = df_csv.dropna(subset=['Level'])
-            
-            # --- Helper to categorize classes ---
-            def categorize_class(class_name):
-                class_name = str(class_name).lower()
-                if any(x in class_name for x in ['list', 'tuple', 'dict', 'set', 'array']):
-                    return 'Data Structures'
-                elif any(x in class_name for x in ['if', 'else', 'loop', 'for', 'while', 'try', 'except', 'break', 'continue', 'pass']):
-                    return 'Control Flow'
-                elif any(x in class_name for x in ['function', 'lambda', 'class', 'method', 'return', 'yield', 'super', 'decorator', 'init', 'self']):
-                    return 'OOP & Functions'
-                elif any(x in class_name for x in ['print', 'file', 'open', 'read', 'write', 'input']):
-                    return 'I/O'
-                elif any(x in class_name for x in ['import', 'from', 'module']):
-                    return 'Modules'
-                elif any(x in class_name for x in ['assign', 'operator', 'compare', 'binop']):
-                    return 'Operations'
-                else:
-                    return 'Other'
-
-            if 'Class' in df_csv.columns:
-                df_csv['Category'] = df_csv['Class'].apply(categorize_class)
+            data_mtime = os.stat('data.csv').st_mtime_ns
+            df_csv = load_elements('data.csv', data_mtime)
 
             # --- Tabs for different visualizations ---
             tab1, tab2, tab3 = st.tabs(["Bubble Chart", "File Heatmap", "Element Treemap"])
@@ -213,12 +471,9 @@ def display_results():
                 st.write("Bubble Chart: Category vs Level (Size represents frequency)")
                 if 'Category' in df_csv.columns and 'Level' in df_csv.columns:
                     # Group by Category and Level
-                    bubble_data = df_csv.groupby(['Category', 'Level']).size().reset_index(name='Count')
+                    bubble_data = df_csv.groupby(['Category', 'Level'], observed=True).size().reset_index(name='Count')
                     
                     if not bubble_data.empty:
-                        # Define standard level order
-                        level_order = ['A1', 'A2', 'B1', 'B2', 'C1', 'C2']
-                        
                         fig_bubble = go.Figure(data=go.Scatter(
                             x=bubble_data['Category'],
                             y=bubble_data['Level'],
@@ -243,7 +498,7 @@ def display_results():
                             yaxis=dict(
                                 title='Level',
                                 categoryorder='array',
-                                categoryarray=level_order
+                                categoryarray=LEVEL_ORDER
                             ),
                             height=600,
                             margin=dict(l=50, r=50, t=50, b=50)
@@ -254,10 +509,18 @@ def display_results():
                         st.info("No data available for bubble chart.")
 
             with tab2:
-                st.write("Heatmap of File vs Level Count")
-                if 'File Name' in df_csv.columns and 'Level' in df_csv.columns:
-                    # Create pivot table: Rows=File, Cols=Level, Values=Count
-                    df_pivot = df_csv.pivot_table(index='File Name', columns='Level', aggfunc='size', fill_value=0)
+                if 'Absolute Path' in df_csv.columns and 'Level' in df_csv.columns:
+                    col_group, col_top = st.columns(2)
+                    with col_group:
+                        group_by = st.radio("Rows", ["Directory", "File"], horizontal=True, key="heat_group")
+                    with col_top:
+                        top_n = st.slider("Rows shown", 5, 100, TOP_N, key="heat_top")
+                    if group_by == "File":
+                        st.write(f"Heatmap of the top {top_n} files by C-level count vs Level Count")
+                    else:
+                        st.write(f"Heatmap of the top {top_n} directories vs Level Count")
+                    # Aggregated on the server: at most top_n + 1 rows reach the browser
+                    df_pivot = heatmap_table('data.csv', data_mtime, group_by, top_n)
                     
                     fig_heat = go.Figure(data=go.Heatmap(
                         z=df_pivot.values,
@@ -271,18 +534,15 @@ def display_results():
             with tab3:
                 st.write("Treemap: Drill down into specific elements (Level -> Category -> Element)")
                 if 'Category' in df_csv.columns and 'Level' in df_csv.columns and 'Class' in df_csv.columns:
-                    # Clean up 'Class' column (optional, but good for visualization)
-                    # We use the full class name for now as it contains specific details
+                    # Element counts per Level/Category, the smallest grouped into 'Other'
+                    df_tree = treemap_table('data.csv', data_mtime, TOP_N)
                     
                     fig_treemap = px.treemap(
-                        df_csv, 
-                        path=['Level', 'Category', 'Class'], 
+                        df_tree, 
+                        path=['Level', 'Category', 'Element'], 
+                        values='Count',
                         color='Level',
-                        color_discrete_map={
-                            'A1': '#1f77b4', 'A2': '#2ca02c', 
-                            'B1': '#ff7f0e', 'B2': '#d62728', 
-                            'C1': '#9467bd', 'C2': '#8c564b'
-                        }
+                        color_discrete_map=LEVEL_COLORS
                     )
                     fig_treemap.update_layout(height=600)
                     st.plotly_chart(fig_treemap, use_container_width=True)
@@ -291,10 +551,8 @@ def display_results():
             st.error(f"Could not generate visualizations: {e}")
 
     # Load file-specific data and generate proficiency report
-    if os.path.exists('DATA_JSON/total_data.json'):
-        with open('DATA_JSON/total_data.json', 'r') as f:
-            total_data = json.load(f)
-        
+    total_data = cached_json('DATA_JSON/total_data.json')
+    if total_data is not None:
         st.subheader("Detailed File Analysis")
 
         # Convert to DataFrame for display
@@ -324,43 +582,12 @@ def display_results():
             report_df = pd.DataFrame(list(level_counts.items()), columns=["Level", "Count"]).sort_values("Level")
             st.table(report_df)
 
-    # Per-file CSV details from DATA_CSV folder
-    data_csv_dir = 'DATA_CSV'
-    if os.path.isdir(data_csv_dir):
-        csv_files = [f for f in os.listdir(data_csv_dir) if f.endswith('.csv')]
-        if csv_files:
-            st.subheader("Per-File Element Details")
-            for csv_file in sorted(csv_files):
-                csv_path = os.path.join(data_csv_dir, csv_file)
-                try:
-                    df_file = pd.read_csv(csv_path)
-                    with st.expander(f"📄 {csv_file}", expanded=False):
-                        st.dataframe(df_file, use_container_width=True)
-                        
-                        # Show level distribution chart for this file
-                        if 'Level' in df_file.columns:
-                            level_dist = df_file['Level'].value_counts().reset_index()
-                            level_dist.columns = ['Level', 'Count']
-                            level_order = ['A1', 'A2', 'B1', 'B2', 'C1', 'C2']
-                            level_dist['Level'] = pd.Categorical(level_dist['Level'], categories=level_order, ordered=True)
-                            level_dist = level_dist.sort_values('Level')
-                            
-                            fig_bar = px.bar(
-                                level_dist,
-                                x='Level',
-                                y='Count',
-                                color='Level',
-                                color_discrete_map={
-                                    'A1': '#1f77b4', 'A2': '#2ca02c',
-                                    'B1': '#ff7f0e', 'B2': '#d62728',
-                                    'C1': '#9467bd', 'C2': '#8c564b'
-                                },
-                                title=f"Level Distribution for {csv_file}"
-                            )
-                            fig_bar.update_layout(showlegend=False, height=300)
-                            st.plotly_chart(fig_bar, use_container_width=True)
-                except Exception as e:
-                    st.warning(f"Could not load {csv_file}: {e}")
+    # Level totals of any directory of the tree, computed by the analyzer
+    display_tree()
+
+    # Per-file element details, taken from the already loaded data.csv
+    if df_csv is not None and 'Absolute Path' in df_csv.columns:
+        display_file_picker(df_csv)
 
     # Download buttons
 
@@ -389,8 +616,7 @@ if mode == "Directory":
         
     if st.button("Analyze Directory", type="primary"):
         if path and os.path.exists(path):
-            if run_analysis("directory", path):
-                display_results()
+            st.session_state['show_results'] = run_analysis("directory", path)
         else:
             st.error("Please enter a valid directory path")
 
@@ -409,8 +635,7 @@ elif mode == "Single File":
     
     if st.button("Analyze File", type="primary"):
         if file_path and os.path.exists(file_path) and file_path.endswith('.py'):
-            if run_analysis("file", file_path):
-                display_results()
+            st.session_state['show_results'] = run_analysis("file", file_path)
         elif file_path and not file_path.endswith('.py'):
             st.error("Please enter a Python file (.py)")
         else:
@@ -440,8 +665,7 @@ elif mode == "GitHub Repository":
     
     if st.button("Analyze Repository", type="primary"):
         if url and is_valid and clone_url:
-            if run_analysis("repo-url", clone_url):
-                display_results()
+            st.session_state['show_results'] = run_analysis("repo-url", clone_url)
         elif url:
             st.error("Please enter a valid GitHub repository URL")
         else:
@@ -455,7 +679,10 @@ elif mode == "GitHub User":
     
     if st.button("Analyze User", type="primary"):
         if user:
-            if run_analysis("user", user):
-                display_results()
+            st.session_state['show_results'] = run_analysis("user", user)
         else:
             st.warning("Please enter a username")
+
+# Results stay visible while the file picker and other widgets rerun the page
+if st.session_state.get('show_results'):
+    display_results()
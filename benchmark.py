@@ -0,0 +1,335 @@
+#-- BENCHMARK OF THE ANALYZER ON A SYNTHETIC CORPUS
+
+import argparse
+import ast
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+import levels
+import pycerfl
+
+#-- Stored reference results, compared with every run
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'benchmark_baseline.json')
+#-- Allowed relative regression before a run fails
+THRESHOLD = 0.25
+#-- A run this many times better than the baseline means it is stale
+STALE_FACTOR = 2.0
+#-- Metrics where a higher value is better; for the others lower is better
+HIGHER_IS_BETTER = ('files_per_s', 'nodes_per_s')
+
+#-- Default corpus: number of files and weight of each construct
+DEFAULT_FILES = 20
+DEFAULT_MIX = {'plain': 4, 'nesting': 2, 'literals': 1, 'classes': 2}
+
+
+#-- CORPUS GENERATOR
+
+def gen_Plain(rand, n):
+    """ Everyday code: functions, loops, calls and comprehensions. """
+    lines = ['import os', 'from collections import defaultdict', '']
+    for i in range(n):
+        lines += [f'def func_{i}(items, limit={rand.randint(1, 9)}):',
+                  '    total = 0',
+                  '    for item in items:',
+                  '        if item > limit:',
+                  '            total += item',
+                  '        else:',
+                  '            continue',
+                  f'    squares = [x * x for x in range({rand.randint(2, 50)})]',
+                  '    with open(os.devnull) as fp:',
+                  '        fp.read()',
+                  '    return total, squares',
+                  '']
+    return lines
+
+
+def gen_Nesting(rand, n):
+    """ Deeply nested blocks, functions and comprehensions. """
+    lines = []
+    for i in range(n):
+        depth = rand.randint(4, 12)
+        lines.append(f'def nested_{i}(data):')
+        indent = '    '
+        for d in range(depth):
+            kind = rand.choice(('if', 'for', 'while', 'try', 'def'))
+            if kind == 'if':
+                lines.append(f'{indent}if data > {d}:')
+            elif kind == 'for':
+                lines.append(f'{indent}for v{d} in range({d + 1}):')
+            elif kind == 'while':
+                lines.append(f'{indent}while data < {d}:')
+            elif kind == 'def':
+                lines.append(f'{indent}def inner_{d}(x=lambda y: y):')
+            else:
+                lines += [f'{indent}try:', f'{indent}    data += {d}',
+                          f'{indent}except ValueError:', f'{indent}    pass',
+                          f'{indent}if data:']
+            indent += '    '
+        lines += [f'{indent}data = [[v for v in range(3)] for _ in range(2)]',
+                  f'{indent}return data', '']
+    return lines
+
+
+def gen_Literals(rand, n):
+    """ Huge list, tuple and dictionary literals. """
+    lines = []
+    for i in range(n):
+        size = rand.randint(50, 300)
+        numbers = ', '.join(str(rand.randint(0, 999)) for _ in range(size))
+        pairs = ', '.join(f"'k{j}': ({j}, [{j}])" for j in range(size // 4))
+        lines += [f'TABLE_{i} = [{numbers}]',
+                  f'PAIRS_{i} = ({numbers},)',
+                  f'MAP_{i} = {{{pairs}}}', '']
+    return lines
+
+
+def gen_Classes(rand, n):
+    """ Many classes with inheritance, decorators and special methods. """
+    lines = []
+    for i in range(n):
+        base = f'Model_{i - 1}' if i and rand.random() < 0.5 else 'object'
+        lines += [f'class Model_{i}({base}):',
+                  f'    """ Model {i}. """',
+                  '    __slots__ = ("value",)',
+                  '',
+                  '    def __init__(self, value):',
+                  '        self.value = value',
+                  '',
+                  '    @property',
+                  '    def double(self):',
+                  '        return self.value * 2',
+                  '',
+                  '    @staticmethod',
+                  '    def build(*args, **kwargs):',
+                  '        return args, kwargs',
+                  '',
+                  '    def __iter__(self):',
+                  '        yield self.value',
+                  '']
+    return lines
+
+
+GENERATORS = {'plain': gen_Plain, 'nesting': gen_Nesting,
+              'literals': gen_Literals, 'classes': gen_Classes}
+
+
+def generate_Corpus(directory, files=DEFAULT_FILES, seed=0, mix=None):
+    """ Write a deterministic corpus of .py files and return their paths. """
+    mix = mix or DEFAULT_MIX
+    rand = random.Random(seed)
+    kinds = sorted(mix)
+    weights = [mix[kind] for kind in kinds]
+    paths = []
+    for i in range(files):
+        #-- A few subpackages, as in a real repository
+        folder = os.path.join(directory, f'pkg_{i % 4}')
+        os.makedirs(folder, exist_ok=True)
+        kind = rand.choices(kinds, weights)[0]
+        lines = GENERATORS[kind](rand, rand.randint(5, 25))
+        path = os.path.join(folder, f'{kind}_{i}.py')
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        paths.append(path)
+    return paths
+
+
+def count_Nodes(paths):
+    """ Number of AST nodes of the corpus. """
+    total = 0
+    for path in paths:
+        with open(path) as f:
+            total += sum(1 for _ in ast.walk(ast.parse(f.read())))
+    return total
+
+
+#-- MEASUREMENTS
+
+def peak_Rss():
+    """ Peak resident memory of the process, in KiB (None if unknown). """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    #-- macOS reports bytes, Linux KiB
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def cpu_Name():
+    """ Model of the processor, as precise as the system tells. """
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def environment():
+    """ Interpreter and machine the metrics are measured on. """
+    return {'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'system': platform.system(), 'machine': platform.machine(),
+            'cpu': cpu_Name(), 'cpus': os.cpu_count()}
+
+
+def run_Analysis(corpus):
+    """ Analyze the corpus in a scratch directory; return seconds taken. """
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as out:
+        os.chdir(out)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                pycerfl.analyze('directory', corpus, quiet_mode=True)
+                return time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+
+
+#-- Functions timed by the stage run: (label, module, attribute)
+STAGES = [('read_File', pycerfl, 'read_File'),
+          ('iterate_List', pycerfl, 'iterate_List'),
+          ('levels.levels', levels, 'levels'),
+          ('save_collected_data', pycerfl, 'save_collected_data'),
+          ('read_Json', pycerfl, 'read_Json'),
+          ('read_FileCsv', pycerfl, 'read_FileCsv')]
+
+
+def timed(function, totals, label):
+    """ Wrap a function to add its run time to totals[label]. """
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            totals[label] = totals.get(label, 0.0) + time.perf_counter() - start
+    return wrapper
+
+
+def stage_Times(corpus):
+    """ Inclusive time spent in each stage during one analysis. """
+    totals = {label: 0.0 for label, _, _ in STAGES}
+    originals = [(module, name, getattr(module, name))
+                 for _, module, name in STAGES]
+    for (label, module, name), (_, _, function) in zip(STAGES, originals):
+        setattr(module, name, timed(function, totals, label))
+    try:
+        run_Analysis(corpus)
+    finally:
+        for module, name, function in originals:
+            setattr(module, name, function)
+    return totals
+
+
+def run_Benchmark(files=DEFAULT_FILES, seed=0, mix=None, repeat=3):
+    """ Generate a corpus, analyze it and return the measured metrics. """
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = os.path.join(tmp, 'corpus')
+        paths = generate_Corpus(corpus, files, seed, mix)
+        nodes = count_Nodes(paths)
+        #-- Warm up the rule table and the caches of the first run
+        run_Analysis(corpus)
+        best = min(run_Analysis(corpus) for _ in range(repeat))
+        stages = stage_Times(corpus)
+    return {'corpus': {'files': files, 'seed': seed, 'mix': mix or DEFAULT_MIX,
+                       'nodes': nodes},
+            'environment': environment(),
+            'seconds': round(best, 4),
+            'files_per_s': round(files / best, 1),
+            'nodes_per_s': round(nodes / best, 1),
+            'peak_rss_kib': peak_Rss(),
+            'stages': {label: round(value, 4)
+                       for label, value in stages.items()}}
+
+
+def compare_Baseline(metrics, baseline, threshold=THRESHOLD,
+                     stale=STALE_FACTOR):
+    """ Regressions of the metrics against the baseline, and metrics so
+    much better that the baseline no longer gates anything, as messages. """
+    if baseline.get('corpus') != metrics['corpus']:
+        return ['baseline was measured on a different corpus']
+    #-- Raw timings of another interpreter or machine say nothing
+    old, new = baseline.get('environment') or {}, metrics.get('environment') or {}
+    changed = sorted(key for key in set(old) | set(new)
+                     if old.get(key) != new.get(key))
+    if changed:
+        return ['baseline was measured in a different environment ('
+                + ', '.join(f'{key}: {old.get(key)} -> {new.get(key)}'
+                            for key in changed)
+                + '); run with --update-baseline on this machine']
+    regressions = []
+    for key in ('files_per_s', 'nodes_per_s', 'peak_rss_kib'):
+        old, new = baseline.get(key), metrics.get(key)
+        if not old or new is None:
+            continue
+        #-- Ratio above 1 when the run is better than the baseline
+        better = new / old if key in HIGHER_IS_BETTER else old / max(new, 1e-9)
+        if better < 1 - threshold:
+            regressions.append(f'{key}: {new} (baseline {old})')
+        elif better > stale:
+            regressions.append(f'{key}: {new} is {better:.1f}x better than '
+                               f'the baseline {old}; refresh it with '
+                               f'--update-baseline')
+    return regressions
+
+
+def parse_Mix(text):
+    """ Parse 'plain=4,classes=1' into a weight per construct. """
+    mix = {}
+    for item in text.split(','):
+        kind, _, weight = item.partition('=')
+        if kind not in GENERATORS:
+            raise argparse.ArgumentTypeError(f'unknown construct: {kind}')
+        mix[kind] = int(weight or 1)
+    return mix
+
+
+def parse_Arguments(argv):
+    """ Parse the command line. """
+    parser = argparse.ArgumentParser(description='PyCEFRL benchmark')
+    parser.add_argument('--files', type=int, default=DEFAULT_FILES,
+                        help='number of generated files')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the corpus generator')
+    parser.add_argument('--mix', type=parse_Mix, default=None,
+                        help="weight of each construct, e.g. "
+                             "'plain=4,nesting=2,literals=1,classes=2'")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='timed runs; the fastest one is reported')
+    parser.add_argument('--baseline', default=BASELINE_FILE,
+                        help='JSON file with the reference metrics')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='allowed relative regression (0.25 = 25%%)')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='store this run as the new baseline')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_Arguments(sys.argv[1:])
+    metrics = run_Benchmark(args.files, args.seed, args.mix, args.repeat)
+    print(json.dumps(metrics, indent=4))
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(metrics, f, indent=4)
+        print(f'Baseline saved to {args.baseline}')
+        sys.exit()
+    if not os.path.exists(args.baseline):
+        sys.exit(f'No baseline at {args.baseline}; run with --update-baseline')
+    with open(args.baseline) as f:
+        regressions = compare_Baseline(metrics, json.load(f), args.threshold)
+    if regressions:
+        print('BASELINE CHECK FAILED:\n  ' + '\n  '.join(regressions))
+        sys.exit(1)
+    print('No regression against the baseline')
@@ -0,0 +1,158 @@
+#-- CHECKPOINT JOURNAL OF COMPLETED FILES FOR RESUMABLE RUNS
+
+import json
+import os
+import time
+
+from ClassIterTree import FileResult, CLASS_ID_TABLE, LEVEL_TABLE
+
+#-- Journal written next to the outputs, removed when a run completes
+CHECKPOINT_FILE = 'pycefrl_checkpoint.ndjson'
+#-- The journal is synced to disk every N files or T seconds
+CHECKPOINT_FILES = 25
+CHECKPOINT_SECONDS = 10.0
+#-- Format of the journal lines
+VERSION = 2
+
+
+def file_Stamp(path):
+    """ Modification time and size of a file, None if it is gone. """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def dump_Record(result, stamp=None):
+    """ A file result as a JSON-serializable record. """
+    rows = zip(result.classes, result.class_ids, result.starts, result.ends,
+               result.offsets, result.levels)
+    return {'repo': result.repo, 'path': result.abs_path, 'name': result.name,
+            'stamp': stamp,
+            'rows': [[clase,
+                      CLASS_ID_TABLE.values[class_id], start, end, offset,
+                      LEVEL_TABLE.values[level]]
+                     for clase, class_id, start, end, offset, level in rows]}
+
+
+def load_Record(record):
+    """ Rebuild a file result from its record. """
+    result = FileResult(record['repo'], record['path'], record['name'])
+    for row in record['rows']:
+        result.append(*row)
+    return result
+
+
+class Checkpoint():
+    """ Append-only journal of the files completed by a run. """
+
+    def __init__(self, mode, target, path=CHECKPOINT_FILE):
+        """ Class constructor. """
+        self.path = path
+        self.header = {'version': VERSION, 'mode': mode, 'target': target}
+        self.file = None
+        self.pending = 0
+        self.last_sync = time.monotonic()
+        self.files = 0
+        self.levels = {}
+        #-- Stamp of each file when it was analyzed
+        self.stamps = {}
+        #-- Limit records of the files skipped by their budget
+        self.skipped = []
+
+    def load(self):
+        """ Results completed by an interrupted run of the same target;
+        files changed since then are left out to be analyzed again. """
+        results = []
+        if not os.path.exists(self.path):
+            return results
+        with open(self.path) as f:
+            lines = f.read().splitlines()
+        if not lines:
+            return results
+        try:
+            if json.loads(lines[0]) != self.header:
+                return results
+        except ValueError:
+            return results
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                #-- The last line may be cut by the crash
+                break
+            if 'skipped' in record:
+                path = record['skipped']['path']
+            elif 'rows' in record:
+                path = record['path']
+            else:
+                continue
+            stamp = file_Stamp(path)
+            if stamp is None or stamp != record.get('stamp'):
+                continue
+            self.stamps[path] = stamp
+            if 'skipped' in record:
+                self.skipped.append(record['skipped'])
+            else:
+                results.append(load_Record(record))
+        return results
+
+    def start(self, results=()):
+        """ Start a new journal holding the given completed results. """
+        self.file = open(self.path, 'w')
+        self.file.write(json.dumps(self.header) + '\n')
+        for result in results:
+            self.add(result)
+        for limit in self.skipped:
+            self.add_Skipped(limit)
+        self.sync()
+
+    def add(self, result, stamp=None):
+        """ Record a completed file, stamped as it was read; sync
+        periodically. """
+        if self.file is None:
+            return
+        if stamp is None:
+            stamp = self.stamps.get(result.abs_path)
+        self.file.write(json.dumps(dump_Record(result, stamp)) + '\n')
+        for level in result.level_Names():
+            self.levels[level] = self.levels.get(level, 0) + 1
+        self.completed()
+
+    def add_Skipped(self, limit, stamp=None):
+        """ Record a file skipped by its budget, with its limit record. """
+        if self.file is None:
+            return
+        if stamp is None:
+            stamp = self.stamps.get(limit['path'])
+        self.file.write(json.dumps({'skipped': limit, 'stamp': stamp}) + '\n')
+        self.completed()
+
+    def completed(self):
+        """ Count a journaled file; sync periodically. """
+        self.files += 1
+        self.pending += 1
+        if (self.pending >= CHECKPOINT_FILES
+                or time.monotonic() - self.last_sync >= CHECKPOINT_SECONDS):
+            self.sync()
+
+    def sync(self):
+        """ Write the partial aggregates and force the journal to disk. """
+        if self.file is None:
+            return
+        self.file.write(json.dumps({'checkpoint': self.files,
+                                    'levels': self.levels}) + '\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def close(self, completed):
+        """ Close the journal; a completed run does not need it anymore. """
+        if self.file is None:
+            return
+        self.file.close()
+        self.file = None
+        if completed:
+            os.remove(self.path)
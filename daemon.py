@@ -0,0 +1,140 @@
+#-- PERSISTENT ANALYSIS DAEMON AND ITS CLIENT
+
+import json
+import os
+import urllib.error
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import levels
+
+#-- Default address of the daemon (localhost only)
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+#-- Seconds the client waits for the daemon before analyzing in-process
+CLIENT_TIMEOUT = 30
+
+
+def warm_Worker():
+    """ Load the rule table once per worker process. """
+    levels.get_Rules()
+
+
+def analyze_Request(request):
+    """ Analyze a request: {'path': file} or {'source': code, 'path': name}. """
+    import pycerfl
+    path = request.get('path') or '<source>'
+    if 'source' in request:
+        my_code = request['source']
+    else:
+        with open(path) as fp:
+            my_code = fp.read()
+    repo = request.get('repo') or os.path.dirname(path)
+    result = pycerfl.analyze_Source(my_code, path, repo)
+    counts = {}
+    for level in result.level_Names():
+        counts[level] = counts.get(level, 0) + 1
+    elements = result.json_Elements()
+    return {'path': path, 'repo': repo, 'elements': elements,
+            'levels': counts}
+
+
+class AnalysisHandler(BaseHTTPRequestHandler):
+    """ HTTP handler: POST /analyze, GET /health. """
+
+    def do_GET(self):
+        """ Health check. """
+        if self.path == '/health':
+            self.send_Json(200, {'status': 'ok'})
+        else:
+            self.send_Json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        """ Analyze the posted request in the worker pool. """
+        if self.path != '/analyze':
+            self.send_Json(404, {'error': 'not found'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length))
+            if not isinstance(request, dict):
+                raise ValueError('the request must be a JSON object')
+            result = self.server.pool.submit(analyze_Request, request).result()
+        except (OSError, SyntaxError, ValueError) as e:
+            self.send_Json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            #-- Any other failure is answered too, never a dropped connection
+            self.send_Json(500, {'error': f'{type(e).__name__}: {e}'})
+            return
+        self.send_Json(200, result)
+
+    def send_Json(self, status, body):
+        """ Send a JSON response. """
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        """ Requests are not logged. """
+
+
+def create_Server(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None):
+    """ HTTP server with a warm pool of analysis workers. """
+    server = ThreadingHTTPServer((host, port), AnalysisHandler)
+    server.daemon_threads = True
+    server.pool = ProcessPoolExecutor(max_workers=workers,
+                                      initializer=warm_Worker)
+    #-- Start the workers now rather than on the first request
+    server.pool.submit(levels.get_Rules).result()
+    return server
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None):
+    """ Run the daemon until interrupted. """
+    server = create_Server(host, port, workers)
+    print(f'PyCEFRL daemon listening on http://{host}:{server.server_port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.pool.shutdown()
+
+
+def request_Daemon(request, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                   timeout=CLIENT_TIMEOUT):
+    """ Send a request to the daemon and return its decoded answer. """
+    data = json.dumps(request).encode()
+    http_request = urllib.request.Request(
+        f'http://{host}:{port}/analyze', data=data,
+        headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(http_request, timeout=timeout) as response:
+            return json.load(response)
+    except urllib.error.HTTPError as e:
+        return json.load(e)
+
+
+def analyze(request, host=DEFAULT_HOST, port=DEFAULT_PORT,
+            timeout=CLIENT_TIMEOUT):
+    """ Analyze through the daemon, or in-process if it is not running. """
+    if 'path' in request and 'source' not in request:
+        request = dict(request, path=os.path.abspath(request['path']))
+    try:
+        result = request_Daemon(request, host, port, timeout)
+        result['served_by'] = 'daemon'
+        return result
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        pass
+    try:
+        result = analyze_Request(request)
+    except (OSError, SyntaxError, ValueError) as e:
+        return {'error': str(e), 'served_by': 'local'}
+    result['served_by'] = 'local'
+    return result
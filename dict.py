@@ -1,24 +1,23 @@
 #-- PROGRAMME TO CREATE A DICTIONARY OF THE CONFIGURATION
 
-import configparser
-configuration = configparser.ConfigParser()
+import os
+import levels
 
-#-- Read the configuration file
-configuration.read('configuration.cfg')
 
-#-- Dictionary of LEVELS
-levels = {}
+def create_Levels(path=levels.CONFIG_FILE):
+    """ Dictionary of LEVELS: section -> list of {option: value}. """
+    dictLevels = {}
+    for (section, option), value in levels.compile_Rules(path).items():
+        dictLevels.setdefault(section, []).append({option : value})
+    return dictLevels
 
-#-- Show list of read sections in the archive
-configuration.sections()
-for section in configuration.sections():
-    levels[section] = []
-    #-- List options and values of a section:
-    for option, value in configuration[section].items():
-        levels[section].append({option : value})
 
-
-#-- Create .txt file with dictionary
-with open('dicc.txt', 'w') as file:
-    file.write(str(levels))
-    file.close()
+if __name__ == '__main__':
+    #-- Refresh the precompiled rule table used by levels.py
+    os.makedirs(os.path.dirname(levels.CACHE_FILE), exist_ok=True)
+    if os.path.exists(levels.CACHE_FILE):
+        os.remove(levels.CACHE_FILE)
+    levels.load_Rules()
+    #-- Create .txt file with dictionary, for reference
+    with open(os.path.join(os.path.dirname(levels.CONFIG_FILE), 'dicc.txt'), 'w') as file:
+        file.write(str(create_Levels()))
@@ -0,0 +1,206 @@
+#-- DIRECTORY ROLLUPS: LEVEL AND CLASS TOTALS OF EVERY DIRECTORY
+
+import itertools
+import json
+import os
+
+import getjson
+from ClassIterTree import LEVEL_TABLE
+
+#-- Tree written to DATA_JSON by every run
+TREE_FILE = 'tree_data.json'
+#-- Format of the tree file
+VERSION = 1
+
+
+def relative_Parts(root, path):
+    """ Components of a path relative to the root of the tree. """
+    path = os.path.abspath(path)
+    prefix = root.rstrip(os.sep) + os.sep
+    if path.startswith(prefix):
+        relative = path[len(prefix):]
+    else:
+        relative = os.path.relpath(path, root)
+    return tuple(relative.split(os.sep))
+
+
+def tree_Root(results):
+    """ Deepest directory holding every analyzed file. """
+    dirs = {os.path.dirname(os.path.abspath(result.abs_path))
+            for result in results}
+    if not dirs:
+        return os.getcwd()
+    return os.path.commonpath(list(dirs))
+
+
+def codes_Column(np, columns):
+    """ One array of the integer columns of several file results. """
+    if not columns:
+        return np.zeros(0, dtype=np.intp)
+    return np.concatenate([np.frombuffer(column, dtype=np.intc)
+                           for column in columns]).astype(np.intp)
+
+
+def sparse_Rollup(np, element_nodes, codes, parents, depths):
+    """ (directory, code, count) arrays of the codes found below each
+    directory, holding only the pairs that occur. """
+    width = int(codes.max()) + 1 if len(codes) else 1
+    keys, counts = np.unique(element_nodes.astype(np.int64) * width + codes,
+                             return_counts=True)
+    for depth in range(int(depths.max()), 0, -1):
+        moved = depths[keys // width] == depth
+        up = parents[keys[moved] // width] * width + keys[moved] % width
+        keys, inverse = np.unique(np.concatenate([keys, up]),
+                                  return_inverse=True)
+        summed = np.zeros(len(keys), dtype=np.int64)
+        np.add.at(summed, inverse, np.concatenate([counts, counts[moved]]))
+        counts = summed
+    return keys // width, keys % width, counts
+
+
+def build_Tree(results, root=None):
+    """ Level and class totals of every directory below the root.
+
+    Files are sorted by path, so every directory covers a contiguous range
+    [first, last) of them. Each directory first counts its own files, then
+    one pass from the deepest directories up adds each one to its parent;
+    prefix sums of the file levels give the total of any range of files.
+    Class totals are kept as sparse pairs: a directory costs only the
+    classes found below it.
+    """
+    import numpy as np
+    results = [result for result in results if len(result)]
+    root = os.path.abspath(root) if root else tree_Root(results)
+    entries = sorted(((relative_Parts(root, result.abs_path), result)
+                      for result in results), key=lambda entry: entry[0])
+    nodes = [{'path': '.', 'name': os.path.basename(root) or root,
+              'parent': None, 'depth': 0, 'first': 0, 'children': []}]
+    #-- Directories open along the path of the current file
+    stack = [0]
+    current = []
+    file_nodes = []
+    for i, (parts, _) in enumerate(entries):
+        dirs = list(parts[:-1])
+        depth = 0
+        while (depth < len(current) and depth < len(dirs)
+               and current[depth] == dirs[depth]):
+            depth += 1
+        while len(current) > depth:
+            nodes[stack.pop()]['last'] = i
+            current.pop()
+        for name in dirs[depth:]:
+            current.append(name)
+            nodes[stack[-1]]['children'].append(len(nodes))
+            stack.append(len(nodes))
+            nodes.append({'path': '/'.join(current), 'name': name,
+                          'parent': stack[-2], 'depth': len(current),
+                          'first': i, 'children': []})
+        file_nodes.append(stack[-1])
+    for node in stack:
+        nodes[node]['last'] = len(entries)
+
+    #-- Integer columns: directory, level and cleaned class of each element
+    sizes = [len(result) for _, result in entries]
+    element_nodes = np.repeat(np.array(file_nodes, dtype=np.intp), sizes)
+    level_codes = codes_Column(np, [result.levels for _, result in entries])
+    #-- Each distinct class of the results is cleaned once
+    clean = {}
+    codes = {clase: clean.setdefault(getjson.CLASS_NUMBERS.sub("", clase),
+                                     len(clean))
+             for clase in set().union(*(result.classes
+                                        for _, result in entries))}
+    class_codes = np.fromiter(
+        map(codes.__getitem__, itertools.chain.from_iterable(
+            result.classes for _, result in entries)),
+        dtype=np.intp, count=len(element_nodes))
+    level_keys = list(LEVEL_TABLE.values)
+    class_keys = list(clean)
+
+    #-- Counts of the files of each directory, then the bottom-up pass:
+    #-- the directories of each depth are added to their parents at once.
+    #-- Levels are few and counted in a dense table; classes are counted
+    #-- as sparse (directory, class) pairs, as most directories hold few
+    parents = np.array([node['parent'] or 0 for node in nodes], dtype=np.intp)
+    depths = np.array([node['depth'] for node in nodes], dtype=np.intp)
+    by_depth = [np.flatnonzero(depths == depth)
+                for depth in range(int(depths.max()), 0, -1)]
+    width = max(len(level_keys), 1)
+    level_counts = np.bincount(element_nodes * width + level_codes,
+                               minlength=len(nodes) * width)
+    level_counts = level_counts.reshape(len(nodes), width)
+    for level in by_depth:
+        np.add.at(level_counts, parents[level], level_counts[level])
+    class_nodes, class_codes, class_counts = sparse_Rollup(
+        np, element_nodes, class_codes, parents, depths)
+
+    #-- Values found below the root, whatever else the tables hold
+    levels = sorted(key for key, n in zip(level_keys,
+                                          level_counts[0].tolist())
+                    if key != "" and n)
+    columns = [level_keys.index(key) for key in levels]
+    for node, row in zip(nodes, level_counts[:, columns].tolist()):
+        node['Levels'] = {key: n for key, n in zip(levels, row) if n}
+    for node in nodes:
+        node['Class'] = {}
+    #-- Pairs by directory, then by class name
+    ranks = np.zeros(max(len(class_keys), 1), dtype=np.intp)
+    ranks[sorted(range(len(class_keys)), key=class_keys.__getitem__)] = \
+        np.arange(len(class_keys))
+    order = np.lexsort((ranks[class_codes], class_nodes))
+    for node, code, n in zip(class_nodes[order].tolist(),
+                             class_codes[order].tolist(),
+                             class_counts[order].tolist()):
+        if class_keys[code] != "":
+            nodes[node]['Class'][class_keys[code]] = n
+    for node in nodes:
+        node['files'] = node['last'] - node['first']
+
+    #-- Prefix sums of the level counts of the files, in path order
+    columns = np.full(max(len(level_keys), 1), -1, dtype=np.intp)
+    for j, key in enumerate(levels):
+        columns[level_keys.index(key)] = j
+    element_files = np.repeat(np.arange(1, len(entries) + 1, dtype=np.intp),
+                              sizes)
+    keep = columns[level_codes] >= 0
+    width = max(len(levels), 1)
+    file_levels = np.bincount(element_files[keep] * width
+                              + columns[level_codes][keep],
+                              minlength=(len(entries) + 1) * width)
+    prefix = np.cumsum(file_levels.reshape(len(entries) + 1, width),
+                       axis=0)[:, :len(levels)]
+
+    return {'version': VERSION, 'root': root, 'levels': levels,
+            'nodes': nodes,
+            'files': [['/'.join(parts), node]
+                      for (parts, _), node in zip(entries, file_nodes)],
+            'prefix': prefix.tolist()}
+
+
+def range_Levels(tree, first, last):
+    """ Level totals of the files [first, last) of a tree. """
+    prefix = tree['prefix']
+    return {key: prefix[last][j] - prefix[first][j]
+            for j, key in enumerate(tree['levels'])
+            if prefix[last][j] != prefix[first][j]}
+
+
+def find_Node(tree, path):
+    """ Index of the directory with a relative path, or None. """
+    parts = [part for part in path.replace(os.sep, '/').split('/')
+             if part not in ('', '.')]
+    node = 0
+    for part in parts:
+        nodes = tree['nodes']
+        node = next((child for child in nodes[node]['children']
+                     if nodes[child]['name'] == part), None)
+        if node is None:
+            return None
+    return node
+
+
+def save_Tree(results, root=None):
+    """ Write the directory rollups next to the other summaries. """
+    path = os.path.join(getjson.data_Folder(), TREE_FILE)
+    with open(path, 'w') as f:
+        json.dump(build_Tree(results, root), f)
+    return path
@@ -0,0 +1,138 @@
+#-- DISCOVERY FILTER: GENERATED AND VENDORED CODE IS NOT ANALYZED
+
+import fnmatch
+import os
+import re
+
+#-- Directories that only ever hold third-party or generated code; names
+#-- such as build, dist, vendor or migrations are often a project's own code
+#-- and are left to --exclude
+VENDORED_DIRS = ('site-packages', 'dist-packages', 'node_modules', '_vendor',
+                 'venv', '.venv', '.tox', '.eggs', '.git', '__pycache__')
+#-- File names of generated modules
+GENERATED_FILES = ('*_pb2.py', '*_pb2_grpc.py', '*_pb.py', '*_generated.py')
+#-- Bytes read from the head of a file to look for a generated header
+SNIFF_BYTES = 4096
+#-- Comment announcing generated code
+GENERATED_HEADER = re.compile(
+    r'auto-?generated|generated by|generated from|do not edit|@generated',
+    re.IGNORECASE)
+#-- Opening quote of a string, after its prefix
+STRING_START = re.compile(r'[rRbBuUfF]{0,2}(\'\'\'|"""|\'|")')
+
+
+def sniff_Header(path, size=SNIFF_BYTES):
+    """ The comment line marking a file as generated, or None. Only the
+    header is read: it ends at the first line that is not a comment, a blank
+    or a docstring. """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(size).decode('utf-8', 'replace')
+    except OSError:
+        return None
+    #-- Closing quote of the docstring being skipped
+    docstring = None
+    for line in head.splitlines():
+        line = line.strip()
+        if docstring:
+            if docstring in line:
+                docstring = None
+            continue
+        if not line:
+            continue
+        if line.startswith('#'):
+            if GENERATED_HEADER.search(line):
+                return line[:80]
+            continue
+        string = STRING_START.match(line)
+        if string is None:
+            return None
+        quote = string.group(1)
+        if len(quote) == 3 and quote not in line[string.end():]:
+            docstring = quote
+    return None
+
+
+class Filter():
+    """ Decide which directories and .py files are analyzed. """
+
+    def __init__(self, root=None, include=(), exclude=(), heuristics=True):
+        """ Class constructor. """
+        self.root = root
+        #-- Allow list: analyzed even if the heuristics would skip them
+        self.include = list(include)
+        #-- Deny list: never analyzed
+        self.exclude = list(exclude)
+        self.heuristics = heuristics
+        #-- Skipped paths and the reason, in discovery order
+        self.excluded = {}
+        #-- Verdict of each file, so files are sniffed only once
+        self.cache = {}
+
+    def relative(self, path):
+        """ Path used for the patterns, relative to the analyzed root. """
+        if self.root:
+            path = os.path.relpath(path, self.root)
+        return path.replace(os.sep, '/')
+
+    def matches(self, path, patterns):
+        """ First pattern matching the path or its name. """
+        name = path.rsplit('/', 1)[-1]
+        for pattern in patterns:
+            if fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(name, pattern):
+                return pattern
+        return None
+
+    def skip(self, path, reason):
+        """ Record a skipped path. """
+        self.excluded.setdefault(os.path.normpath(path), reason)
+        return reason
+
+    def directory_Reason(self, path):
+        """ Why a directory is not entered, or None. """
+        relative = self.relative(path)
+        pattern = self.matches(relative, self.exclude)
+        if pattern:
+            return self.skip(path, f'excluded by pattern {pattern}')
+        #-- An allow pattern may select files below the directory
+        if self.matches(relative + '/', self.include):
+            return None
+        name = os.path.basename(path)
+        if self.heuristics and name in VENDORED_DIRS:
+            return self.skip(path, f'vendored or generated directory {name}')
+        return None
+
+    def file_Reason(self, path):
+        """ Why a .py file is not analyzed, or None. """
+        key = os.path.normpath(path)
+        if key in self.cache:
+            return self.cache[key]
+        self.cache[key] = reason = self.check_File(key)
+        return reason
+
+    def check_File(self, path):
+        """ Apply the deny list, the allow list and the heuristics. """
+        relative = self.relative(path)
+        pattern = self.matches(relative, self.exclude)
+        if pattern:
+            return self.skip(path, f'excluded by pattern {pattern}')
+        if not self.heuristics or self.matches(relative, self.include):
+            return None
+        pattern = self.matches(relative, GENERATED_FILES)
+        if pattern:
+            return self.skip(path, f'generated file name {pattern}')
+        header = sniff_Header(path)
+        if header:
+            return self.skip(path, f'generated header: {header}')
+        return None
+
+    def report(self):
+        """ Skipped paths with their reason and size in bytes. """
+        rows = []
+        for path, reason in self.excluded.items():
+            try:
+                size = os.path.getsize(path) if os.path.isfile(path) else None
+            except OSError:
+                size = None
+            rows.append({'path': path, 'reason': reason, 'bytes': size})
+        return rows
@@ -4,6 +4,10 @@
 let analysisData = null;
 let summaryData = null;
 let totalData = null;
+let treeData = null;
+let treeNode = 0;
+// Files listed per directory in the drill-down
+const TREE_FILES_SHOWN = 50;
 
 // ===========================
 // Load Analysis Data
@@ -14,7 +18,8 @@ async function loadSampleData() {
     const responses = await Promise.all([
       fetch('../data.json').catch(() => null),
       fetch('../DATA_JSON/summary_data.json').catch(() => null),
-      fetch('../DATA_JSON/total_data.json').catch(() => null)
+      fetch('../DATA_JSON/total_data.json').catch(() => null),
+      fetch('../DATA_JSON/tree_data.json').catch(() => null)
     ]);
 
     if (responses[0] && responses[0].ok) {
@@ -26,6 +31,10 @@ async function loadSampleData() {
     if (responses[2] && responses[2].ok) {
       totalData = await responses[2].json();
     }
+    if (responses[3] && responses[3].ok) {
+      treeData = await responses[3].json();
+      treeNode = 0;
+    }
 
     if (!summaryData && !analysisData) {
       // Load demo data if no real data is available
@@ -74,7 +83,10 @@ function handleFileUpload(event) {
       const data = JSON.parse(e.target.result);
       
       // Determine data type and load accordingly
-      if (data.Levels) {
+      if (data.nodes && data.prefix) {
+        treeData = data;
+        treeNode = 0;
+      } else if (data.Levels) {
         summaryData = data;
       } else if (Array.isArray(data)) {
         analysisData = data;
@@ -109,6 +121,10 @@ function displayDashboard() {
   if (totalData) {
     displayDetailedAnalysis(totalData);
   }
+
+  if (treeData) {
+    displayDirectoryTree();
+  }
 }
 
 // ===========================
@@ -270,6 +286,100 @@ function displayDetailedAnalysis(totalData) {
   container.innerHTML = table;
 }
 
+// ===========================
+// Directory Drill-down
+// ===========================
+function escapeHtml(text) {
+  return String(text).replace(/[&<>"']/g, c => ({
+    '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+  })[c]);
+}
+
+// Level totals of the files [first, last), from the prefix sums
+function rangeLevels(first, last) {
+  const levels = {};
+  treeData.levels.forEach((level, j) => {
+    levels[level] = treeData.prefix[last][j] - treeData.prefix[first][j];
+  });
+  return levels;
+}
+
+function displayDirectoryTree() {
+  const container = document.getElementById('directory-tree');
+  if (!container || !treeData.nodes[treeNode]) return;
+
+  const nodes = treeData.nodes;
+  const node = nodes[treeNode];
+  const levels = ['A1', 'A2', 'B1', 'B2', 'C1', 'C2'];
+
+  // Breadcrumb from the root to the open directory
+  const trail = [treeNode];
+  while (nodes[trail[0]].parent !== null) {
+    trail.unshift(nodes[trail[0]].parent);
+  }
+  const breadcrumb = trail.map(id => id === treeNode
+    ? `<strong>${escapeHtml(nodes[id].name)}</strong>`
+    : `<a href="#" data-node="${id}">${escapeHtml(nodes[id].name)}</a>`
+  ).join(' / ');
+
+  // Subdirectories, read from their stored rollups
+  const dirRows = node.children.map(id => `
+    <tr>
+      <td><a href="#" data-node="${id}">📁 ${escapeHtml(nodes[id].name)}</a></td>
+      <td>${nodes[id].files}</td>
+      ${levels.map(level => `<td>${nodes[id].Levels[level] || 0}</td>`).join('')}
+    </tr>
+  `);
+
+  // Files directly in the directory
+  const fileRows = [];
+  for (let i = node.first; i < node.last && fileRows.length < TREE_FILES_SHOWN; i++) {
+    const [path, owner] = treeData.files[i];
+    if (owner !== treeNode) continue;
+    const fileLevels = rangeLevels(i, i + 1);
+    fileRows.push(`
+      <tr>
+        <td>${escapeHtml(path.split('/').pop())}</td>
+        <td>1</td>
+        ${levels.map(level => `<td>${fileLevels[level] || 0}</td>`).join('')}
+      </tr>
+    `);
+  }
+
+  container.innerHTML = `
+    <h3>Directory Drill-down</h3>
+    <p class="tree-breadcrumb">${breadcrumb} (${node.files} files)</p>
+    <div class="table-container">
+      <table>
+        <thead>
+          <tr>
+            <th>Name</th>
+            <th>Files</th>
+            ${levels.map(level => `<th>Level ${level}</th>`).join('')}
+          </tr>
+        </thead>
+        <tbody>
+          <tr class="tree-total">
+            <td>Total</td>
+            <td>${node.files}</td>
+            ${levels.map(level => `<td>${node.Levels[level] || 0}</td>`).join('')}
+          </tr>
+          ${dirRows.join('')}
+          ${fileRows.join('')}
+        </tbody>
+      </table>
+    </div>
+  `;
+}
+
+function handleTreeClick(event) {
+  const link = event.target.closest('[data-node]');
+  if (!link) return;
+  event.preventDefault();
+  treeNode = Number(link.dataset.node);
+  displayDirectoryTree();
+}
+
 // ===========================
 // Filter and Search
 // ===========================
@@ -368,6 +478,11 @@ document.addEventListener('DOMContentLoaded', () => {
     levelFilter.addEventListener('change', filterResults);
   }
 
+  const directoryTree = document.getElementById('directory-tree');
+  if (directoryTree) {
+    directoryTree.addEventListener('click', handleTreeClick);
+  }
+
   const exportBtn = document.getElementById('export-csv');
   if (exportBtn) {
     exportBtn.addEventListener('click', exportToCSV);
@@ -407,5 +522,7 @@ style.textContent = `
     overflow-x: auto;
     margin-top: 1rem;
   }
+  .tree-breadcrumb { color: var(--text-secondary); }
+  .tree-total { font-weight: 600; }
 `;
 document.head.appendChild(style);
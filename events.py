@@ -0,0 +1,75 @@
+#-- PROGRESS EVENTS EMITTED DURING AN ANALYSIS
+
+import json
+import time
+
+#-- Event kinds. Every event is a dict with an 'event' key holding its kind.
+#--   discovered: total          -> number of Python files found
+#--   file_done:  file, path, repo, elements, duration
+#--   error:      message, path (optional)
+#--   summary:    files, elements, errors, levels, result, sample, deadline
+DISCOVERED = 'discovered'
+FILE_DONE = 'file_done'
+ERROR = 'error'
+SUMMARY = 'summary'
+
+#-- Registered listeners, called with each event
+listeners = []
+
+
+def subscribe(listener):
+    """ Register a callable receiving every emitted event. """
+    listeners.append(listener)
+
+
+def unsubscribe(listener):
+    """ Remove a previously registered listener. """
+    if listener in listeners:
+        listeners.remove(listener)
+
+
+def emit(kind, **fields):
+    """ Send an event to every listener. """
+    if not listeners:
+        return
+    event = {'event': kind}
+    event.update(fields)
+    for listener in list(listeners):
+        listener(event)
+
+
+def flush():
+    """ Flush the listeners that buffer their output, at the end of a
+    burst of events. """
+    for listener in list(listeners):
+        if hasattr(listener, 'flush'):
+            listener.flush()
+
+
+#-- Default minimum seconds between two flushes of the NDJSON stream
+NDJSON_FLUSH_INTERVAL = 0.5
+
+
+class NdjsonWriter():
+    """ Listener writing each event as one JSON line; the stream is flushed
+    at most once per interval. """
+
+    def __init__(self, stream, interval=NDJSON_FLUSH_INTERVAL):
+        """ Class constructor. """
+        self.stream = stream
+        self.interval = interval
+        #-- The first event is always flushed
+        self.last_flush = float('-inf')
+
+    def __call__(self, event):
+        """ Write the event, flushing at most once per interval. """
+        self.stream.write(json.dumps(event) + '\n')
+        #-- Errors and the final summary are never held back
+        if (event['event'] in (ERROR, SUMMARY)
+                or time.monotonic() - self.last_flush >= self.interval):
+            self.flush()
+
+    def flush(self):
+        """ Flush the underlying stream. """
+        self.stream.flush()
+        self.last_flush = time.monotonic()
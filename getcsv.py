@@ -3,20 +3,26 @@
 import csv
 import os
 
+#-- Header of the .csv file of each .py file
+CSV_HEADER = ['Repository', 'Absolute Path', 'File Name', 'Class',
+              'Start Line', 'End Line', 'Displacement', 'Level', 'Class ID',
+              'Category']
 
-def create_csv(myDataList):
-    """Scrolls through the list looking for different .py files. """
-    #-- Remove the header
-    list = myDataList[1:]
-    myDataCsv = ''
-    for i in list:
-        if (myDataCsv == '') or (i[1] != myDataCsv[1][1]):
-            myDataCsv = [['Repository', 'File Name', 'Class', 'Start Line',
-                          'End Line', 'Displacement', 'Level']]
 
+def create_csv(myDataList):
+    """Scrolls through the list looking for different .py files; the rows
+    of each file are written once, when the next file starts. """
+    myDataCsv = []
+    #-- Skip the header
+    for i in myDataList[1:]:
+        if myDataCsv and i[1] != myDataCsv[1][1]:
+            write_FileCsv(myDataCsv, myDataCsv[1][1])
+            myDataCsv = []
+        if not myDataCsv:
+            myDataCsv = [CSV_HEADER[:]]
         myDataCsv.append(i)
-        file_name = myDataCsv[1][1]
-        write_FileCsv(myDataCsv, file_name)
+    if myDataCsv:
+        write_FileCsv(myDataCsv, myDataCsv[1][1])
 
 
 def write_FileCsv(myDataCsv, file_name, file_csv = ""):
@@ -10,77 +10,91 @@ dict_total = {}
 dict_summary = {}
 #-- Dictionary of all files
 dict_repo = {}
+#-- Counts removed from class names
+CLASS_NUMBERS = re.compile(r"\s?\d")
+
+
+def reset_Results():
+    """ Clear the summaries of a previous run. """
+    dict_total.clear()
+    dict_summary.clear()
+    dict_repo.clear()
 
 
 def extract_Levels(data):
     """ Extract repository levels. """
+    #-- NumPy is only loaded when a summary is built
+    import numpy as np
     #-- Take out the repositories
-    for repo in data.keys():
+    for repo, files in data.items():
         dict_total[repo] = {}
         dict_repo[repo] = {}
-        for file in data[repo]:
+        names = list(files)
+        for file in names:
             dict_total[repo][file] = {}
-            for i in data[repo][file]:
-                level = i['Level']
-                if not 'Levels' in dict_summary:
-                    dict_summary['Levels'] = {}
-                ini_total('Levels', level)
-                if not 'Levels' in dict_repo[repo]:
-                    dict_repo[repo]['Levels'] = {}
-                ini_repo(repo,'Levels', level)
-                if not 'Levels' in dict_total[repo][file]:
-                    #-- Initialize the dictionary values to 0
-                    #-- Create the 'Levels' key
-                    dict_total[repo][file]['Levels'] = {}
-                ini_values(repo, file, 'Levels', level)
-                clase = i['Class']
-                #-- Remove numbers
-                clase = re.sub(r"\s?\d", "", clase)
-                if not 'Class' in dict_summary:
-                    dict_summary['Class'] = {}
-                ini_total('Class', clase)
-                if not 'Class' in dict_repo[repo]:
-                    dict_repo[repo]['Class'] = {}
-                ini_repo(repo,'Class', clase)
-                if not 'Class' in dict_total[repo][file]:
-                    #-- Initialize the dictionary values to 0
-                    #-- Create the 'Class' key
-                    dict_total[repo][file]['Class'] = {}
-                ini_values(repo, file, 'Class', clase)
+        elements = [i for file in names for i in files[file]]
+        #-- Integer columns: file, level and class of each element
+        sizes = [len(files[file]) for file in names]
+        file_codes = np.repeat(np.arange(len(names), dtype=np.intp), sizes)
+        level_keys, level_codes = encode_Values(elements, 'Level')
+        class_keys, class_codes = encode_Values(elements, 'Class')
+        #-- Remove numbers, once per distinct class name
+        clean = {}
+        clean_codes = np.array([clean.setdefault(CLASS_NUMBERS.sub("", clase),
+                                                 len(clean))
+                                for clase in class_keys], dtype=np.intp)
+        count_Values(repo, names, 'Levels', file_codes, level_codes,
+                     level_keys)
+        count_Values(repo, names, 'Class', file_codes,
+                     clean_codes[class_codes], list(clean))
 
         write_Results(repo)
 
 
-
-def ini_total(type, key):
-    """ Initialize or increment values. """
-    if not key in dict_summary[type]:
-        if key != "":
-            dict_summary[type][key] = 1
-    else:
-        dict_summary[type][key] += 1
-
-
-def ini_repo(repo, type, key):
-    """ Initialize or increment values. """
-    if not key in dict_repo[repo][type]:
-        if key != "":
-            dict_repo[repo][type][key] = 1
-    else:
-        dict_repo[repo][type][key] += 1
-
-
-def ini_values(repo, file, type, key):
-    """ Initialize or increment values. """
-    if not key in dict_total[repo][file][type]:
+def encode_Values(elements, field):
+    """ Distinct values of a field, in order of appearance, and their codes. """
+    import numpy as np
+    table = {}
+    codes = np.fromiter((table.setdefault(i[field], len(table))
+                         for i in elements), dtype=np.intp, count=len(elements))
+    return list(table), codes
+
+
+def count_Values(repo, files, type, file_codes, codes, keys):
+    """ Add the counts of each value per file, repository and in total. """
+    import numpy as np
+    if not len(codes):
+        return
+    #-- Counts per file, keeping the order in which values first appear
+    width = len(keys)
+    pairs = file_codes * width + codes
+    unique, first, counts = np.unique(pairs, return_index=True,
+                                      return_counts=True)
+    order = np.argsort(first, kind='stable')
+    for pair, count in zip(unique[order].tolist(), counts[order].tolist()):
+        file, code = divmod(pair, width)
+        values = dict_total[repo][files[file]].setdefault(type, {})
+        if keys[code] != "":
+            values[keys[code]] = count
+    #-- Counts per repository and of all repositories
+    totals = np.bincount(codes, minlength=width).tolist()
+    repo_values = dict_repo[repo].setdefault(type, {})
+    summary = dict_summary.setdefault(type, {})
+    for key, count in zip(keys, totals):
         if key != "":
-            dict_total[repo][file][type][key] = 1
-    else:
-        dict_total[repo][file][type][key] += 1
+            repo_values[key] = count
+            summary[key] = summary.get(key, 0) + count
 
 
 def write_Results(repo):
     """ Create a .txt file with a summary of results. """
+    write_Repo(repo)
+    write_Total()
+    write_Summary()
+
+
+def data_Folder():
+    """ DATA_JSON folder of the current path, created if needed. """
     #-- get current path
     wd = os.getcwd()
     #-- create new folder
@@ -88,23 +102,31 @@ def write_Results(repo):
         os.mkdir(wd + "/DATA_JSON")
     except FileExistsError:
         pass
-    #-- Create a file for each repository
-    name_file = os.path.join(wd, "DATA_JSON", os.path.basename(repo) + '.json')
+    return os.path.join(wd, "DATA_JSON")
+
+
+def write_Repo(repo):
+    """ Create the file of one repository. """
+    name_file = os.path.join(data_Folder(), os.path.basename(repo) + '.json')
     repository = dict()
     repository[repo] = dict_total[repo]
     with open(name_file, 'w') as file:
         json.dump(repository, file, indent=4)
-    #-- Create a total file
-    name_file = os.path.join(wd, "DATA_JSON", "total_data.json")
+
+
+def write_Total():
+    """ Create a total file. """
+    name_file = os.path.join(data_Folder(), "total_data.json")
     with open(name_file, 'w') as file:
         json.dump(dict_total, file, indent=4)
-    #-- Create a summary data
-    name_file =  wd + "/DATA_JSON/summary_data.json"
-    with open(name_file, 'w') as file:
+
+
+def write_Summary():
+    """ Create the summary and the repository data. """
+    folder = data_Folder()
+    with open(os.path.join(folder, "summary_data.json"), 'w') as file:
         json.dump(dict_summary, file, indent=4)
-    #-- Create a repo data
-    name_file =  wd + "/DATA_JSON/repo_data.json"
-    with open(name_file, 'w') as file:
+    with open(os.path.join(folder, "repo_data.json"), 'w') as file:
         json.dump(dict_repo, file, indent=4)
 
 
@@ -1,75 +1,116 @@
 #-- PROGRAM FOR THE LEVELS OF EACH ATTRIBUTE
 
 import ast
-
-#-- Level dictionary global variable
-dictLevel = ''
-
-#-- List of loop elements: break, continue, pass,for, while
-listElemLoop = ['ast.Break', 'ast.Continue', 'ast.Pass', 'ast.While', 'ast.For']
-#-- List of imports
-listImport = ['ast.Import', 'ast.ImportFrom']
-
-
-with open('dicc.txt', 'r') as dict_file:
-    """ Read file with levels """
-
-    dict_text = dict_file.read()
-    dictLevel = eval(dict_text)
+import json
+import os
+
+#-- Configuration file with the level of each rule, next to this module
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'configuration.cfg')
+#-- Precompiled rule table, valid while the configuration is unchanged
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          '__pycache__', 'rules.json')
+
+#-- Flat rule table: (section, key) -> level, loaded on first use
+RULES = None
+#-- Canonical class IDs ('Section.key') -> category, built on first use
+CLASS_CATEGORIES = None
+
+
+def compile_Rules(path=CONFIG_FILE):
+    """ Flat rule table (section, key) -> level of a configuration file. """
+    import configparser
+    configuration = configparser.ConfigParser()
+    configuration.read(path)
+    return {(section, key): value
+            for section in configuration.sections()
+            for key, value in configuration[section].items()}
+
+
+def load_Rules(path=CONFIG_FILE, cache=CACHE_FILE):
+    """ Rule table of a configuration, precompiled and cached by mtime. """
+    stat = os.stat(path)
+    stamp = [stat.st_mtime_ns, stat.st_size]
+    try:
+        with open(cache) as cache_file:
+            cached = json.load(cache_file)
+        if cached['config'] == os.path.abspath(path) and cached['stamp'] == stamp:
+            return {(section, key): value
+                    for section, key, value in cached['rules']}
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    rules = compile_Rules(path)
+    try:
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        with open(cache, 'w') as cache_file:
+            json.dump({'config': os.path.abspath(path), 'stamp': stamp,
+                       'rules': [[section, key, value]
+                                 for (section, key), value in rules.items()]},
+                      cache_file)
+    except OSError:
+        #-- Read-only installation: compile on every start
+        pass
+    return rules
+
+
+def get_Rules():
+    """ Flat rule table, loaded on first use. """
+    global RULES
+    if RULES is None:
+        RULES = load_Rules()
+    return RULES
+
+#-- Display category of each section of configuration.cfg
+SECTION_CATEGORIES = {
+    'List': 'Data Structures',
+    'ListComp': 'Data Structures',
+    'Dict': 'Data Structures',
+    'DictComp': 'Data Structures',
+    'Tuple': 'Data Structures',
+    'File': 'I/O',
+    'Print': 'I/O',
+    'Assign': 'Operations',
+    'If-Statements': 'Control Flow',
+    'Loop': 'Control Flow',
+    'Exception': 'Control Flow',
+    'With': 'Control Flow',
+    'FunctionDef': 'OOP & Functions',
+    'Return': 'OOP & Functions',
+    'Lambda': 'OOP & Functions',
+    'Generators': 'OOP & Functions',
+    'Class': 'OOP & Functions',
+    'Static': 'OOP & Functions',
+    'Decorators': 'OOP & Functions',
+    'Metaclass': 'OOP & Functions',
+    'SuperFunction': 'OOP & Functions',
+    'Slots': 'OOP & Functions',
+    'Attributes': 'OOP & Functions',
+    'Import': 'Modules',
+    'Modules': 'Modules',
+}
+
+
+def get_Categories():
+    """ Category of each canonical class ID ('Section.key'). """
+    global CLASS_CATEGORIES
+    if CLASS_CATEGORIES is None:
+        CLASS_CATEGORIES = {section + '.' + key:
+                            SECTION_CATEGORIES.get(section, 'Other')
+                            for section, key in get_Rules()}
+    return CLASS_CATEGORIES
+
+
+def rule(self, section, key):
+    """ Level of a rule, recorded as the class ID of the element. """
+    self.class_id = section + '.' + key
+    return get_Rules()[(section, key)]
 
 
 def levels(self):
     """ Assign levels. """
-    if self.attrib == 'ast.List':
-        level_List(self)
-    elif self.attrib == 'ast.ListComp':
-        level_ListComp(self)
-    elif self.attrib == 'ast.Dict':
-        level_Dict(self)
-    elif self.attrib == 'ast.DictComp':
-        level_DictComp(self)
-    elif self.attrib == 'ast.Tuple':
-        level_Tuple(self)
-    elif self.attrib == 'ast.Call':
-        type_Call(self)
-    elif self.attrib == 'ast.Assign':
-        level_Assign(self)
-    elif self.attrib == 'ast.AugAssign':
-        level_Assign(self)
-    elif self.attrib == 'ast.If':
-        level_If(self)
-    elif self.attrib == 'ast.IfExp':
-        level_If(self)
-    elif self.attrib in listElemLoop:
-        type_ElemLoop(self)
-    elif self.attrib == 'ast.FunctionDef':
-        level_FunctionDef(self)
-    elif self.attrib == 'ast.Return':
-        level_Return(self)
-    elif self.attrib == 'ast.Lambda':
-        level_Lambda(self)
-    elif self.attrib == 'ast.Yield':
-        level_GeneratorFunct(self)
-    elif self.attrib == 'ast.GeneratorExp':
-        level_GeneratorExpr(self)
-    elif self.attrib in listImport:
-        level_Module(self)
-    elif self.attrib == 'ast.ClassDef':
-        level_Class(self)
-    elif self.attrib == 'ast.Attribute':
-        level_atributte(self)
-        specialClassAttributes(self)
-    elif self.attrib == 'ast.Name':
-        typeName(self)
-    elif self.attrib == 'ast.Try':
-        level_Try(self)
-    elif self.attrib == 'ast.Raise':
-        level_Raise(self)
-    elif self.attrib == 'ast.Assert':
-        level_Assert(self)
-    elif self.attrib == 'ast.With':
-        level_With(self)
-
+    handler = HANDLERS.get(type(self.node))
+    if handler is not None:
+        handler(self)
 
 
 def level_List(self):
@@ -78,13 +119,13 @@ def level_List(self):
     numDict = sum(1 for elt in self.node.elts if isinstance(elt, ast.Dict))
     #-- Check for lists
     if numList > 0:
-        self.level= dictLevel['List'][1]['nested']
+        self.level = rule(self, 'List', 'nested')
         self.clase = (str(numList) + ' Nested List')
     elif numDict > 0:
-        self.level= dictLevel['List'][2]['with-dict']
+        self.level = rule(self, 'List', 'with-dict')
         self.clase = (str(numDict) + ' Dictionary List')
     else:
-        self.level= dictLevel['List'][0]['simple']
+        self.level = rule(self, 'List', 'simple')
         self.clase = ('Simple List')
 
 
@@ -92,16 +133,16 @@ def level_ListComp(self):
     """ List comprehension level. """
     numComp = 0
     ifExp = 0
-    self.level= dictLevel['ListComp'][0]['simple']
+    self.level = rule(self, 'ListComp', 'simple')
     self.clase = ('Simple List Comprehension')
     for i in range(0, len(self.node.generators)):
         numComp += 1
         ifExp += 1
         if (self.node.generators[i].ifs) != []:
-            self.level= dictLevel['ListComp'][2]['with-if']
+            self.level = rule(self, 'ListComp', 'with-if')
             self.clase = ('List Comprehension with ' + str(ifExp) + 'If statements')
         if numComp > 1:
-            self.level= dictLevel['ListComp'][1]['nested']
+            self.level = rule(self, 'ListComp', 'nested')
             self.clase = (str(numComp) + 'Nested List Comprehension with')
 
 
@@ -111,23 +152,23 @@ def level_Dict(self):
     numDict = sum(1 for v in self.node.values if isinstance(v, ast.Dict))
     #-- Check for dictionaries
     if numDict > 0:
-        self.level= dictLevel['Dict'][1]['nested']
+        self.level = rule(self, 'Dict', 'nested')
         self.clase = (str(numDict) + ' Nested Dictionary')
         #-- Check for lists inside dictionary dictionaries
         for i in range(0, len(self.node.values)):
             if isinstance(self.node.values[i], ast.Dict):
                 numList += sum(1 for v in self.node.values[i].values if isinstance(v, ast.List))
                 if numList > 0:
-                    self.level= dictLevel['Dict'][3]['with-dict-list']
+                    self.level = rule(self, 'Dict', 'with-dict-list')
                     self.clase = (str(numList) + ' List in ' + str(numDict) +
                                 'Dictionary of Dictionary')
     #-- Check for lists
     elif any(isinstance(v, ast.List) for v in self.node.values):
         numList = sum(1 for v in self.node.values if isinstance(v, ast.List))
-        self.level= dictLevel['Dict'][2]['with-list']
+        self.level = rule(self, 'Dict', 'with-list')
         self.clase = str(numList) + ' List Dictionary'
     else:
-        self.level= dictLevel['Dict'][0]['simple']
+        self.level = rule(self, 'Dict', 'simple')
         self.clase = 'Simple Dictionary'
 
 
@@ -139,16 +180,16 @@ def level_DictComp(self):
     for i in self.node.generators:
         numIfs += sum(1 for c in i.ifs if isinstance(c, ast.Compare))
         if numIfs > 0:
-            self.level= dictLevel['DictComp'][1]['with-if']
+            self.level = rule(self, 'DictComp', 'with-if')
             self.clase = ('Dictionary Comprehension with ' + str(numIfs) + ' If statements')
         else:
-            self.level= dictLevel['DictComp'][0]['simple']
+            self.level = rule(self, 'DictComp', 'simple')
             self.clase = 'Simple Dictionary Comprehension'
     if isinstance(self.node.value, ast.IfExp):
-        self.level= dictLevel['DictComp'][2]['with-if-else']
+        self.level = rule(self, 'DictComp', 'with-if-else')
         self.clase = ('Dictionary Comprehension with 1 if expression (If-Else)')
     elif isinstance(self.node.value, ast.DictComp):
-        self.level= dictLevel['DictComp'][3]['nested']
+        self.level = rule(self, 'DictComp', 'nested')
         self.clase = ('1 Nested Dictionary Comprehension')
 
 
@@ -156,10 +197,10 @@ def level_Tuple(self):
     """ Tuple Level. """
     numTuple = sum(1 for elt in self.node.elts if isinstance(elt, ast.Tuple))
     if numTuple > 0:
-        self.level= dictLevel['Tuple'][1]['nested']
+        self.level = rule(self, 'Tuple', 'nested')
         self.clase = (str(numTuple) + ' Nested Tuple')
     else:
-        self.level= dictLevel['Tuple'][0]['simple']
+        self.level = rule(self, 'Tuple', 'simple')
         self.clase = ('Simple Tuple')
 
 #-- List of file attributes
@@ -197,35 +238,31 @@ def type_Call(self):
 def level_Files(self, value):
     """ Files level. """
     if (value) == 'open':
-        self.level= dictLevel['File'][0]['open']
+        self.level = rule(self, 'File', 'open')
         self.clase = ("Files --> 'open' call function")
     elif value in list_File_Attr:
-        level= dictLevel['File']
-        for i in range(1, len(level)):
-            keys = dictLevel['File'][i].keys()
-            for k in keys:
-                if k == value:
-                    self.level= dictLevel['File'][i][k]
-                    self.clase = ("Files --> '" + value + "' call function")
+        if ('File', value) in get_Rules():
+            self.level = rule(self, 'File', value)
+            self.clase = ("Files --> '" + value + "' call function")
 
 
 def level_Print(self, value):
     """ Print level. """
-    self.level= dictLevel['Print'][0]['simple']
+    self.level = rule(self, 'Print', 'simple')
     self.clase = ('Print')
 
 
 def level_Assign(self):
     """ Level Assignments. """
     op = ''
-    if self.attrib == 'ast.Assign':
-        self.level= dictLevel['Assign'][0]['simple']
+    if isinstance(self.node, ast.Assign):
+        self.level = rule(self, 'Assign', 'simple')
         self.clase = ('Simple Assignment' )
         if isinstance(self.node.value, ast.BinOp):
-            self.level= dictLevel['Assign'][1]['with-sum']
+            self.level = rule(self, 'Assign', 'with-sum')
             self.clase = ('Assigment with sum (total = total + 1)')
     else:
-        self.level= dictLevel['Assign'][2]['increments']
+        self.level = rule(self, 'Assign', 'increments')
         if isinstance(self.node.op, ast.Add):
             op = 'increase amount'
         elif isinstance(self.node.op, ast.Sub):
@@ -257,77 +294,70 @@ def level_NameMain(self):
 def level_If(self):
     """ If statements level. """
     orelse = 0
-    if self.attrib == 'ast.If':
-        self.level= dictLevel['If-Statements'][0]['simple']
+    if isinstance(self.node, ast.If):
+        self.level = rule(self, 'If-Statements', 'simple')
         self.clase = ('Simple If statements')
         #-- Check the if expression
         name = level_NameMain(self)
         if name == True:
-            self.level= dictLevel['If-Statements'][2]['__name__']
+            self.level = rule(self, 'If-Statements', '__name__')
             self.clase = ("If statements using → __name__ == ‘__main__’")
-    elif self.attrib == 'ast.IfExp':
-        self.level= dictLevel['If-Statements'][1]['expression']
+    elif isinstance(self.node, ast.IfExp):
+        self.level = rule(self, 'If-Statements', 'expression')
         self.clase = ('If statements expression (else)')
 
 
 def type_ElemLoop(self):
     """ Loop element type. """
-    if self.attrib == 'ast.While':
-        level_While(self)
-    elif self.attrib == 'ast.Break':
-        level_Break(self)
-    elif self.attrib == 'ast.Continue':
-        level_Continue(self)
-    elif self.attrib == 'ast.Pass':
-        level_Pass(self)
-    elif self.attrib == 'ast.For':
-        level_For(self)
+    handler = LOOP_HANDLERS.get(type(self.node))
+    if handler is not None:
+        handler(self)
 
 
 def level_While(self):
     """ While level. """
     if self.node.orelse == []:
         self.clase = ('Simple While Loop')
-        self.level= dictLevel['Loop'][3]['while-simple']
+        self.level = rule(self, 'Loop', 'while-simple')
     else:
         self.clase = ('While with Else Loop')
-        self.level= dictLevel['Loop'][4]['while-else']
+        self.level = rule(self, 'Loop', 'while-else')
 
 
 def level_Break(self):
     """ Break level. """
-    self.level= dictLevel['Loop'][0]['break']
+    self.level = rule(self, 'Loop', 'break')
     self.clase = ("'break' statement")
 
 
 def level_Continue(self):
     """ Continue level. """
-    self.level = dictLevel['Loop'][1]['continue']
+    self.level = rule(self, 'Loop', 'continue')
     self.clase = ("'continue' statement")
 
 
 def level_Pass(self):
     """ Pass level. """
-    self.level= dictLevel['Loop'][2]['pass']
+    self.level = rule(self, 'Loop', 'pass')
     self.clase = ("'pass' statement")
 
 
 def level_For(self):
     """ For level. """
-    self.level= dictLevel['Loop'][5]['for-simple']
+    self.level = rule(self, 'Loop', 'for-simple')
     self.clase = ('Simple For Loop')
     numFor = sum(1 for stmt in self.node.body if isinstance(stmt, ast.For))
     if numFor > 0:
-        self.level= dictLevel['Loop'][6]['for-nested']
+        self.level = rule(self, 'Loop', 'for-nested')
         self.clase = (str(numFor) + ' Nested For Loop')
     if isinstance(self.node.target, ast.Tuple):
-        self.level= dictLevel['Loop'][7]['for-tuple-name']
+        self.level = rule(self, 'Loop', 'for-tuple-name')
         self.clase = ('For Loop with Tuple as name')
     if isinstance(self.node.iter, ast.List):
-        self.level= dictLevel['Loop'][8]['for-list-iterate']
+        self.level = rule(self, 'Loop', 'for-list-iterate')
         self.clase = ('For Loop with 1 List to iterate')
     elif isinstance(self.node.iter, ast.Tuple):
-        self.level = dictLevel['Loop'][9]['for-tuple-iterate']
+        self.level = rule(self, 'Loop', 'for-tuple-iterate')
         self.clase = ('For Loop with 1 Tuples to iterate')
 
 
@@ -335,19 +365,19 @@ def level_For(self):
 def level_LoopCoding(self, value):
     """ Loop coding tecniques levels. """
     if value == 'range':
-        self.level= dictLevel['Loop'][10]['range']
+        self.level = rule(self, 'Loop', 'range')
     elif value == 'zip':
-        self.level= dictLevel['Loop'][11]['zip']
+        self.level = rule(self, 'Loop', 'zip')
     elif value == 'map':
-        self.level= dictLevel['Loop'][12]['map']
+        self.level = rule(self, 'Loop', 'map')
     elif value == 'enumerate':
-        self.level= dictLevel['Loop'][13]['enumerate']
+        self.level = rule(self, 'Loop', 'enumerate')
     self.clase = ("'" + value + "' call function")
 
 
 def level_FunctionDef(self):
     """ Level functions. """
-    self.level= dictLevel['FunctionDef'][0]['simple']
+    self.level = rule(self, 'FunctionDef', 'simple')
     self.clase = ('Function' )
     #-- Classify according to the arguments passed
     level_DefArguments(self)
@@ -364,31 +394,31 @@ def level_DefArguments(self):
         self.clase += (' with Simple argument')
     #-- Default arguments
     if self.node.args.defaults != []:
-        self.level= dictLevel['FunctionDef'][1]['argum-default']
+        self.level = rule(self, 'FunctionDef', 'argum-default')
         self.clase += (' with Default argument')
     #-- * Arguments
     if self.node.args.vararg != None:
-        self.level= dictLevel['FunctionDef'][2]['argum-*']
+        self.level = rule(self, 'FunctionDef', 'argum-*')
         self.clase += (' with * argument ')
     #-- Keyword-only arguments
     if self.node.args.kwonlyargs != []:
-        self.level= dictLevel['FunctionDef'][4]['argum-keyword-only']
+        self.level = rule(self, 'FunctionDef', 'argum-keyword-only')
         self.clase += (' with Keyword-Only argument')
     #-- ** arguments
     if self.node.args.kwarg != None:
-        self.level= dictLevel['FunctionDef'][3]['argum-**']
+        self.level = rule(self, 'FunctionDef', 'argum-**')
         self.clase += (' with ** argument')
 
 
 def level_Return(self):
     """ Return level. """
-    self.level= dictLevel['Return'][0]['simple']
+    self.level = rule(self, 'Return', 'simple')
     self.clase = ('Return')
 
 
 def level_Lambda(self):
     """ Lambda level. """
-    self.level= dictLevel['Lambda'][0]['simple']
+    self.level = rule(self, 'Lambda', 'simple')
     self.clase = ('Lambda')
 
 
@@ -398,7 +428,7 @@ def level_RecursiveFunction(self):
         if isinstance(i, ast.Call):
             try:
                 if i.func.id == self.node.name:
-                    self.level= dictLevel['FunctionDef'][5]['recursive']
+                    self.level = rule(self, 'FunctionDef', 'recursive')
                     self.clase = ('Recursive Functions')
             except:
                 pass
@@ -406,14 +436,14 @@ def level_RecursiveFunction(self):
 
 def level_GeneratorFunct(self):
     """ Generator function level (yield). """
-    self.level= dictLevel['Generators'][0]['function']
+    self.level = rule(self, 'Generators', 'function')
     self.clase = ('Generator Function (yield)')
 
 
 
 def level_GeneratorExpr(self):
     """ Generator expression level. """
-    self.level= dictLevel['Generators'][1]['expression']
+    self.level = rule(self, 'Generators', 'expression')
     self.clase = ('Generator Expression')
 
 
@@ -424,21 +454,16 @@ listModules = ['struct', 'pickle', 'shelve', 'dbm', 're', 'importlib']
 def nameModules(self, name):
     """ Important modules levels. """
     for i in range(0, len(name)):
-        if name[i] in listModules:
-            level= dictLevel['Modules']
-            for j in range(0, len(level)):
-                keys = dictLevel['Modules'][j].keys()
-                for k in keys:
-                    if k == name[i]:
-                        self.level= dictLevel['Modules'][j][k]
-                        self.clase += ("'" + k + "' module")
+        if name[i] in listModules and ('Modules', name[i]) in get_Rules():
+            self.level = rule(self, 'Modules', name[i])
+            self.clase += ("'" + name[i] + "' module")
 
 
 def level_AsExtension(self):
     """ 'as' etension level """
     for i in self.node.names:
         if i.asname != None:
-            self.level= dictLevel['Import'][4]['as-extension']
+            self.level = rule(self, 'Import', 'as-extension')
             self.clase += (" with 'as' extension ")
 
 
@@ -446,25 +471,25 @@ def level_From(self):
     """ From level. """
     #-- Check whether it is relative or absolute import
     if (self.node.level == 1) or (self.node.level == 2):
-        self.level= dictLevel['Import'][2]['from-relative']
+        self.level = rule(self, 'Import', 'from-relative')
         self.clase = ('Relative From')
     #-- Check if from *statements
     for i in self.node.names:
         if i.name == '*':
-            self.level= dictLevel['Import'][3]['from-*statements']
+            self.level = rule(self, 'Import', 'from-*statements')
             self.clase += (' with *statements ')
 
 
 def level_Module(self):
     """ Modules level. """
     nameModule = []
-    if self.attrib == 'ast.Import':
-        self.level= dictLevel['Import'][0]['import']
+    if isinstance(self.node, ast.Import):
+        self.level = rule(self, 'Import', 'import')
         self.clase = ('Import')
         for i in self.node.names:
             nameModule.append(i.name)
     else:
-        self.level= dictLevel['Import'][1]['from-simple']
+        self.level = rule(self, 'Import', 'from-simple')
         self.clase = ('From')
         level_From(self)
         nameModule.append(self.node.module)
@@ -477,14 +502,14 @@ def PrivateClass(self):
     for funct in self.node.body:
         #-- Check if the function is private
         if(funct.name.startswith('__')) and (not funct.name.endswith('__')):
-            self.level= dictLevel['Class'][5]['private']
+            self.level = rule(self, 'Class', 'private')
             self.clase += (' Private Methods ' + str(funct.name) +
                            ' of the class')
     #-- Check for private attributes/methods
         for i in ast.walk(funct):
             if isinstance(i, ast.Attribute):
                 if (i.attr.startswith('__')) and (not i.attr.endswith('__')):
-                    self.level= dictLevel['Class'][5]['private']
+                    self.level = rule(self, 'Class', 'private')
                     self.clase += (' Private Attributes ' + str(i.attr) +
                                    ' of the class')
 
@@ -493,7 +518,7 @@ def constrMethod(self):
     """ Level of the constructor method. """
     for i in self.node.body:
         if i.name == '__init__':
-            self.level = dictLevel['Class'][2]['__init__']
+            self.level = rule(self, 'Class', '__init__')
             self.clase += (' Using the constructor method --> ' + str(i.name))
 
 #-- List of descriptors
@@ -504,7 +529,7 @@ def Descriptors(self):
     """ Descriptor level."""
     for elem in self.node.body:
         if elem.name in listDescriptors:
-            self.level+= dictLevel['Class'][3]['descriptors']
+            self.level += rule(self, 'Class', 'descriptors')
             self.clase += (' with Descriptors ' + str(elem.name))
 
 
@@ -515,7 +540,7 @@ def level_Properties(self):
             if isinstance(elem, ast.Call):
                 try:
                     if elem.func.id == 'property':
-                        self.level= dictLevel['Class'][4]['properties']
+                        self.level = rule(self, 'Class', 'properties')
                         self.clase += (' with Class Properties ')
                 except:
                     pass
@@ -523,12 +548,12 @@ def level_Properties(self):
 
 def level_Class(self):
     """ Class level. """
-    self.level = dictLevel['Class'][0]['simple']
+    self.level = rule(self, 'Class', 'simple')
     self.clase = ('Simple Class ')
     #-- Check for inherited class
     for i in self.node.bases:
         try:
-            self.level= dictLevel['Class'][1]['inherited']
+            self.level = rule(self, 'Class', 'inherited')
             self.clase = ('Inherited Class from ' + str(i.id))
         except:
             pass
@@ -559,43 +584,36 @@ listClassAttr = ['__class__', '__dict__']
 
 def level_atributte(self):
     """ Simple attribute level."""
-    self.level= dictLevel['Attributes'][0]['simple']
+    self.level = rule(self, 'Attributes', 'simple')
     self.clase = ('Simple Atributte')
 
 
+def level_Attribute(self):
+    """ Attribute level, simple or special class attribute. """
+    level_atributte(self)
+    specialClassAttributes(self)
+
+
 def specialClassAttributes(self):
     """ Special class attrbutes level. """
-    if self.node.attr in listClassAttr:
-        level= dictLevel['Attributes']
-        for i in range(1, len(level)):
-            keys = dictLevel['Attributes'][i].keys()
-            for k in keys:
-                if k == self.node.attr:
-                    self.level= dictLevel['Attributes'][i][k]
-                    self.clase = ('Special Class Attribute ' + str(self.node.attr))
+    if self.node.attr in listClassAttr and ('Attributes', self.node.attr) in get_Rules():
+        self.level = rule(self, 'Attributes', self.node.attr)
+        self.clase = ('Special Class Attribute ' + str(self.node.attr))
 
 
 def level_StaticClass(self, value):
     """ Static and class method level. """
-    level= dictLevel['Static']
-    for i in range(0, len(level)):
-        keys = dictLevel['Static'][i].keys()
-        for k in keys:
-            if k == value:
-                self.level= dictLevel['Static'][i][k]
-                self.clase = (value)
+    if ('Static', value) in get_Rules():
+        self.level = rule(self, 'Static', value)
+        self.clase = (value)
 
 
 def level_Decorators(self, type):
     """ Functions and classes decorators level. """
     for i in self.node.decorator_list:
-        level= dictLevel['Decorators']
-        for j in range(0, len(level)):
-            keys = dictLevel['Decorators'][j].keys()
-            for k in keys:
-                if k == type:
-                    self.level= dictLevel['Decorators'][j][k]
-                    self.clase = ('Decorator ' + type )
+        if ('Decorators', type) in get_Rules():
+            self.level = rule(self, 'Decorators', type)
+            self.clase = ('Decorator ' + type )
 
 
 def typeName(self):
@@ -614,30 +632,30 @@ def level_Metaclass(self, pos):
             if i.name == '__new__':
                 for argum in i.args.args:
                     if (argum.arg) == 'meta':
-                        self.level= dictLevel['Metaclass'][0]['__new__']
+                        self.level = rule(self, 'Metaclass', '__new__')
                         self.clase += (' Metaclass (3.X) created with --> __new__')
     #-- Class header
     elif pos == 'header':
         for i in self.node.keywords:
             if i.arg == 'metaclass':
-                self.level= dictLevel['Metaclass'][1]['metaclass']
+                self.level = rule(self, 'Metaclass', 'metaclass')
                 self.clase += (" Metaclass created in the class header --> 'metaclass = '"
                     + i.value.id)
     #-- As an attribute, 2.X
     elif pos == 'atrib':
-        self.level= dictLevel['Metaclass'][2]['__metaclass__']
+        self.level = rule(self, 'Metaclass', '__metaclass__')
         self.clase = ('Metaclass (2.X) created as attribute with --> __metaclass__')
 
 
 def level_Slots(self):
     """ __slots__ level. """
-    self.level= dictLevel['Slots'][0]['__slots__']
+    self.level = rule(self, 'Slots', '__slots__')
     self.clase = ('Attribute  statements __slots__')
 
 
 def level_SuperFunction(self):
     """ Super built-in function level. """
-    self.level= dictLevel['SuperFunction'][0]['simple']
+    self.level = rule(self, 'SuperFunction', 'simple')
     self.clase = ('Super Function')
 
 
@@ -646,32 +664,71 @@ def level_Try(self):
     """ try level. """
     self.clase = ('Exception --> try')
     if any(isinstance(stmt, ast.Try) for stmt in self.node.body):
-        self.level = dictLevel['Exception'][2]['try/try']
+        self.level = rule(self, 'Exception', 'try/try')
         self.clase += ('/try')
     if (self.node.handlers) != []:
-        self.level= dictLevel['Exception'][0]['try/except']
+        self.level = rule(self, 'Exception', 'try/except')
         self.clase += ('/except')
     if (self.node.orelse) != []:
-        self.level= dictLevel['Exception'][1]['try/else/except']
+        self.level = rule(self, 'Exception', 'try/else/except')
         self.clase += ('/else')
     if (self.node.finalbody) != []:
-        self.level= dictLevel['Exception'][4]['try/except/finally']
+        self.level = rule(self, 'Exception', 'try/except/finally')
         self.clase += ('/finally')
 
 
 def level_Raise(self):
     """ raise level. """
-    self.level= dictLevel['Exception'][6]['raise']
+    self.level = rule(self, 'Exception', 'raise')
     self.clase = ("'raise' exception")
 
 
 def level_Assert(self):
     """ assert level. """
-    self.level= dictLevel['Exception'][7]['assert']
+    self.level = rule(self, 'Exception', 'assert')
     self.clase = ("'assert' exception")
 
 
 def level_With(self):
     """ with level. """
-    self.level= dictLevel['With'][0]['simple']
+    self.level = rule(self, 'With', 'simple')
     self.clase = ('With')
+
+
+#-- Loop elements handlers: node type -> handler
+LOOP_HANDLERS = {
+    ast.While: level_While,
+    ast.Break: level_Break,
+    ast.Continue: level_Continue,
+    ast.Pass: level_Pass,
+    ast.For: level_For,
+}
+
+#-- Handler dispatch: node type -> handler
+HANDLERS = {
+    ast.List: level_List,
+    ast.ListComp: level_ListComp,
+    ast.Dict: level_Dict,
+    ast.DictComp: level_DictComp,
+    ast.Tuple: level_Tuple,
+    ast.Call: type_Call,
+    ast.Assign: level_Assign,
+    ast.AugAssign: level_Assign,
+    ast.If: level_If,
+    ast.IfExp: level_If,
+    ast.FunctionDef: level_FunctionDef,
+    ast.Return: level_Return,
+    ast.Lambda: level_Lambda,
+    ast.Yield: level_GeneratorFunct,
+    ast.GeneratorExp: level_GeneratorExpr,
+    ast.Import: level_Module,
+    ast.ImportFrom: level_Module,
+    ast.ClassDef: level_Class,
+    ast.Attribute: level_Attribute,
+    ast.Name: typeName,
+    ast.Try: level_Try,
+    ast.Raise: level_Raise,
+    ast.Assert: level_Assert,
+    ast.With: level_With,
+}
+HANDLERS.update(LOOP_HANDLERS)
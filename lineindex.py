@@ -0,0 +1,170 @@
+#-- LINE TO ELEMENT INTERVAL INDEX FOR EDITOR LOOKUPS
+
+import json
+import os
+from array import array
+
+from ClassIterTree import CLASS_ID_TABLE, LEVEL_TABLE
+
+#-- Index written next to data.csv by every run
+INDEX_FILE = 'line_index.json'
+#-- Format of the index file
+VERSION = 1
+#-- Positions are integer keys: line * COLUMNS + column
+COLUMNS = 1 << 16
+#-- Subtrees of at most 2 ** (LEAF_LEVEL + 1) nodes are scanned in order
+LEAF_LEVEL = 3
+
+
+def position(line, col):
+    """ Integer key of a line and column. """
+    return line * COLUMNS + min(max(col, 0), COLUMNS - 1)
+
+
+def element_Rows(result):
+    """ Elements of a file result sorted by start: class, class ID, level,
+    start line, end line, displacement. """
+    class_ids = CLASS_ID_TABLE.values
+    level_values = LEVEL_TABLE.values
+    rows = [[clase, class_ids[class_id], level_values[level],
+             start, end, offset]
+            for clase, class_id, level, start, end, offset in zip(
+                result.classes, result.class_ids, result.levels,
+                result.starts, result.ends, result.offsets)]
+    rows.sort(key=lambda row: (row[3], row[5]))
+    return rows
+
+
+class LineIndex():
+    """ Implicit interval tree over the elements of one file.
+
+    The elements are sorted by start; node i of the tree is element i and
+    maxes[i] is the largest end in its subtree, so a lookup only visits the
+    subtrees that can reach the position.
+    """
+
+    __slots__ = ('rows', 'starts', 'ends', 'maxes', 'level')
+
+    def __init__(self, rows):
+        """ Class constructor, from rows sorted by start. """
+        self.rows = rows
+        self.starts = array('q', [position(row[3], row[5]) for row in rows])
+        #-- The end column is not recorded: an element covers its last line
+        self.ends = array('q', [(max(row[4], row[3]) + 1) * COLUMNS
+                                for row in rows])
+        self.maxes = array('q', self.ends)
+        self.level = self.build()
+
+    @classmethod
+    def from_Result(cls, result):
+        """ Index of a file result. """
+        return cls(element_Rows(result))
+
+    def build(self):
+        """ Fill the subtree maxima bottom-up; the level of the root. """
+        n = len(self.starts)
+        if n == 0:
+            return -1
+        maxes = self.maxes
+        #-- Leaves are the even nodes; track the rightmost node of the tree
+        last_i = (n - 1) & ~1
+        last = maxes[last_i]
+        k = 1
+        while 1 << k <= n:
+            x = 1 << (k - 1)
+            for i in range((x << 1) - 1, n, x << 2):
+                right = maxes[i + x] if i + x < n else last
+                maxes[i] = max(maxes[i], maxes[i - x], right)
+            last_i = last_i - x if last_i >> k & 1 else last_i + x
+            if last_i < n and maxes[last_i] > last:
+                last = maxes[last_i]
+            k += 1
+        return k - 1
+
+    def overlaps(self, st, en):
+        """ Nodes whose interval overlaps [st, en), in start order. """
+        starts, ends, maxes = self.starts, self.ends, self.maxes
+        n = len(starts)
+        found = []
+        if n == 0:
+            return found
+        stack = [(self.level, (1 << self.level) - 1, False)]
+        while stack:
+            k, x, left_done = stack.pop()
+            if k <= LEAF_LEVEL:
+                #-- Small subtree: scan it
+                i = x >> k << k
+                stop = min(i + (1 << (k + 1)) - 1, n)
+                while i < stop and starts[i] < en:
+                    if st < ends[i]:
+                        found.append(i)
+                    i += 1
+            elif not left_done:
+                stack.append((k, x, True))
+                left = x - (1 << (k - 1))
+                if left >= n or maxes[left] > st:
+                    stack.append((k - 1, left, False))
+            elif x < n and starts[x] < en:
+                if st < ends[x]:
+                    found.append(x)
+                stack.append((k - 1, x + (1 << (k - 1)), False))
+        return found
+
+    def lookup(self, line, col=None):
+        """ Elements covering a line, or a column of it, outermost first. """
+        if col is None:
+            st, en = line * COLUMNS, (line + 1) * COLUMNS
+        else:
+            st = position(line, col)
+            en = st + 1
+        rows = self.rows
+        return [{'Class': rows[i][0], 'Class ID': rows[i][1],
+                 'Level': rows[i][2], 'Start Line': rows[i][3],
+                 'End Line': rows[i][4], 'Displacement': rows[i][5]}
+                for i in self.overlaps(st, en)]
+
+
+def save_Index(results, path=INDEX_FILE):
+    """ Write the sorted elements of each analyzed file. """
+    files = {os.path.abspath(result.abs_path): element_Rows(result)
+             for result in results}
+    with open(path, 'w') as f:
+        json.dump({'version': VERSION, 'files': files}, f)
+
+
+#-- Loaded index: absolute path -> LineIndex, or its rows until first used
+indexes = {}
+#-- Index file and modification time the loaded index comes from
+loaded = None
+
+
+def load_Index(path=INDEX_FILE):
+    """ Load the index file unless it is already loaded and unchanged. """
+    global loaded
+    try:
+        stamp = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+    except OSError:
+        indexes.clear()
+        loaded = None
+        return
+    if stamp == loaded:
+        return
+    with open(path) as f:
+        data = json.load(f)
+    indexes.clear()
+    if data.get('version') == VERSION:
+        indexes.update(data['files'])
+    loaded = stamp
+
+
+def lookup(path, line, col=None, index_file=INDEX_FILE):
+    """ CEFR elements covering a line (or line and column) of a file. """
+    load_Index(index_file)
+    key = os.path.abspath(path)
+    index = indexes.get(key)
+    if index is None:
+        return []
+    if not isinstance(index, LineIndex):
+        #-- Files are indexed on their first lookup
+        index = indexes[key] = LineIndex(index)
+    return index.lookup(line, col)
@@ -0,0 +1,498 @@
+#-- LANGUAGE SERVER: CEFR LEVELS OF THE OPEN BUFFERS OVER STDIO
+
+import ast
+import bisect
+import functools
+import json
+import os
+import re
+import sys
+
+from ClassIterTree import FileAnalyzer
+from lineindex import LineIndex, COLUMNS, element_Rows
+
+#-- Levels in increasing order
+LEVELS = ('A1', 'A2', 'B1', 'B2', 'C1', 'C2')
+#-- Elements of at least this level are published as diagnostics
+#-- (initializationOptions 'diagnosticLevel'; None publishes none)
+DIAGNOSTIC_LEVEL = 'C1'
+#-- LSP constants
+SYNC_INCREMENTAL = 2
+SEVERITY_HINT = 4
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+#-- Handler exceptions caused by missing or malformed params
+PARAMS_ERRORS = (KeyError, IndexError, TypeError, ValueError)
+#-- Syntax errors that the text after a re-parsed region may fix
+OPEN_ERRORS = re.compile(r'never closed|unterminated|EOF')
+
+
+@functools.lru_cache(maxsize=None)
+def level_Rank(level):
+    """ Rank of a level; composite levels such as 'B1C1' take the highest. """
+    ranks = [LEVELS.index(level[i:i + 2]) for i in range(0, len(level), 2)
+             if level[i:i + 2] in LEVELS]
+    return max(ranks, default=-1)
+
+
+def utf16_Index(line, character):
+    """ Index in a str of an LSP (UTF-16) character offset. """
+    if line.isascii():
+        return character
+    units = 0
+    for i, char in enumerate(line):
+        if units >= character:
+            return i
+        units += 2 if ord(char) > 0xFFFF else 1
+    return len(line)
+
+
+def utf16_Length(text):
+    """ Length of a str in UTF-16 code units. """
+    if text.isascii():
+        return len(text)
+    return len(text.encode('utf-16-le')) // 2
+
+
+def byte_Column(line, character):
+    """ UTF-8 column (as in ast col_offset) of an LSP character offset. """
+    if line.isascii():
+        return character
+    return len(line[:utf16_Index(line, character)].encode('utf-8'))
+
+
+def lsp_Column(line, offset):
+    """ LSP character offset of a UTF-8 column. """
+    if line.isascii():
+        return offset
+    return utf16_Length(line.encode('utf-8')[:offset].decode('utf-8',
+                                                             'ignore'))
+
+
+class Segment():
+    """ A top-level statement and its elements, lines relative to its start. """
+
+    __slots__ = ('start', 'end', 'key', 'rows')
+
+    def __init__(self, start, end, key, rows):
+        """ Class constructor. """
+        self.start = start
+        self.end = end
+        self.key = key
+        self.rows = rows
+
+
+class Document():
+    """ An open buffer analyzed one top-level statement at a time. """
+
+    def __init__(self, uri, text, version=0):
+        """ Class constructor. """
+        self.uri = uri
+        self.path = uri_Path(uri)
+        self.version = version
+        self.lines = text.split('\n')
+        self.segments = []
+        #-- Statement source -> its relative rows, for the current segments
+        self.cache = {}
+        #-- Changed lines not analyzed yet: (first, last), 1-based
+        self.dirty = None
+        self.index = None
+        #-- Statements sent through the rules by the last analysis
+        self.classified = 0
+        self.error = None
+        self.analyze_All()
+
+    def text(self):
+        """ Current content of the buffer. """
+        return '\n'.join(self.lines)
+
+    def apply_Change(self, change):
+        """ Apply one contentChanges entry of didChange. """
+        if 'range' not in change:
+            self.lines = change['text'].split('\n')
+            self.segments = []
+            self.dirty = (1, len(self.lines))
+            return
+        start, end = change['range']['start'], change['range']['end']
+        first, last = start['line'], end['line']
+        while len(self.lines) <= last:
+            self.lines.append('')
+        head = self.lines[first]
+        tail = self.lines[last]
+        new = (head[:utf16_Index(head, start['character'])] + change['text']
+               + tail[utf16_Index(tail, end['character']):]).split('\n')
+        self.lines[first:last + 1] = new
+        self.index = None
+        #-- 1-based lines: old [first + 1, last + 1] became new ones
+        a, b = first + 1, last + 1
+        delta = len(new) - (b - a + 1)
+        lo, hi = a, a + len(new) - 1
+        segments = []
+        for segment in self.segments:
+            if segment.end < a:
+                segments.append(segment)
+            elif segment.start > b:
+                segment.start += delta
+                segment.end += delta
+                segments.append(segment)
+            else:
+                lo = min(lo, segment.start)
+                hi = max(hi, segment.end + delta)
+        self.segments = segments
+        if self.dirty is not None:
+            old_lo, old_hi = self.dirty
+            if old_lo > b:
+                old_lo += delta
+            if old_hi > b:
+                old_hi += delta
+            lo, hi = min(lo, old_lo), max(hi, old_hi)
+        self.dirty = (max(1, lo), min(max(hi, lo), len(self.lines)))
+
+    def analyze_All(self):
+        """ Parse the whole buffer; False if it does not parse. """
+        try:
+            tree = ast.parse(self.text())
+        except (SyntaxError, ValueError, RecursionError, MemoryError) as e:
+            self.error = e
+            return False
+        self.segments = self.make_Segments(tree.body)
+        self.finish()
+        return True
+
+    def analyze_Changes(self):
+        """ Re-parse only the changed statements and their neighbours. """
+        if self.dirty is None:
+            return True
+        lo, hi = self.dirty
+        before = [s for s in self.segments if s.end < lo]
+        after = [s for s in self.segments if s.start > hi]
+        #-- The neighbours absorb edits that join or split statements
+        first = before[-1].start if before else 1
+        while before and before[-1].end >= first:
+            before.pop()
+        last = after[0].end if after else len(self.lines)
+        while after and after[0].start <= last:
+            after.pop(0)
+        try:
+            tree = ast.parse('\n'.join(self.lines[first - 1:last]))
+        except SyntaxError as e:
+            #-- The text before the region parsed and ends a statement, so an
+            #-- error inside it is in the edit; one running into the end of
+            #-- the region (an open bracket or string) may not be
+            if (e.lineno is not None and e.lineno < last - first + 1
+                    and not OPEN_ERRORS.search(e.msg or '')):
+                self.error = e
+                return False
+            return self.analyze_All()
+        except (ValueError, RecursionError, MemoryError):
+            return self.analyze_All()
+        ast.increment_lineno(tree, first - 1)
+        self.segments = before + self.make_Segments(tree.body) + after
+        self.finish()
+        return True
+
+    def make_Segments(self, statements):
+        """ Segments of parsed statements, classifying the new ones only. """
+        segments = []
+        for node in statements:
+            start = min([node.lineno] + [decorator.lineno for decorator in
+                                         getattr(node, 'decorator_list', ())])
+            end = node.end_lineno
+            key = (node.col_offset, node.end_col_offset,
+                   '\n'.join(self.lines[start - 1:end]))
+            rows = self.cache.get(key)
+            if rows is None:
+                rows = self.classify(node, start)
+            segments.append(Segment(start, end, key, rows))
+        return segments
+
+    def classify(self, node, start):
+        """ Rows of one statement through the rules, relative to its start. """
+        self.classified += 1
+        module = ast.Module(body=[node], type_ignores=[])
+        name = os.path.basename(self.path)
+        result = FileAnalyzer(module, name, os.path.dirname(self.path),
+                              self.path).analyze()
+        rows = element_Rows(result)
+        for row in rows:
+            row[3] -= start
+            row[4] -= start
+        return rows
+
+    def finish(self):
+        """ Keep the cache of the current statements only. """
+        self.cache = {segment.key: segment.rows for segment in self.segments}
+        self.dirty = None
+        self.index = None
+        self.error = None
+
+    def rows(self):
+        """ Elements with absolute lines, sorted by start. """
+        rows = []
+        for segment in self.segments:
+            start = segment.start
+            rows.extend([clase, class_id, level, line + start, end + start,
+                         offset]
+                        for clase, class_id, level, line, end, offset
+                        in segment.rows)
+        rows.sort(key=lambda row: (row[3], row[5]))
+        return rows
+
+    def line_Index(self):
+        """ Interval index of the elements, built when first needed. """
+        if self.index is None:
+            self.index = LineIndex(self.rows())
+        return self.index
+
+    def line(self, number):
+        """ Text of a 1-based line. """
+        if 1 <= number <= len(self.lines):
+            return self.lines[number - 1]
+        return ''
+
+    def diagnostics(self, threshold):
+        """ Elements of at least the threshold level, as LSP diagnostics. """
+        if threshold is None:
+            return []
+        rank = level_Rank(threshold)
+        found = []
+        for segment in self.segments:
+            for clase, class_id, level, line, _, offset in segment.rows:
+                if level_Rank(level) < rank:
+                    continue
+                number = line + segment.start
+                text = self.line(number)
+                found.append({
+                    'range': {'start': {'line': number - 1,
+                                        'character': lsp_Column(text, offset)},
+                              'end': {'line': number - 1,
+                                      'character': utf16_Length(text)}},
+                    'severity': SEVERITY_HINT, 'source': 'pycefrl',
+                    'code': class_id, 'message': f'{level}: {clase}'})
+        return found
+
+    def hover(self, line, character):
+        """ Markdown list of the elements covering a position, or None. """
+        number = line + 1
+        column = byte_Column(self.line(number), character)
+        elements = self.line_Index().lookup(number, column)
+        if not elements:
+            return None
+        return '\n'.join(f"- **{e['Level']}** {e['Class']} "
+                         f"(lines {e['Start Line']}-{e['End Line']})"
+                         for e in elements)
+
+    def inlay_Hints(self, first, last):
+        """ The highest level of the elements starting on each line. """
+        index = self.line_Index()
+        hints = []
+        i = bisect.bisect_left(index.starts, (first + 1) * COLUMNS)
+        rows = index.rows
+        while i < len(rows) and rows[i][3] <= last + 1:
+            number = rows[i][3]
+            line_rows = []
+            while i < len(rows) and rows[i][3] == number:
+                line_rows.append(rows[i])
+                i += 1
+            top = max(line_rows, key=lambda row: level_Rank(row[2]))
+            text = self.line(number)
+            hints.append({
+                'position': {'line': number - 1,
+                             'character': utf16_Length(text)},
+                'label': top[2], 'paddingLeft': True,
+                'tooltip': '\n'.join(f'{row[2]}: {row[0]}'
+                                     for row in line_rows)})
+        return hints
+
+
+def uri_Path(uri):
+    """ File path of a file:// URI (the URI itself for other schemes). """
+    from urllib.parse import unquote, urlparse
+    parsed = urlparse(uri)
+    if parsed.scheme != 'file':
+        return uri
+    return unquote(parsed.path)
+
+
+class Server():
+    """ JSON-RPC over stdio with Content-Length framing. """
+
+    def __init__(self, reader=None, writer=None, log=None):
+        """ Class constructor. """
+        self.reader = reader or sys.stdin.buffer
+        self.writer = writer or sys.stdout.buffer
+        #-- Failed notifications are reported here; stdout is the protocol
+        self.log = log or sys.stderr
+        self.documents = {}
+        self.threshold = DIAGNOSTIC_LEVEL
+        self.shutdown = False
+        self.handlers = {
+            'initialize': self.initialize,
+            'shutdown': self.on_Shutdown,
+            'textDocument/didOpen': self.did_Open,
+            'textDocument/didChange': self.did_Change,
+            'textDocument/didClose': self.did_Close,
+            'textDocument/hover': self.on_Hover,
+            'textDocument/inlayHint': self.on_Inlay_Hint,
+        }
+
+    def read_Message(self):
+        """ Next message, or None at the end of the input. """
+        length = None
+        while True:
+            header = self.reader.readline()
+            if not header:
+                return None
+            header = header.strip()
+            if not header:
+                break
+            name, _, value = header.decode('ascii').partition(':')
+            if name.lower() == 'content-length':
+                length = int(value)
+        if length is None:
+            return {}
+        return json.loads(self.reader.read(length))
+
+    def send(self, message):
+        """ Write one framed message. """
+        body = json.dumps(message, ensure_ascii=False).encode('utf-8')
+        self.writer.write(b'Content-Length: %d\r\n\r\n' % len(body) + body)
+        self.writer.flush()
+
+    def notify(self, method, params):
+        """ Send a notification. """
+        self.send({'jsonrpc': '2.0', 'method': method, 'params': params})
+
+    def error(self, id, code, message):
+        """ Send an error reply. """
+        self.send({'jsonrpc': '2.0', 'id': id,
+                   'error': {'code': code, 'message': message}})
+
+    def run(self):
+        """ Serve until exit; the process exit code. """
+        while True:
+            try:
+                message = self.read_Message()
+            except ValueError as e:
+                self.error(None, PARSE_ERROR, str(e))
+                continue
+            if message is None:
+                return 1
+            if not isinstance(message, dict):
+                self.error(None, INVALID_REQUEST, 'message is not an object')
+                continue
+            method = message.get('method')
+            if method == 'exit':
+                return 0 if self.shutdown else 1
+            handler = self.handlers.get(method)
+            if 'id' not in message:
+                #-- Notifications get no answer, unknown ones are ignored
+                if handler is not None:
+                    self.call(handler, method, message)
+                continue
+            if handler is None:
+                self.error(message['id'], METHOD_NOT_FOUND,
+                           f'unknown method {method}')
+            elif self.shutdown:
+                self.error(message['id'], INVALID_REQUEST,
+                           'server is shutting down')
+            else:
+                self.call(handler, method, message)
+
+    def call(self, handler, method, message):
+        """ Run a handler; a failure is answered or logged, never fatal. """
+        try:
+            result = handler(message.get('params') or {})
+        except Exception as e:
+            text = f'{method} failed: {type(e).__name__}: {e}'
+            if 'id' not in message:
+                print(f'pycefrl: {text}', file=self.log, flush=True)
+                return
+            code = (INVALID_PARAMS if isinstance(e, PARAMS_ERRORS)
+                    else INTERNAL_ERROR)
+            self.error(message['id'], code, text)
+            return
+        if 'id' in message:
+            self.send({'jsonrpc': '2.0', 'id': message['id'],
+                       'result': result})
+
+    def initialize(self, params):
+        """ Capabilities of the server. """
+        options = params.get('initializationOptions') or {}
+        threshold = options.get('diagnosticLevel', self.threshold)
+        if threshold is not None and (not isinstance(threshold, str)
+                                      or level_Rank(threshold) < 0):
+            raise ValueError(f'unknown diagnosticLevel {threshold!r}')
+        self.threshold = threshold
+        return {'capabilities': {
+                    'textDocumentSync': {'openClose': True,
+                                         'change': SYNC_INCREMENTAL},
+                    'hoverProvider': True,
+                    'inlayHintProvider': True},
+                'serverInfo': {'name': 'pycefrl'}}
+
+    def on_Shutdown(self, params):
+        """ Stop answering requests; exit follows. """
+        self.shutdown = True
+        return None
+
+    def publish(self, document):
+        """ Send the diagnostics of a document. """
+        self.notify('textDocument/publishDiagnostics',
+                    {'uri': document.uri, 'version': document.version,
+                     'diagnostics': document.diagnostics(self.threshold)})
+
+    def did_Open(self, params):
+        """ Analyze a newly opened buffer. """
+        item = params['textDocument']
+        document = Document(item['uri'], item['text'], item.get('version', 0))
+        self.documents[item['uri']] = document
+        if document.error is None:
+            self.publish(document)
+
+    def did_Change(self, params):
+        """ Apply the edits and re-analyze the changed statements. """
+        document = self.documents.get(params['textDocument']['uri'])
+        if document is None:
+            return
+        for change in params['contentChanges']:
+            document.apply_Change(change)
+        document.version = params['textDocument'].get('version')
+        #-- While the buffer does not parse the last results are kept
+        if document.analyze_Changes():
+            self.publish(document)
+
+    def did_Close(self, params):
+        """ Forget a buffer and clear its diagnostics. """
+        uri = params['textDocument']['uri']
+        if self.documents.pop(uri, None) is not None:
+            self.notify('textDocument/publishDiagnostics',
+                        {'uri': uri, 'diagnostics': []})
+
+    def on_Hover(self, params):
+        """ Elements covering the hovered position. """
+        document = self.documents.get(params['textDocument']['uri'])
+        if document is None:
+            return None
+        position = params['position']
+        value = document.hover(position['line'], position['character'])
+        if value is None:
+            return None
+        return {'contents': {'kind': 'markdown', 'value': value}}
+
+    def on_Inlay_Hint(self, params):
+        """ Level hints of the requested lines. """
+        document = self.documents.get(params['textDocument']['uri'])
+        if document is None:
+            return []
+        visible = params['range']
+        return document.inlay_Hints(visible['start']['line'],
+                                    visible['end']['line'])
+
+
+def serve():
+    """ Run the language server on stdin and stdout. """
+    return Server().run()
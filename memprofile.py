@@ -0,0 +1,132 @@
+#-- TRACEMALLOC MEMORY ACCOUNTING PER STAGE AND PER FILE
+
+import json
+import tracemalloc
+
+import tracing
+
+#-- Stages whose memory is reported; 'file' spans go to the file ledger
+STAGES = ('discovery', 'write_outputs', 'aggregate', 'csv_split', 'analysis')
+#-- Frames kept per allocation; one is enough to name the allocation site
+FRAMES = 1
+
+
+class MemoryProfiler():
+    """ Observer of the tracing spans measuring traced memory. """
+
+    def __init__(self):
+        """ Class constructor. """
+        #-- Open spans: [traced bytes at start, peak bytes since start]
+        self.stack = []
+        self.peak = 0
+        self.stages = []
+        self.files = []
+        #-- Largest snapshot taken at a stage boundary
+        self.snapshot = None
+        self.snapshot_size = -1
+
+    def fold_Peak(self):
+        """ Charge the peak since the last reset to every open span. """
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self.peak = max(self.peak, peak)
+        for entry in self.stack:
+            entry[1] = max(entry[1], peak)
+        return current
+
+    def take_Snapshot(self):
+        """ Keep the snapshot holding the most memory. """
+        current = tracemalloc.get_traced_memory()[0]
+        if current > self.snapshot_size:
+            self.snapshot = tracemalloc.take_snapshot()
+            self.snapshot_size = current
+
+    def span_Start(self, span):
+        """ A stage starts. """
+        current = self.fold_Peak()
+        self.stack.append([current, current])
+        if span.name == 'write_outputs':
+            #-- Every result is held in memory at this point
+            self.take_Snapshot()
+
+    def span_End(self, span):
+        """ A stage ends: record its peak and retained memory. """
+        current = self.fold_Peak()
+        start, peak = self.stack.pop()
+        if span.name == 'file':
+            self.files.append({'path': span.args.get('path'),
+                               'size': span.args.get('size'),
+                               'peak': peak - start,
+                               'retained': current - start})
+        elif span.name in STAGES:
+            self.stages.append({'stage': span.name, 'peak': peak,
+                                'start': start, 'end': current})
+            self.take_Snapshot()
+
+    def top_Sites(self, top=10):
+        """ Allocation sites holding the most memory in the largest snapshot. """
+        if self.snapshot is None:
+            return []
+        stats = self.snapshot.statistics('lineno')[:top]
+        return [{'site': f'{stat.traceback[0].filename}:'
+                         f'{stat.traceback[0].lineno}',
+                 'size': stat.size, 'count': stat.count} for stat in stats]
+
+    def summary(self, top=10):
+        """ Machine-readable results, sizes in bytes. """
+        files = sorted(self.files, key=lambda row: row['peak'], reverse=True)
+        return {'peak': self.peak, 'stages': self.stages,
+                'files': files[:top], 'top_sites': self.top_Sites(top)}
+
+
+#-- Profiler of the current run, None when the mode is off
+profiler = None
+
+
+def enable():
+    """ Start tracemalloc and measure every stage span. """
+    global profiler
+    if profiler is not None and profiler in tracing.observers:
+        return
+    profiler = MemoryProfiler()
+    tracemalloc.start(FRAMES)
+    tracing.observe(profiler)
+
+
+def disable():
+    """ Stop measuring; the results stay available until the next enable(). """
+    if profiler is None or profiler not in tracing.observers:
+        return
+    tracing.unobserve(profiler)
+    tracemalloc.stop()
+
+
+def kib(size):
+    """ Bytes as KiB text. """
+    return f'{size / 1024:.1f} KiB'
+
+
+def report(top=10):
+    """ Text report of the stages, the costliest files and allocation sites. """
+    summary = profiler.summary(top)
+    lines = ['=====================================',
+             'MEMORY PROFILE (traced by tracemalloc):',
+             f"Peak: {kib(summary['peak'])}",
+             f"{'stage':<16}{'peak':>14}{'at end':>14}"]
+    for row in summary['stages']:
+        lines.append(f"{row['stage']:<16}{kib(row['peak']):>14}"
+                     f"{kib(row['end']):>14}")
+    lines.append(f'FILES WITH THE HIGHEST PEAK (top {top}):')
+    for row in summary['files']:
+        lines.append(f"{kib(row['peak']):>14}  {row['path']}")
+    lines.append('TOP ALLOCATION SITES:')
+    for row in summary['top_sites']:
+        lines.append(f"{kib(row['size']):>14}{row['count']:>9}  {row['site']}")
+    lines.append('=====================================')
+    return '\n'.join(lines)
+
+
+def save_Report(path='memprofile.json', top=10):
+    """ Write the summary as JSON, e.g. to check a memory budget in CI. """
+    with open(path, 'w') as f:
+        json.dump(profiler.summary(top), f, indent=4)
@@ -3,14 +3,26 @@
 import ast
 import os
 import csv
-from ClassIterTree import IterTree
+import hashlib
+import itertools
+from ClassIterTree import FileAnalyzer, FileResult, Budget
 from getjson import read_Json
-from getcsv import read_FileCsv
+from getcsv import read_FileCsv, write_FileCsv, CSV_HEADER
 import sys
+import argparse
+import checkpoint
 import shlex, subprocess
 import json
-import requests
+import lineindex
+import dirtree
+import threading
+import time
 from datetime import datetime
+import events
+import getjson
+import discovery
+import ruleprofile
+import tracing
 
 #-- Create lists of each attribute
 Literals = ['ast.List', 'ast.Tuple', 'ast.Dict']
@@ -28,14 +40,73 @@ FunctionsClass = ['ast.FunctionDef', 'ast.Lambda', 'ast.Return', 'ast.Yield',
 SetClass = [Literals, Variables, Expressions, Comprehensions, Statements,
             Imports, ControlFlow, FunctionsClass]
 
-#-- Global storage for results
-global_csv_rows = []
-global_json_data = {}
+#-- Global storage for results: one compact FileResult per analyzed file
+global_results = []
+
+#-- Report of the files analyzed, restored and failed, next to the outputs
+RUN_SUMMARY_FILE = 'run_summary.json'
+#-- Files that could not be analyzed: path, error type and message
+global_errors = []
+#-- Files beyond their budget: path, limit, measured value and action
+global_limited = []
+#-- Per-file limits of the run (a Budget), None for no limits
+file_budget = None
+#-- Outcome of process_File for one file
+ANALYZED = 'analyzed'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+#-- Result of each distinct file content (hash -> FileResult) in this run
+blob_results = {}
+#-- Files whose content was already analyzed, and their bytes
+duplicate_files = 0
+duplicate_bytes = 0
+#-- Filter of generated and vendored code for the directory walks
+discovery_filter = discovery.Filter()
+#-- Sampling settings of a --sample run (None = every file), and its estimate
+sample_options = None
+sample_report = None
+#-- Time limit of the whole run (seconds), its end on the perf_counter clock,
+#-- and whether the run stopped at it with files left
+deadline_seconds = None
+run_deadline = None
+deadline_hit = False
+#-- Journal of the completed files (--checkpoint or --resume runs only), and
+#-- the files restored by --resume
+run_checkpoint = None
+completed_paths = set()
+
+#-- The daemon, watch, sample, lsp and memory profile modules are only
+#-- imported by the modes using them; --host and --port default to those
+#-- of daemon.py
 
 #-- Global counters for progress tracking
 total_files_found = 0
 files_processed = 0
 
+#-- Output settings: 'text' or 'ndjson' events, and per-file messages
+output_events = 'text'
+quiet = False
+#-- Human readable output is flushed at most once per interval (seconds)
+FLUSH_INTERVAL = 0.5
+last_flush = 0.0
+
+#-- Only one in-process analysis may use the global storage at a time
+analysis_lock = threading.Lock()
+
+def log(message, per_file=False, force=False):
+    """ Print a progress message for humans. """
+    global last_flush
+    if per_file and quiet:
+        return
+    #-- Keep stdout clean for machine-readable events
+    stream = sys.stderr if output_events == 'ndjson' else sys.stdout
+    print(message, file=stream)
+    now = time.monotonic()
+    if force or now - last_flush >= FLUSH_INTERVAL:
+        stream.flush()
+        last_flush = now
+
+
 def choose_option():
     """ Choose option. """
     global total_files_found, files_processed
@@ -45,12 +116,17 @@ def choose_option():
     
     if type_option == 'directory':
         repo = option.split('/')[-1]
+        if sample_options is not None:
+            run_Sample(option, repo)
+            return
+        if run_deadline is not None:
+            run_Deadline(option, repo)
+            return
         # Count files before processing
-        print('🔍 Counting Python files...')
-        sys.stdout.flush()
+        log('🔍 Counting Python files...')
         total_files_found = count_python_files(option)
-        print(f'📊 Found {total_files_found} Python file(s) to analyze')
-        sys.stdout.flush()
+        log(f'📊 Found {total_files_found} Python file(s) to analyze')
+        events.emit(events.DISCOVERED, total=total_files_found)
         read_Directory(option, repo)
     elif type_option == 'file':
         # Single file analysis
@@ -61,10 +137,11 @@ def choose_option():
         abs_path = os.path.abspath(option)
         file_name = os.path.basename(option)
         repo = os.path.dirname(abs_path)
-        print(f'📄 Analyzing single file: {file_name}')
-        sys.stdout.flush()
+        log(f'📄 Analyzing single file: {file_name}')
         total_files_found = 1
-        read_File(abs_path, repo)
+        events.emit(events.DISCOVERED, total=total_files_found)
+        files_processed = 1
+        process_File(abs_path, repo)
     elif type_option == 'repo-url':
         request_url()
     elif type_option == 'user':
@@ -105,8 +182,9 @@ def check_lenguage(url, protocol, type_git, user, repo):
     #-- Create the url of the api
     repo_url = (protocol + "://api." + type_git + "/repos/" + user + "/" +
                  repo + "/languages")
-    print("Analyzing repository languages...")
-    sys.stdout.flush()
+    log("Analyzing repository languages...")
+    #-- Network modules are only needed by the GitHub modes
+    import requests
     # Get content
     r = requests.get(repo_url)
     # Decode JSON response into a Python dict:
@@ -117,8 +195,7 @@ def check_lenguage(url, protocol, type_git, user, repo):
     content = r.json()
     #-- Get used languages and their quantity
     for key in content.keys():
-        print(key + ": " + str(content[key]))
-        sys.stdout.flush()
+        log(key + ": " + str(content[key]))
         if key == 'Python':
             python_leng = True
             python_quantity = content[key]
@@ -129,27 +206,23 @@ def check_lenguage(url, protocol, type_git, user, repo):
     if python_leng == True:
         amount = total_elem/2
         if python_quantity >= amount:
-            print('\n✓ Python 50% OK')
-            sys.stdout.flush()
+            log('\n✓ Python 50% OK')
             #-- Clone the repository
             run_url(url)
         else:
-            print('\n✗ The repository does not contain 50% of the Python.')
-            sys.stdout.flush()
+            log('\n✗ The repository does not contain 50% of the Python.')
 
 
 def run_url(url):
     """ Run url. """
     command_line = "git clone " + url
-    print('⏳ Cloning repository...')
-    sys.stdout.flush()
+    log('⏳ Cloning repository...')
     #print(command_line)
     #-- List everything and separate
     args = shlex.split(command_line)
     #-- Run in the shell the command_line
     subprocess.call(args)
-    print('✓ Repository cloned successfully')
-    sys.stdout.flush()
+    log('✓ Repository cloned successfully')
     get_directory(url)
 
 
@@ -157,9 +230,9 @@ def run_user():
     """ Run user. """
     #-- Create the url of the api
     user_url = ("https://api.github.com/users/"  + option)
-    print(user_url)
-    print("Analyzing user...")
-    sys.stdout.flush()
+    log(user_url)
+    log("Analyzing user...")
+    import requests
     try:
         #-- Extract headers
         headers = requests.get(user_url)
@@ -169,16 +242,14 @@ def run_user():
         repo_url = content["repos_url"]
     except KeyError:
         sys.exit('An unavailable user has been entered')
-    print("Analyzing repositories...")
-    sys.stdout.flush()
+    log("Analyzing repositories...")
     #-- Extract repository names
     names = requests.get(repo_url)
     #-- Decode JSON response into a Python dict:
     content = names.json()
     #-- Show repository names
     for repository in content:
-        print('\nRepository: ' + str(repository["name"]))
-        sys.stdout.flush()
+        log('\nRepository: ' + str(repository["name"]))
         url = ("https://github.com/" + option + "/" + repository["name"])
         check_lenguage(url, 'https', 'github.com', option, repository["name"])
 
@@ -192,7 +263,7 @@ def get_directory(url):
     #-- Remove extension .git
     if ('.git' in str(name_directory)):
         name_directory = name_directory[0:-4]
-    print("The directory is: " + name_directory)
+    log("The directory is: " + name_directory)
     get_path(name_directory)
 
 
@@ -201,19 +272,18 @@ def get_path(name_directory):
     global total_files_found
     
     absFilePath = os.path.abspath(name_directory)
+    discovery_filter.root = absFilePath
     #-- Check if the last element is a file.py
     fichero = absFilePath.split('/')[-1]
     if fichero.endswith('.py'):
         absFilePath = absFilePath.replace("/" + fichero,"" )
-    print("This script absolute path is ", absFilePath)
-    sys.stdout.flush()
+    log("This script absolute path is " + absFilePath)
     
     # Count files before processing
-    print('🔍 Counting Python files...')
-    sys.stdout.flush()
+    log('🔍 Counting Python files...')
     total_files_found = count_python_files(absFilePath)
-    print(f'📊 Found {total_files_found} Python file(s) to analyze')
-    sys.stdout.flush()
+    log(f'📊 Found {total_files_found} Python file(s) to analyze')
+    events.emit(events.DISCOVERED, total=total_files_found)
     
     read_Directory(absFilePath, name_directory)
 
@@ -222,16 +292,23 @@ def count_python_files(absFilePath):
     """ Count total Python files in directory tree. """
     count = 0
     ignore_dirs = ['venv', '.git', '__pycache__']
-    try:
-        for root, dirs, files in os.walk(absFilePath):
-            # Modifying dirs in-place allows os.walk to skip ignored directories
-            dirs[:] = [d for d in dirs if d not in ignore_dirs]
-            for file in files:
-                if file.endswith('.py'):
-                    count += 1
-    except Exception as e:
-        print(f"Error counting files in {absFilePath}: {e}")
-        sys.stdout.flush()
+    with tracing.span('discovery', path=absFilePath) as stage:
+        try:
+            for root, dirs, files in os.walk(absFilePath):
+                # Modifying dirs in-place allows os.walk to skip ignored directories
+                dirs[:] = [d for d in dirs if d not in ignore_dirs
+                           and '.' not in d and not
+                           discovery_filter.directory_Reason(os.path.join(root, d))]
+                for file in files:
+                    if (file.endswith('.py') and not
+                            discovery_filter.file_Reason(os.path.join(root, file))):
+                        count += 1
+        except Exception as e:
+            log(f"Error counting files in {absFilePath}: {e}")
+        stage.set(files=count, excluded=len(discovery_filter.excluded))
+    if discovery_filter.excluded:
+        log(f'🚫 Skipped {len(discovery_filter.excluded)} generated or vendored '
+            f'path(s), see {RUN_SUMMARY_FILE}')
     return count
 
 
@@ -241,165 +318,792 @@ def read_Directory(absFilePath, repo):
     
     try:
         pos = ''
-        print(f'📁 Scanning directory: {absFilePath}')
-        sys.stdout.flush()
+        log(f'📁 Scanning directory: {absFilePath}', per_file=True)
         path = absFilePath
         directory = os.listdir(path)
         
         # Count python files in current directory
         py_files = [f for f in directory if f.endswith('.py')]
         if py_files:
-            print(f'   Found {len(py_files)} Python file(s)')
-            sys.stdout.flush()
+            log(f'   Found {len(py_files)} Python file(s)', per_file=True)
         
         for i in range(0, len(directory)):
+            if past_Deadline():
+                return
+            if (directory[i].endswith('.py') and
+                    discovery_filter.file_Reason(path + "/" + directory[i])):
+                continue
             if directory[i].endswith('.py'):
                 files_processed += 1
-                print(f'📄 [{files_processed}/{total_files_found if total_files_found > 0 else "?"}] Processing: {directory[i]}')
-                sys.stdout.flush()
+                log(f'📄 [{files_processed}/{total_files_found if total_files_found > 0 else "?"}] Processing: {directory[i]}',
+                    per_file=True)
                 pos = path + "/" + directory[i]
-                read_File(pos, repo)
-                print(f'   ✓ Completed: {directory[i]}')
-                sys.stdout.flush()
+                if pos in completed_paths:
+                    log(f'   ↻ Restored from checkpoint: {directory[i]}',
+                        per_file=True)
+                elif process_File(pos, repo) == ANALYZED:
+                    log(f'   ✓ Completed: {directory[i]}', per_file=True)
             elif not ('.') in directory[i] and directory[i] not in ['venv', '.git', '__pycache__']:
                 path2 =  absFilePath + '/' + directory[i]
-                if os.path.isdir(path2):
-                    print(f'\n📂 Entering subdirectory: {directory[i]}')
-                    sys.stdout.flush()
+                if os.path.isdir(path2) and not discovery_filter.directory_Reason(path2):
+                    log(f'\n📂 Entering subdirectory: {directory[i]}',
+                        per_file=True)
                     read_Directory(path2, directory[i])
     except Exception as e:
-        print(f"Error processing {absFilePath}: {e}")
-        sys.stdout.flush()
+        record_Error(absFilePath, e)
+
+
+def build_Manifest(absFilePath, repo, manifest=None):
+    """ The (path, repo) of each file read_Directory analyzes, in its order. """
+    if manifest is None:
+        manifest = []
+    try:
+        directory = os.listdir(absFilePath)
+    except OSError as e:
+        record_Error(absFilePath, e)
+        return manifest
+    for name in directory:
+        path = absFilePath + '/' + name
+        if name.endswith('.py'):
+            if not discovery_filter.file_Reason(path):
+                manifest.append((path, repo))
+        elif enter_Directory(path):
+            build_Manifest(path, name, manifest)
+    return manifest
+
+
+def enter_Directory(path):
+    """ True for a directory read_Directory walks into. """
+    name = os.path.basename(path)
+    return (not '.' in name and name not in ['venv', '.git', '__pycache__']
+            and os.path.isdir(path)
+            and not discovery_filter.directory_Reason(path))
+
+
+def past_Deadline():
+    """ True once the run is over its deadline; later files are left out. """
+    global deadline_hit
+    if run_deadline is None or time.perf_counter() < run_deadline:
+        return False
+    deadline_hit = True
+    return True
+
+
+def round_Robin(manifest):
+    """ Interleave the files of each directory so all are reached early. """
+    directories = {}
+    for path, repo in manifest:
+        directories.setdefault(os.path.dirname(path), []).append((path, repo))
+    ordered = []
+    for files in itertools.zip_longest(*directories.values()):
+        ordered.extend(entry for entry in files if entry is not None)
+    return ordered
+
+
+def run_Deadline(absFilePath, repo):
+    """ Analyze the files round-robin across directories until the deadline. """
+    global total_files_found, files_processed
+    log('🔍 Listing Python files...')
+    with tracing.span('discovery', path=absFilePath) as stage:
+        manifest = build_Manifest(absFilePath, repo)
+        stage.set(files=len(manifest))
+    total_files_found = len(manifest)
+    log(f'📊 Found {total_files_found} Python file(s), '
+        f'{deadline_seconds:g} s to analyze them')
+    events.emit(events.DISCOVERED, total=total_files_found)
+    for pos, file_repo in round_Robin(manifest):
+        if past_Deadline():
+            log(f'⏰ Deadline reached after {files_processed} file(s)',
+                force=True)
+            break
+        files_processed += 1
+        log(f'📄 [{files_processed}/{total_files_found}] Processing: {pos}',
+            per_file=True)
+        if pos in completed_paths:
+            log(f'   ↻ Restored from checkpoint: {pos}', per_file=True)
+        else:
+            process_File(pos, file_repo)
+
+
+def deadline_Summary():
+    """ Deadline of the run and the share of the files it analyzed. """
+    if deadline_seconds is None:
+        return None
+    #-- Files that failed, were skipped or were cut by the deadline are
+    #-- started but not analyzed; skipped ones may still have an empty result
+    incomplete = {limit['path'] for limit in global_limited
+                  if limit['action'] == 'skipped' or limit['limit'] == 'deadline'}
+    analyzed = sum(1 for result in global_results
+                   if result.abs_path not in incomplete)
+    coverage = (analyzed / total_files_found * 100
+                if total_files_found else 100.0)
+    return {'seconds': deadline_seconds, 'partial': deadline_hit,
+            'coverage': round(min(coverage, 100.0), 1)}
+
+
+def run_Sample(absFilePath, repo):
+    """ Analyze a stratified sample of the files until the estimate is precise. """
+    global total_files_found, files_processed, sample_report
+    log('🔍 Listing Python files...')
+    with tracing.span('discovery', path=absFilePath) as stage:
+        manifest = build_Manifest(absFilePath, repo)
+        stage.set(files=len(manifest))
+    total_files_found = len(manifest)
+    events.emit(events.DISCOVERED, total=total_files_found)
+    import sampling
+    sampler = sampling.Sampler(manifest, os.path.abspath(absFilePath),
+                               **sample_options)
+    log(f'🎲 Sampling {total_files_found} Python file(s) in '
+        f'{len(sampler.strata)} strata')
+    reason = None
+    while reason is None:
+        for key, pos, file_repo in sampler.next_Batch():
+            #-- Both time limits are checked before every file
+            reason = 'deadline' if past_Deadline() else sampler.time_Reason()
+            if reason:
+                break
+            files_processed += 1
+            log(f'📄 [{files_processed}] Sampled: {pos}', per_file=True)
+            status = process_File(pos, file_repo)
+            if status == ANALYZED:
+                sampler.add(key, global_results[-1].level_Names())
+            else:
+                #-- Not a file without elements: kept out of the estimate
+                sampler.leave_Out(key, status)
+        else:
+            reason = sampler.stop_Reason()
+    sample_report = sampler.report(reason)
+
+
+def watched_Repo(directory):
+    """ Repository of the files of a watched directory, None if not walked. """
+    root = os.path.abspath(option)
+    relative = os.path.relpath(directory, root)
+    if relative == '.':
+        return option.split('/')[-1]
+    if relative.startswith('..'):
+        return None
+    current = root
+    for name in relative.split(os.sep):
+        current = os.path.join(current, name)
+        if not enter_Directory(current):
+            return None
+    return os.path.basename(directory)
+
+
+def watched_Files(paths, aggregates):
+    """ Changed .py files (path -> repository, None if gone or skipped). """
+    files = {}
+    for path in paths:
+        if os.path.isdir(path):
+            repo = watched_Repo(path)
+            if repo is not None:
+                for pos, file_repo in build_Manifest(path, repo):
+                    files[pos] = file_repo
+        elif path.endswith('.py'):
+            files[path] = None
+            if os.path.isfile(path):
+                repo = watched_Repo(os.path.dirname(path))
+                #-- The content may have gained or lost a generated header
+                discovery_filter.cache.pop(os.path.normpath(path), None)
+                if repo is not None and not discovery_filter.file_Reason(path):
+                    files[path] = repo
+        #-- Files of a removed or moved directory
+        for known in aggregates.under(path):
+            files.setdefault(known, None)
+    return files
+
+
+def update_Watched(paths, aggregates):
+    """ Re-analyze the changed files and update only what they affect. """
+    start = time.perf_counter()
+    files = watched_Files(paths, aggregates)
+    repos = set()
+    for pos, repo in files.items():
+        result = None
+        if repo is not None:
+            try:
+                with open(pos) as fp:
+                    result = analyze_Source(fp.read(), pos, repo)
+            except Exception as e:
+                #-- Counted as a complete run would: not at all
+                record_Error(pos, e)
+        if result is None and pos not in aggregates:
+            continue
+        repos |= aggregates.update(pos, result)
+        if result is not None and len(result):
+            write_FileCsv([CSV_HEADER] + result.csv_Rows(), pos)
+        else:
+            remove_FileCsv(pos, aggregates)
+        events.emit(events.FILE_DONE, file=os.path.basename(pos), path=pos,
+                    repo=repo, index=len(aggregates.files),
+                    elements=len(result) if result is not None else 0,
+                    duration=time.perf_counter() - start)
+    if repos:
+        aggregates.write(repos)
+        log(f'🔄 {len(files)} file(s) updated in '
+            f'{(time.perf_counter() - start) * 1000:.1f} ms', force=True)
+    #-- No summary follows: buffered progress is flushed now
+    events.flush()
+
+
+def csv_Name(path):
+    """ Name of the DATA_CSV file of a .py file. """
+    return os.path.basename(path).split('.py')[0] + '.csv'
+
+
+def remove_FileCsv(pos, aggregates):
+    """ Drop the DATA_CSV file of a file without elements; a tracked file
+    with the same name keeps it, rewritten with its own rows. """
+    name = csv_Name(pos)
+    for path, result in aggregates.results.items():
+        if csv_Name(path) == name:
+            write_FileCsv([CSV_HEADER] + result.csv_Rows(), path)
+            return
+    csv_file = os.path.join('DATA_CSV', name)
+    if os.path.exists(csv_file):
+        os.remove(csv_file)
+
+
+def write_Watched(aggregates):
+    """ Rewrite the outputs covering the whole tree. """
+    global_results[:] = aggregates.results.values()
+    save_collected_data()
+    getjson.write_Total()
+    aggregates.dirty = False
+
+
+def run_Watch(target, quiet_mode=False, budget=None, include=(), exclude=(),
+              skip_generated=True, polling=False, interval=None):
+    """ Analyze a directory, then keep its results current as files change. """
+    import watch
+    if interval is None:
+        interval = watch.POLL_INTERVAL
+    target = os.path.abspath(target.strip())
+    analyze('directory', target, quiet_mode=quiet_mode, budget=budget,
+            include=include, exclude=exclude, skip_generated=skip_generated)
+    aggregates = watch.Aggregates(global_results)
+    watcher = watch.make_Watcher(target, enter_Directory, polling, interval)
+    log(f'👀 Watching {target} ({watcher.kind}), Ctrl+C to stop', force=True)
+    last_write = time.monotonic()
+    try:
+        while True:
+            paths = watcher.changes(watch.FULL_WRITE_SECONDS)
+            with analysis_lock:
+                if paths:
+                    update_Watched(paths, aggregates)
+                if (aggregates.dirty and time.monotonic() - last_write
+                        >= watch.FULL_WRITE_SECONDS):
+                    write_Watched(aggregates)
+                    last_write = time.monotonic()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        if aggregates.dirty:
+            write_Watched(aggregates)
+
+
+def process_File(pos, repo):
+    """ Analyze one file; a failure is recorded and the run goes on.
+    Returns ANALYZED, SKIPPED by the file budget, or FAILED. """
+    try:
+        return read_File(pos, repo)
+    except Exception as e:
+        record_Error(pos, e)
+        return FAILED
+
+
+def record_Error(path, error):
+    """ Add a file or directory that could not be analyzed to the report. """
+    global_errors.append({'path': path, 'error': type(error).__name__,
+                          'message': str(error)})
+    log(f'   ✗ Error in {path}: {type(error).__name__}: {error}', force=True)
+    events.emit(events.ERROR, message=str(error), path=path)
 
 
 def read_File(pos, repo):
-    """ Read the file and return the tree. """
-    with open(pos) as fp:
-        my_code = fp.read()
-        tree = ast.parse(my_code)
-        #print (ast.dump(tree))
-        iterate_List(tree, pos, repo)
-
-
-def iterate_List(tree, pos, repo):
-    """ Iterate list and assign attributes. Single-pass AST traversal. """
-    from ClassIterTree import REVERSE_TYPE_MAP
-
-    #-- Build set of all attribute strings we care about
-    all_attribs = set()
-    for group in SetClass:
-        for attrib in group:
-            all_attribs.add(attrib)
-
-    #-- Single walk: classify nodes by their attribute string
-    nodes_by_attrib = {}
-    for node in ast.walk(tree):
-        node_type = type(node)
-        if node_type in REVERSE_TYPE_MAP:
-            attrib_str = REVERSE_TYPE_MAP[node_type]
-            if attrib_str in all_attribs:
-                if attrib_str not in nodes_by_attrib:
-                    nodes_by_attrib[attrib_str] = []
-                nodes_by_attrib[attrib_str].append(node)
-
-    #-- Process each attribute group with pre-collected nodes
-    file = pos.split('/')[-1]
-    for group in SetClass:
-        for attrib in group:
-            nodes = nodes_by_attrib.get(attrib)
-            if nodes:
-                deepen(tree, attrib, pos, repo, nodes)
+    """ Read and classify a file; returns ANALYZED or SKIPPED. """
+    start = time.perf_counter()
+    #-- Stamped before reading: a later edit makes it stale
+    stamp = checkpoint.file_Stamp(pos) if run_checkpoint is not None else None
+    if file_budget is not None and file_budget.max_bytes is not None:
+        size = os.path.getsize(pos)
+        if size > file_budget.max_bytes:
+            #-- Too big to parse at all, whatever the policy
+            record_Limit(pos, 'bytes', size, 'skipped')
+            return skip_File(pos, repo, start, stamp)
+    with tracing.span('file', path=pos) as stage:
+        with tracing.span('read', path=pos):
+            with open(pos) as fp:
+                my_code = fp.read()
+        stage.set(size=len(my_code))
+        key = hashlib.blake2b(my_code.encode('utf-8', 'surrogatepass'),
+                              digest_size=16).digest()
+        shared = blob_results.get(key)
+        limited = len(global_limited)
+        if shared is not None:
+            #-- Same content seen before: reuse its elements for this path
+            result = share_Result(shared, pos, repo, len(my_code))
+            stage.set(duplicate=True)
+        else:
+            result = analyze_Blob(my_code, key, pos, repo, start)
+            if result is None:
+                return skip_File(pos, repo, start, stamp)
+    #-- Over its node or time budget with the skip policy: kept empty
+    skipped = (not len(result) and len(global_limited) > limited
+               and global_limited[-1]['action'] == 'skipped')
+    global_results.append(result)
+    if run_checkpoint is not None:
+        run_checkpoint.add(result, stamp)
+    events.emit(events.FILE_DONE, file=os.path.basename(pos), path=pos,
+                repo=repo, index=files_processed,
+                elements=len(result), skipped=skipped,
+                duration=time.perf_counter() - start)
+    return SKIPPED if skipped else ANALYZED
+
+
+def skip_File(pos, repo, start, stamp=None):
+    """ Journal and report a file left out by its budget. """
+    if run_checkpoint is not None:
+        run_checkpoint.add_Skipped(global_limited[-1], stamp)
+    events.emit(events.FILE_DONE, file=os.path.basename(pos), path=pos,
+                repo=repo, index=files_processed, elements=0, skipped=True,
+                duration=time.perf_counter() - start)
+    return SKIPPED
+
+
+def share_Result(shared, pos, repo, size):
+    """ Elements of an already analyzed content under another path. """
+    global duplicate_files, duplicate_bytes
+    result = FileResult(repo, pos, pos.split('/')[-1])
+    result.extend(shared)
+    duplicate_files += 1
+    duplicate_bytes += size
+    return result
+
 
+def analyze_Blob(my_code, key, pos, repo, start):
+    """ Parse and classify a new content; None if it cannot be parsed. """
+    with tracing.span('parse', path=pos, size=len(my_code)):
+        try:
+            tree = ast.parse(my_code)
+        except (RecursionError, MemoryError):
+            #-- Nesting too deep for the parser
+            record_Limit(pos, 'depth', None, 'skipped')
+            return None
+    #print (ast.dump(tree))
+    limited = len(global_limited)
+    with tracing.span('classify', path=pos) as classify:
+        result = iterate_List(tree, pos, repo, start=start)
+        classify.set(elements=len(result))
+    #-- Results cut by a budget depend on timing and are not shared
+    if len(global_limited) == limited:
+        blob_results[key] = result
+    return result
 
-def deepen(tree, attrib, pos, repo, nodes=None):
-    """ Create class object. """
+
+def analyze_Source(my_code, pos, repo):
+    """ Classify source code without touching the global storage. """
+    tree = ast.parse(my_code)
+    return iterate_List(tree, pos, repo)
+
+
+def iterate_List(tree, pos, repo, start=None):
+    """ Classify the nodes of a file in a single pass, within its budget. """
     file = pos.split('/')[-1]
-    object = IterTree(tree, attrib, file, repo, pos, nodes=nodes)
-    
-    # Collect results
-    csv_rows, json_data = object.get_results()
-    
-    if csv_rows:
-        global_csv_rows.extend(csv_rows)
-        
-    if json_data:
-        for repo_key, files in json_data.items():
-            if repo_key not in global_json_data:
-                global_json_data[repo_key] = {}
-            
-            for file_key, data_list in files.items():
-                if file_key not in global_json_data[repo_key]:
-                    global_json_data[repo_key][file_key] = []
-                
-                global_json_data[repo_key][file_key].extend(data_list)
+    analyzer = FileAnalyzer(tree, file, repo, pos)
+    result = analyzer.analyze(run_Budget(start), start)
+    if analyzer.limit is not None:
+        limit = analyzer.limit
+        if limit[0] == 'seconds' and past_Deadline():
+            #-- Cut by the deadline of the run, not by the file budget
+            limit = ('deadline',) + limit[1:]
+        record_Limit(pos, *limit)
+    return result
+
+
+def run_Budget(start=None):
+    """ The file budget, with the time left before the run deadline. """
+    if run_deadline is None:
+        return file_budget
+    budget = file_budget if file_budget is not None else Budget()
+    left = max(0.0, run_deadline - (start or time.perf_counter()))
+    if budget.max_seconds is not None:
+        left = min(left, budget.max_seconds)
+    return Budget(budget.max_bytes, budget.max_nodes, left, budget.policy)
+
+
+def record_Limit(path, limit, value, action):
+    """ Add a file beyond its budget to the run summary. """
+    global_limited.append({'path': path, 'limit': limit, 'value': value,
+                           'action': action})
+    log(f'   ⏱ {action.capitalize()} {path}: over the {limit} limit',
+        per_file=True)
 
 
 def save_collected_data():
     """ Save collected data to files. """
-    print('\n💾 Saving results...')
-    sys.stdout.flush()
+    log('\n💾 Saving results...')
     
     # Save CSV
     with open(os.path.abspath('data.csv'), 'w', newline='') as f:
         writer = csv.writer(f)
         # Write header
-        writer.writerow(['Repository', 'Absolute Path', 'File Name', 'Class', 'Start Line', 'End Line', 'Displacement', 'Level'])
-        writer.writerows(global_csv_rows)
-    print(f'   ✓ CSV data saved to {os.path.abspath("data.csv")}')
-    sys.stdout.flush()
+        writer.writerow(['Repository', 'Absolute Path', 'File Name', 'Class', 'Start Line', 'End Line', 'Displacement', 'Level',
+                         'Class ID', 'Category'])
+        for result in global_results:
+            writer.writerows(result.csv_Rows())
+    log(f'   ✓ CSV data saved to {os.path.abspath("data.csv")}')
     
     # For single file mode, also save a dedicated output file
-    if type_option == 'file' and global_csv_rows:
+    if type_option == 'file' and any(global_results):
         output_file = os.path.splitext(option)[0] + '_proficiency.csv'
         with open(output_file, 'w', newline='') as f:
             writer = csv.writer(f)
             writer.writerow(['Element', 'Start Line', 'End Line', 'Proficiency Level'])
-            for row in global_csv_rows:
-                # row: [repo, abs_path, file_name, class, start, end, displacement, level]
-                writer.writerow([row[3], row[4], row[5], row[7]])
-        print(f'   ✓ Proficiency report saved to {os.path.abspath(output_file)}')
-        sys.stdout.flush()
+            for result in global_results:
+                for row in result.csv_Rows():
+                    # row: [repo, abs_path, file_name, class, start, end, displacement, level, class_id, category]
+                    writer.writerow([row[3], row[4], row[5], row[7]])
+        log(f'   ✓ Proficiency report saved to {os.path.abspath(output_file)}')
         
     # Save JSON
+    json_data = {}
+    for result in global_results:
+        result.add_Json(json_data)
     with open('data.json', 'w') as f:
-        json.dump(global_json_data, f, indent=4)
-    print('   ✓ JSON data saved to data.json')
-    sys.stdout.flush()
+        json.dump(json_data, f, indent=4)
+    log('   ✓ JSON data saved to data.json')
+
+    # Save the line index used by editor lookups
+    lineindex.save_Index(global_results)
+    log(f'   ✓ Line index saved to {lineindex.INDEX_FILE}')
+
+    # Save the directory rollups used by the drill-down views
+    root = os.path.abspath(option) if type_option == 'directory' else None
+    with tracing.span('rollup'):
+        tree_file = dirtree.save_Tree(global_results, root)
+    log(f'   ✓ Directory rollups saved to {tree_file}')
+
+def dedup_Summary():
+    """ Files served from an identical content analyzed before. """
+    analyzed = len(blob_results) + duplicate_files
+    return {'unique': len(blob_results), 'duplicates': duplicate_files,
+            'ratio': round(duplicate_files / analyzed, 4) if analyzed else 0.0,
+            'bytes_saved': duplicate_bytes}
+
+
+def save_Run_Summary():
+    """ Save the files analyzed, restored and failed in this run. """
+    #-- Files over their node or time budget keep an empty result
+    skipped = {limit['path'] for limit in global_limited
+               if limit['action'] == 'skipped'}
+    summary = {'mode': type_option, 'target': option,
+               'files': files_processed,
+               'analyzed': sum(1 for result in global_results
+                               if result.abs_path not in completed_paths
+                               and result.abs_path not in skipped),
+               'restored': len(completed_paths),
+               'errors': global_errors,
+               'limited': global_limited,
+               'excluded': discovery_filter.report(),
+               'dedup': dedup_Summary(),
+               'sample': sample_report,
+               'deadline': deadline_Summary()}
+    with open(RUN_SUMMARY_FILE, 'w') as f:
+        json.dump(summary, f, indent=4)
+    log(f'   ✓ Run summary saved to {RUN_SUMMARY_FILE}')
+
 
 def summary_Levels():
     """ Summary of directory levels """
-    save_collected_data()
-    print('\n📊 Generating summary statistics...')
-    sys.stdout.flush()
-    result = read_Json()
-    read_FileCsv()
-    print('\n✅ Analysis complete!')
-    print(f'\n{result}')
-    sys.stdout.flush()
+    with tracing.span('write_outputs'):
+        save_collected_data()
+        save_Run_Summary()
+    log('\n📊 Generating summary statistics...')
+    with tracing.span('aggregate', path=os.path.abspath('data.json')):
+        result = read_Json()
+    with tracing.span('csv_split', path=os.path.abspath('data.csv')):
+        read_FileCsv()
+    log('\n✅ Analysis complete!')
+    log(f'\n{result}', force=True)
+    if sample_report is not None:
+        import sampling
+        log(sampling.show_Estimate(sample_report), force=True)
+    deadline = deadline_Summary()
+    if deadline is not None and deadline['partial']:
+        log(f"⏰ PARTIAL RESULT: {deadline['coverage']}% of the files were "
+            f"analyzed within the {deadline['seconds']:g} s deadline",
+            force=True)
+    if duplicate_files:
+        log(f'♻ {duplicate_files} duplicate file(s) reused the results of an '
+            f'identical file')
+    if global_errors:
+        log(f'⚠ {len(global_errors)} file(s) could not be analyzed, '
+            f'see {os.path.abspath(RUN_SUMMARY_FILE)}', force=True)
+    events.emit(events.SUMMARY, files=files_processed,
+                sample=sample_report,
+                deadline=deadline,
+                elements=sum(len(result) for result in global_results),
+                errors=len(global_errors),
+                levels=dict(getjson.dict_summary.get('Levels', {})),
+                result=result)
+    return result
+
+
+def reset_Results():
+    """ Clear the results of a previous run in this process. """
+    global total_files_found, files_processed, duplicate_files, duplicate_bytes
+    global sample_report, deadline_hit
+    global_results.clear()
+    sample_report = None
+    deadline_hit = False
+    blob_results.clear()
+    duplicate_files = 0
+    duplicate_bytes = 0
+    global_errors.clear()
+    global_limited.clear()
+    completed_paths.clear()
+    getjson.reset_Results()
+    total_files_found = 0
+    files_processed = 0
+
+
+def start_Checkpoint(mode, resume, journal=False):
+    """ Open the journal of completed files, restoring it on --resume. """
+    global run_checkpoint
+    run_checkpoint = None
+    if mode == 'file' or not (resume or journal):
+        return
+    target = os.path.abspath(option) if mode == 'directory' else option
+    run_checkpoint = checkpoint.Checkpoint(mode, target)
+    restored = run_checkpoint.load() if resume else []
+    for result in restored:
+        global_results.append(result)
+        completed_paths.add(result.abs_path)
+    #-- Files skipped by their budget stay skipped
+    for limit in run_checkpoint.skipped:
+        global_limited.append(limit)
+        completed_paths.add(limit['path'])
+    run_checkpoint.start(restored)
+    if completed_paths:
+        log(f'↻ Resuming: {len(completed_paths)} file(s) restored from '
+            f'{checkpoint.CHECKPOINT_FILE}')
+
+
+def analyze(mode, target, quiet_mode=False, resume=False, budget=None,
+            include=(), exclude=(), skip_generated=True, sample=None,
+            deadline=None, journal=False, listener=None):
+    """ Run a full analysis in-process and return the summary text. """
+    global type_option, option, quiet, file_budget, discovery_filter
+    global sample_options, deadline_seconds, run_deadline
+    with analysis_lock:
+        #-- listener: receives the events of this run only, subscribed while
+        #-- the run holds the lock
+        if listener is not None:
+            events.subscribe(listener)
+        #-- deadline: seconds for the whole run, outputs are written on time
+        deadline_seconds = deadline
+        run_deadline = (time.perf_counter() + deadline
+                        if deadline is not None else None)
+        #-- sample: dict of sampling.Sampler options, directory mode only
+        sample_options = sample
+        type_option = mode
+        option = target.strip()
+        quiet = quiet_mode
+        file_budget = budget
+        root = os.path.abspath(option) if mode == 'directory' else None
+        discovery_filter = discovery.Filter(root, include, exclude,
+                                            skip_generated)
+        reset_Results()
+        #-- journal: record completed files so the run can be resumed
+        start_Checkpoint(mode, resume, journal)
+        completed = False
+        try:
+            with tracing.span('analysis', mode=mode, target=option):
+                choose_option()
+                result = summary_Levels()
+            #-- A run cut by its deadline can be continued with --resume
+            completed = not deadline_hit
+        finally:
+            #-- The journal is kept when the run did not finish
+            if run_checkpoint is not None:
+                run_checkpoint.close(completed)
+            if listener is not None:
+                events.unsubscribe(listener)
+        return result
+
+
+def parse_Arguments(argv):
+    """ Parse the command line. """
+    parser = argparse.ArgumentParser(
+        description='PyCEFRL - Python Code Level Analyzer')
+    parser.add_argument('type_option',
+                        choices=['directory', 'file', 'repo-url', 'user',
+                                 'serve', 'client', 'watch', 'lsp'])
+    parser.add_argument('option', nargs='?', default='',
+                        help='directory, file, url or user to analyze')
+    parser.add_argument('--events', choices=['text', 'ndjson'], default='text',
+                        help="'ndjson' writes one JSON event per line to stdout")
+    parser.add_argument('--events-interval', type=float,
+                        default=events.NDJSON_FLUSH_INTERVAL,
+                        help='minimum seconds between two NDJSON flushes')
+    parser.add_argument('--quiet', action='store_true',
+                        help='no per-file progress output')
+    parser.add_argument('--checkpoint', action='store_true',
+                        help='journal completed files so an interrupted run '
+                             'can be continued with --resume')
+    parser.add_argument('--resume', action='store_true',
+                        help='skip the files completed by an interrupted '
+                             '--checkpoint run, and keep journaling')
+    parser.add_argument('--include', action='append', default=[],
+                        metavar='PATTERN',
+                        help='analyze matching paths even if they look '
+                             'generated or vendored (repeatable)')
+    parser.add_argument('--exclude', action='append', default=[],
+                        metavar='PATTERN',
+                        help='never analyze matching paths (repeatable)')
+    parser.add_argument('--all-files', action='store_true',
+                        help='do not skip generated or vendored code')
+    parser.add_argument('--poll', action='store_true',
+                        help='watch: scan for changes instead of using inotify')
+    parser.add_argument('--poll-interval', type=float, default=None,
+                        help='watch: seconds between two scans with --poll '
+                             '(default 1)')
+    parser.add_argument('--deadline', type=float, default=None,
+                        metavar='SECONDS',
+                        help='stop analyzing after this many seconds and '
+                             'write the partial results')
+    parser.add_argument('--sample', action='store_true',
+                        help='estimate the levels of a directory from a '
+                             'stratified sample of its files')
+    parser.add_argument('--precision', type=float, default=None,
+                        help='--sample stops when every level share is known '
+                             'within this margin (default 0.02 = 2 points)')
+    parser.add_argument('--sample-seconds', type=float, default=None,
+                        help='--sample stops after this many seconds')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='random seed of --sample')
+    parser.add_argument('--max-bytes', type=int, default=None,
+                        help='skip files larger than this many bytes')
+    parser.add_argument('--max-nodes', type=int, default=None,
+                        help='limit of AST nodes per file')
+    parser.add_argument('--max-seconds', type=float, default=None,
+                        help='limit of read, parse and classification time '
+                             'per file')
+    parser.add_argument('--over-budget', choices=['skip', 'sample', 'degrade'],
+                        default='skip',
+                        help='files over --max-nodes are skipped, sampled or '
+                             'only have their literals classified; files over '
+                             '--max-seconds keep the elements found so far '
+                             'unless skipped')
+    parser.add_argument('--profile-rules', action='store_true',
+                        help='time each level rule and write rule_profile.json')
+    parser.add_argument('--trace', metavar='OUT.json', default=None,
+                        help='write stage spans in Chrome trace-event format')
+    parser.add_argument('--memprofile', action='store_true',
+                        help='measure memory per stage and file with '
+                             'tracemalloc and write memprofile.json')
+    parser.add_argument('--host', default=None,
+                        help='address of the serve daemon')
+    parser.add_argument('--port', type=int, default=None,
+                        help='port of the serve daemon')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes of the serve daemon')
+    args = parser.parse_args(argv)
+    if args.type_option not in ('serve', 'lsp') and not args.option:
+        parser.error(f"'{args.type_option}' needs a target to analyze")
+    return args
+
+
+def daemon_Address(args):
+    """ The --host and --port given; the others are left to daemon.py. """
+    return {key: value for key, value in (('host', args.host),
+                                          ('port', args.port))
+            if value is not None}
 
 
 if __name__ == "__main__":
-    try:
-        type_option = sys.argv[1]
-        option = sys.argv[2].strip()
-    except:
-        sys.exit("Usage: python3 file.py type-option('directory', 'file', 'repo-url', 'user') option(directory, file, url, user)")
-    
+    args = parse_Arguments(sys.argv[1:])
+    if args.type_option == 'serve':
+        import daemon
+        daemon.serve(workers=args.workers, **daemon_Address(args))
+        sys.exit()
+    if args.type_option == 'lsp':
+        #-- stdout carries the protocol: nothing else may be printed
+        import lsp
+        sys.exit(lsp.serve())
+    if args.type_option == 'client':
+        #-- Thin client: ask the daemon, or analyze in-process
+        import daemon
+        result = daemon.analyze({'path': args.option}, **daemon_Address(args))
+        print(json.dumps(result, indent=4))
+        sys.exit(1 if 'error' in result else 0)
+    type_option = args.type_option
+    option = args.option.strip()
+    output_events = args.events
+    if output_events == 'ndjson':
+        writer = events.NdjsonWriter(sys.stdout, args.events_interval)
+        events.subscribe(writer)
+
     # Print banner
-    print('=' * 60)
-    print('  PyCEFRL - Python Code Level Analyzer')
-    print('  Real-time Analysis Mode')
-    print('=' * 60)
-    print(f'Started at: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
-    print(f'Mode: {type_option}')
-    print(f'Target: {option}')
-    print('=' * 60)
-    sys.stdout.flush()
+    log('=' * 60)
+    log('  PyCEFRL - Python Code Level Analyzer')
+    log('  Real-time Analysis Mode')
+    log('=' * 60)
+    log(f'Started at: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
+    log(f'Mode: {type_option}')
+    log(f'Target: {option}')
+    log('=' * 60, force=True)
     
-    choose_option()
-    summary_Levels()
+    if args.profile_rules:
+        ruleprofile.enable()
+    if args.trace:
+        tracing.enable()
+    if args.memprofile:
+        import memprofile
+        memprofile.enable()
+    budget = None
+    if (args.max_bytes is not None or args.max_nodes is not None
+            or args.max_seconds is not None):
+        budget = Budget(args.max_bytes, args.max_nodes, args.max_seconds,
+                        args.over_budget)
+    sample = None
+    if args.sample:
+        sample = {'seconds': args.sample_seconds, 'seed': args.seed}
+        if args.precision is not None:
+            sample['precision'] = args.precision
+    if type_option == 'watch':
+        run_Watch(option, quiet_mode=args.quiet, budget=budget,
+                  include=args.include, exclude=args.exclude,
+                  skip_generated=not args.all_files, polling=args.poll,
+                  interval=args.poll_interval)
+    else:
+        analyze(type_option, option, quiet_mode=args.quiet,
+                resume=args.resume, budget=budget, include=args.include,
+                exclude=args.exclude, skip_generated=not args.all_files,
+                sample=sample, deadline=args.deadline,
+                journal=args.checkpoint)
+    if args.profile_rules:
+        ruleprofile.disable()
+        ruleprofile.save_Report()
+        log(ruleprofile.report(), force=True)
+        log(f'Rule profile saved to {os.path.abspath("rule_profile.json")}')
+    if args.memprofile:
+        memprofile.disable()
+        memprofile.save_Report()
+        log(memprofile.report(), force=True)
+        log(f'Memory profile saved to {os.path.abspath("memprofile.json")}')
+    if args.trace:
+        tracing.save_Trace(args.trace)
+        log(f'Trace saved to {os.path.abspath(args.trace)}')
     
-    print('=' * 60)
-    print(f'Finished at: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
-    print('=' * 60)
-    sys.stdout.flush()
+    log('=' * 60)
+    log(f'Finished at: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}')
+    log('=' * 60, force=True)
+    if output_events == 'ndjson':
+        writer.flush()
+    #-- A single file that could not be analyzed fails the command
+    if type_option == 'file' and global_errors:
+        sys.exit(1)
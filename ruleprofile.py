@@ -0,0 +1,131 @@
+#-- OPT-IN PROFILING OF THE LEVEL RULES
+
+import json
+import time
+
+import levels
+
+#-- Functions of levels.py that are not rules
+NOT_RULES = ('compile_Rules', 'load_Rules', 'get_Rules', 'get_Categories',
+             'rule', 'levels')
+
+#-- Per rule: name -> [calls, seconds] (time includes the rules it calls)
+stats = {}
+#-- Per file: path -> [nodes, seconds] spent in the rules
+ledger = {}
+#-- Original functions and dispatch tables while profiling is enabled
+originals = None
+
+
+def rule_Functions():
+    """ Names of the rule functions of levels.py. """
+    return [name for name, value in vars(levels).items()
+            if callable(value) and getattr(value, '__module__', '') == 'levels'
+            and not isinstance(value, type) and name not in NOT_RULES]
+
+
+def timed_Rule(name, function):
+    """ Wrap a rule to count its calls and time. """
+    entry = stats.setdefault(name, [0, 0.0])
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            entry[0] += 1
+            entry[1] += time.perf_counter() - start
+    return wrapper
+
+
+def timed_Dispatch(function):
+    """ Wrap a dispatched handler to charge its node to the file ledger. """
+    def wrapper(self):
+        start = time.perf_counter()
+        try:
+            return function(self)
+        finally:
+            entry = ledger.get(self.abs_path)
+            if entry is None:
+                entry = ledger[self.abs_path] = [0, 0.0]
+            entry[0] += 1
+            entry[1] += time.perf_counter() - start
+    return wrapper
+
+
+def enable():
+    """ Wrap every rule of levels.py; nothing is wrapped until called. """
+    global originals
+    if originals is not None:
+        return
+    originals = ({name: getattr(levels, name) for name in rule_Functions()},
+                 dict(levels.HANDLERS), dict(levels.LOOP_HANDLERS))
+    functions, handlers, loop_handlers = originals
+    #-- Rules call each other through the module globals
+    wrapped = {function: timed_Rule(name, function)
+               for name, function in functions.items()}
+    for name, function in functions.items():
+        setattr(levels, name, wrapped[function])
+    for node_type, function in handlers.items():
+        levels.HANDLERS[node_type] = timed_Dispatch(wrapped[function])
+    for node_type, function in loop_handlers.items():
+        levels.LOOP_HANDLERS[node_type] = wrapped[function]
+
+
+def disable():
+    """ Restore the original rules. """
+    global originals
+    if originals is None:
+        return
+    functions, handlers, loop_handlers = originals
+    for name, function in functions.items():
+        setattr(levels, name, function)
+    levels.HANDLERS.clear()
+    levels.HANDLERS.update(handlers)
+    levels.LOOP_HANDLERS.clear()
+    levels.LOOP_HANDLERS.update(loop_handlers)
+    originals = None
+
+
+def reset():
+    """ Clear the collected counters. """
+    stats.clear()
+    ledger.clear()
+
+
+def rule_Rows():
+    """ Called rules, most expensive first. """
+    rows = [{'rule': name, 'calls': calls, 'seconds': seconds,
+             'per_call_us': seconds / calls * 1e6}
+            for name, (calls, seconds) in stats.items() if calls]
+    return sorted(rows, key=lambda row: row['seconds'], reverse=True)
+
+
+def file_Rows(top=None):
+    """ Files by time spent in the rules, slowest first. """
+    rows = [{'path': path, 'nodes': nodes, 'seconds': seconds}
+            for path, (nodes, seconds) in ledger.items()]
+    rows.sort(key=lambda row: row['seconds'], reverse=True)
+    return rows[:top] if top else rows
+
+
+def report(top=10):
+    """ Text report of the rule costs and the slowest files. """
+    lines = ['=====================================',
+             'RULE PROFILE (time includes called rules):',
+             f"{'rule':<26}{'calls':>9}{'total ms':>11}{'us/call':>10}"]
+    for row in rule_Rows():
+        lines.append(f"{row['rule']:<26}{row['calls']:>9}"
+                     f"{row['seconds'] * 1e3:>11.2f}{row['per_call_us']:>10.2f}")
+    lines.append(f'SLOWEST FILES (top {top}):')
+    lines.append(f"{'ms':>9}{'nodes':>8}  path")
+    for row in file_Rows(top):
+        lines.append(f"{row['seconds'] * 1e3:>9.2f}{row['nodes']:>8}  "
+                     f"{row['path']}")
+    lines.append('=====================================')
+    return '\n'.join(lines)
+
+
+def save_Report(path='rule_profile.json'):
+    """ Write the rule costs and the whole file ledger as JSON. """
+    with open(path, 'w') as f:
+        json.dump({'rules': rule_Rows(), 'files': file_Rows()}, f, indent=4)
@@ -0,0 +1,182 @@
+#-- STRATIFIED SAMPLING OF FILES WITH BOOTSTRAP CONFIDENCE INTERVALS
+
+import os
+import random
+import time
+
+#-- Levels of the estimated distribution
+LEVELS = ('A1', 'A2', 'B1', 'B2', 'C1', 'C2')
+#-- Upper bounds (bytes) of the size strata; larger files form the last one
+SIZE_BUCKETS = (1024, 4096, 16384, 65536)
+#-- Files of the first round; each later round is GROWTH times larger
+FIRST_ROUND = 100
+GROWTH = 1.5
+#-- Bootstrap resamples and the confidence level of the intervals
+BOOTSTRAP = 200
+CONFIDENCE = 0.95
+#-- Default half-width of the intervals at which sampling stops
+PRECISION = 0.02
+
+
+def size_Bucket(size):
+    """ Index of the size stratum of a file. """
+    for i, bound in enumerate(SIZE_BUCKETS):
+        if size < bound:
+            return i
+    return len(SIZE_BUCKETS)
+
+
+def stratum_Key(root, path):
+    """ Stratum of a file: its top-level directory and its size bucket. """
+    relative = os.path.relpath(path, root).replace(os.sep, '/')
+    top = relative.split('/')[0] if '/' in relative else '.'
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        size = 0
+    return top, size_Bucket(size)
+
+
+class Sampler():
+    """ Draw files stratum by stratum until the estimate is precise enough. """
+
+    def __init__(self, manifest, root, precision=PRECISION, seconds=None,
+                 seed=0):
+        """ Class constructor. """
+        self.precision = precision
+        self.deadline = time.monotonic() + seconds if seconds else None
+        self.random = random.Random(seed)
+        self.seed = seed
+        #-- Stratum -> files not drawn yet (shuffled), and drawn counts
+        self.strata = {}
+        for path, repo in manifest:
+            self.strata.setdefault(stratum_Key(root, path), []).append(
+                (path, repo))
+        self.sizes = {key: len(files) for key, files in self.strata.items()}
+        for files in self.strata.values():
+            self.random.shuffle(files)
+        self.total = len(manifest)
+        self.counts = {key: [] for key in self.strata}
+        #-- Drawn files of each stratum, with those left out of the estimate
+        self.drawn = {key: 0 for key in self.strata}
+        #-- Drawn files that failed or were skipped by their budget
+        self.left_out = {'failed': 0, 'skipped': 0}
+        self.rounds = 0
+        self.target = 0
+        self.last = None
+
+    def sampled(self):
+        """ Number of files drawn so far. """
+        return sum(self.drawn.values())
+
+    def next_Batch(self):
+        """ Files of the next round, allocated in proportion to the strata. """
+        self.rounds += 1
+        self.target = (FIRST_ROUND if self.rounds == 1
+                       else int(self.target * GROWTH) + 1)
+        batch = []
+        for key, files in self.strata.items():
+            share = round(self.target * self.sizes[key] / self.total)
+            #-- Every stratum has at least one file in the sample
+            wanted = min(self.sizes[key], max(1, share))
+            take = max(0, wanted - self.drawn[key])
+            batch.extend((key, path, repo) for path, repo in files[:take])
+            del files[:take]
+        return batch
+
+    def add(self, key, levels):
+        """ Record the levels of the elements of a sampled file. """
+        counts = [0] * len(LEVELS)
+        for level in levels:
+            if level in LEVELS:
+                counts[LEVELS.index(level)] += 1
+        self.counts[key].append(counts)
+        self.drawn[key] += 1
+
+    def leave_Out(self, key, status):
+        """ Record a sampled file without elements to count, 'failed' or
+        'skipped'; the other files of its stratum stand for it. """
+        self.left_out[status] += 1
+        self.drawn[key] += 1
+
+    def estimate(self):
+        """ Estimated share of each level with bootstrap intervals. """
+        import numpy as np
+        rng = np.random.default_rng(self.seed)
+        point = np.zeros(len(LEVELS))
+        boot = np.zeros((BOOTSTRAP, len(LEVELS)))
+        for key, counts in self.counts.items():
+            if not counts:
+                continue
+            counts = np.array(counts, dtype=float)
+            #-- Each sampled file stands for size / drawn files: left out
+            #-- files stay out of the resamples, and have no elements in a
+            #-- full run either
+            weight = self.sizes[key] / self.drawn[key]
+            point += counts.sum(axis=0) * weight
+            if self.drawn[key] == self.sizes[key]:
+                #-- A fully read stratum is known exactly
+                boot += counts.sum(axis=0)
+                continue
+            picks = rng.integers(0, len(counts), size=(BOOTSTRAP, len(counts)))
+            boot += counts[picks].sum(axis=1) * weight
+        levels = {}
+        if point.sum() == 0:
+            return levels
+        share = point / point.sum()
+        boot_share = boot / np.maximum(boot.sum(axis=1, keepdims=True), 1)
+        alpha = (1 - CONFIDENCE) / 2 * 100
+        low = np.percentile(boot_share, alpha, axis=0)
+        high = np.percentile(boot_share, 100 - alpha, axis=0)
+        for i, level in enumerate(LEVELS):
+            levels[level] = {'estimate': round(float(share[i]), 4),
+                             'low': round(float(low[i]), 4),
+                             'high': round(float(high[i]), 4),
+                             'elements': round(float(point[i]))}
+        return levels
+
+    def stop_Reason(self):
+        """ Why sampling stops now, or None to draw another round. """
+        self.last = self.estimate()
+        if self.sampled() >= self.total:
+            return 'exhausted'
+        if self.last and all((row['high'] - row['low']) / 2 <= self.precision
+                             for row in self.last.values()):
+            return 'precision'
+        return self.time_Reason()
+
+    def time_Reason(self):
+        """ 'time' once the sampling time is over, else None. """
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return 'time'
+        return None
+
+    def report(self, reason):
+        """ Machine-readable estimate of the run. """
+        #-- A round cut by a time limit has files not in the last estimate
+        self.last = self.estimate()
+        return {'files_total': self.total, 'files_sampled': self.sampled(),
+                'files_failed': self.left_out['failed'],
+                'files_skipped': self.left_out['skipped'],
+                'strata': len(self.strata), 'rounds': self.rounds,
+                'stopped': reason, 'precision': self.precision,
+                'confidence': CONFIDENCE, 'levels': self.last}
+
+
+def show_Estimate(report):
+    """ Text summary of a sampled estimate. """
+    lines = ['=====================================',
+             'ESTIMATED LEVELS (sample of '
+             f"{report['files_sampled']}/{report['files_total']} files, "
+             f"{int(report['confidence'] * 100)}% intervals):"]
+    for level, row in report['levels'].items():
+        lines.append(f"{level}: {row['estimate'] * 100:5.1f}%  "
+                     f"[{row['low'] * 100:5.1f}% - {row['high'] * 100:5.1f}%]")
+    left_out = report['files_failed'] + report['files_skipped']
+    if left_out:
+        lines.append(f"{left_out} sampled file(s) left out of the estimate: "
+                     f"{report['files_failed']} failed, "
+                     f"{report['files_skipped']} over their budget")
+    lines.append(f"Stopped: {report['stopped']} after {report['rounds']} round(s)")
+    lines.append('=====================================')
+    return '\n'.join(lines)
@@ -0,0 +1,93 @@
+import unittest
+import os
+import sys
+import ast
+import tempfile
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmark
+
+
+class TestCorpusGenerator(unittest.TestCase):
+    """Tests for the synthetic corpus."""
+
+    def read_corpus(self, seed):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = benchmark.generate_Corpus(tmp, files=6, seed=seed)
+            return {os.path.relpath(p, tmp): open(p).read() for p in paths}
+
+    def test_deterministic(self):
+        """The same seed gives the same corpus."""
+        self.assertEqual(self.read_corpus(1), self.read_corpus(1))
+        self.assertNotEqual(self.read_corpus(1), self.read_corpus(2))
+
+    def test_every_construct_parses(self):
+        """Each construct generator produces valid Python."""
+        for kind in benchmark.GENERATORS:
+            with tempfile.TemporaryDirectory() as tmp:
+                paths = benchmark.generate_Corpus(tmp, files=2, mix={kind: 1})
+                for path in paths:
+                    with open(path) as f:
+                        ast.parse(f.read())
+
+    def test_stage_times(self):
+        """A stage run times every stage of the pipeline."""
+        with tempfile.TemporaryDirectory() as tmp:
+            benchmark.generate_Corpus(tmp, files=2, mix={'classes': 1})
+            stages = benchmark.stage_Times(tmp)
+        self.assertEqual(set(stages), {label for label, _, _ in benchmark.STAGES})
+        self.assertTrue(all(value > 0 for value in stages.values()))
+
+
+class TestBaseline(unittest.TestCase):
+    """Tests for the regression check."""
+
+    corpus = {'files': 2, 'seed': 0, 'mix': {'plain': 1}, 'nodes': 10}
+
+    def metrics(self, files_per_s, rss):
+        return {'corpus': self.corpus, 'files_per_s': files_per_s,
+                'nodes_per_s': files_per_s * 5, 'peak_rss_kib': rss}
+
+    def test_within_threshold(self):
+        baseline = self.metrics(100, 1000)
+        self.assertEqual(benchmark.compare_Baseline(
+            self.metrics(90, 1100), baseline, 0.25), [])
+
+    def test_regressions_reported(self):
+        baseline = self.metrics(100, 1000)
+        regressions = benchmark.compare_Baseline(
+            self.metrics(50, 2000), baseline, 0.25)
+        self.assertEqual(len(regressions), 3)
+
+    def test_stale_baseline_reported(self):
+        baseline = self.metrics(100, 1000)
+        messages = benchmark.compare_Baseline(
+            self.metrics(500, 1000), baseline, 0.25)
+        self.assertEqual(len(messages), 2)
+        self.assertTrue(all('--update-baseline' in m for m in messages))
+        self.assertEqual(benchmark.compare_Baseline(
+            self.metrics(150, 800), baseline, 0.25), [])
+
+    def test_different_environment(self):
+        baseline = dict(self.metrics(100, 1000),
+                        environment=dict(benchmark.environment(), cpus=1024))
+        current = dict(self.metrics(10, 1000),
+                       environment=benchmark.environment())
+        messages = benchmark.compare_Baseline(current, baseline)
+        self.assertEqual(len(messages), 1)
+        self.assertIn('different environment', messages[0])
+        self.assertIn('cpus', messages[0])
+        # Same environment: the timings are compared
+        self.assertEqual(len(benchmark.compare_Baseline(
+            current, dict(baseline, environment=benchmark.environment()))), 2)
+
+    def test_different_corpus(self):
+        baseline = dict(self.metrics(100, 1000), corpus={'files': 3})
+        self.assertEqual(len(benchmark.compare_Baseline(
+            self.metrics(100, 1000), baseline)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import unittest
+import os
+import sys
+import ast
+import json
+import tempfile
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import checkpoint
+import events
+import pycerfl
+from ClassIterTree import FileAnalyzer, Budget, SKIP, SAMPLE, DEGRADE
+
+
+TABLE_CODE = ("TABLE = [" + ", ".join("(%d, [%d])" % (i, i) for i in range(200))
+              + "]\n"
+              "def f(x):\n    return [y for y in x]\n")
+
+
+def analyze(code, budget, start=None):
+    analyzer = FileAnalyzer(ast.parse(code), 'table.py', 'repo', '/repo/table.py')
+    result = analyzer.analyze(budget, start)
+    return analyzer, result
+
+
+class TestFileBudget(unittest.TestCase):
+    """Tests for the per-file node and time limits."""
+
+    def test_within_budget(self):
+        full = analyze(TABLE_CODE, None)[1]
+        analyzer, result = analyze(TABLE_CODE, Budget(max_nodes=10**6))
+        self.assertIsNone(analyzer.limit)
+        self.assertEqual(result.csv_Rows(), full.csv_Rows())
+
+    def test_nodes_skip(self):
+        analyzer, result = analyze(TABLE_CODE, Budget(max_nodes=100, policy=SKIP))
+        self.assertEqual(analyzer.limit[0], 'nodes')
+        self.assertEqual(analyzer.limit[2], 'skipped')
+        self.assertEqual(len(result), 0)
+        # The value is the node count of the file, not the first one over
+        self.assertEqual(analyzer.limit[1],
+                         sum(1 for _ in ast.walk(ast.parse(TABLE_CODE))))
+
+    def test_nodes_sample(self):
+        full = analyze(TABLE_CODE, None)[1]
+        analyzer, result = analyze(TABLE_CODE, Budget(max_nodes=100,
+                                                      policy=SAMPLE))
+        self.assertEqual(analyzer.limit[2], 'sampled')
+        self.assertGreater(len(result), 0)
+        self.assertLessEqual(len(result), 100)
+        self.assertLess(len(result), len(full))
+
+    def test_nodes_degrade(self):
+        analyzer, result = analyze(TABLE_CODE, Budget(max_nodes=100,
+                                                      policy=DEGRADE))
+        self.assertEqual(analyzer.limit[2], 'degraded')
+        categories = {row[8].split('.')[0] for row in result.csv_Rows()}
+        self.assertTrue(categories <= {'List', 'Tuple', 'Dict'})
+        self.assertGreater(len(result), 200)
+
+    def test_seconds(self):
+        analyzer, result = analyze(TABLE_CODE, Budget(max_seconds=0.0), start=0.0)
+        self.assertEqual(analyzer.limit[:1], ('seconds',))
+        self.assertEqual(analyzer.limit[2], 'skipped')
+        self.assertEqual(len(result), 0)
+        analyzer, result = analyze(TABLE_CODE, Budget(max_seconds=0.0,
+                                                      policy=SAMPLE), start=0.0)
+        self.assertEqual(analyzer.limit[2], 'truncated')
+
+    def test_deep_nesting_classified(self):
+        """Deep expressions are classified without hitting the recursion limit."""
+        code = "x = " + "1 + " * 500 + "1\n"
+        analyzer, result = analyze(code, None)
+        self.assertIsNone(analyzer.limit)
+
+
+class TestRunBudget(unittest.TestCase):
+    """Tests for the limits of a directory run."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.tmp.name, 'project')
+        os.makedirs(self.project)
+        files = {'small.py': "x = [1, 2]\n", 'table.py': TABLE_CODE,
+                 'deep.py': "x = " + "1 + " * 100000 + "1\n"}
+        for name, code in files.items():
+            with open(os.path.join(self.project, name), 'w') as f:
+                f.write(code)
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def limited(self):
+        with open(pycerfl.RUN_SUMMARY_FILE) as f:
+            summary = json.load(f)
+        self.assertEqual(summary['errors'], [])
+        return {os.path.basename(row['path']): row
+                for row in summary['limited']}
+
+    def test_limits_recorded(self):
+        pycerfl.analyze('directory', self.project, quiet_mode=True,
+                        budget=Budget(max_bytes=100000, max_nodes=100))
+        limited = self.limited()
+        self.assertEqual(limited['deep.py']['limit'], 'bytes')
+        self.assertEqual(limited['table.py']['limit'], 'nodes')
+        self.assertNotIn('small.py', limited)
+        # Both skipped files are left out of the analyzed count
+        with open(pycerfl.RUN_SUMMARY_FILE) as f:
+            self.assertEqual(json.load(f)['analyzed'], 1)
+
+    def test_too_deep_to_parse(self):
+        pycerfl.analyze('directory', self.project, quiet_mode=True)
+        self.assertEqual(self.limited()['deep.py']['limit'], 'depth')
+
+    def test_skipped_files_are_reported(self):
+        received = []
+        events.subscribe(received.append)
+        try:
+            pycerfl.analyze('directory', self.project, quiet_mode=True,
+                            budget=Budget(max_bytes=100000, max_nodes=100))
+        finally:
+            events.unsubscribe(received.append)
+        done = {os.path.basename(e['path']): e for e in received
+                if e['event'] == events.FILE_DONE}
+        # Every file reaches the progress bar, the skipped ones flagged
+        self.assertEqual(set(done), {'small.py', 'table.py', 'deep.py'})
+        self.assertTrue(done['deep.py']['skipped'])
+        self.assertTrue(done['table.py']['skipped'])
+        self.assertFalse(done['small.py']['skipped'])
+        self.assertEqual(pycerfl.process_File(
+            os.path.join(self.project, 'deep.py'), 'project'), pycerfl.SKIPPED)
+        self.assertEqual(pycerfl.process_File(
+            os.path.join(self.project, 'small.py'), 'project'),
+            pycerfl.ANALYZED)
+        self.assertEqual(pycerfl.process_File(
+            os.path.join(self.project, 'gone.py'), 'project'), pycerfl.FAILED)
+
+    def test_skipped_files_are_journaled(self):
+        budget = Budget(max_bytes=100000)
+        # Killed after the last file, before the outputs are written
+        original = pycerfl.save_collected_data
+        def crashing():
+            raise KeyboardInterrupt()
+        pycerfl.save_collected_data = crashing
+        try:
+            with self.assertRaises(KeyboardInterrupt):
+                pycerfl.analyze('directory', self.project, quiet_mode=True,
+                                budget=budget, journal=True)
+        finally:
+            pycerfl.save_collected_data = original
+        received = []
+        events.subscribe(received.append)
+        try:
+            pycerfl.analyze('directory', self.project, quiet_mode=True,
+                            budget=budget, resume=True)
+        finally:
+            events.unsubscribe(received.append)
+        self.assertEqual([e for e in received
+                          if e['event'] == events.FILE_DONE], [])
+        with open(pycerfl.RUN_SUMMARY_FILE) as f:
+            summary = json.load(f)
+        self.assertEqual(summary['restored'], 3)
+        self.assertEqual(summary['analyzed'], 0)
+        self.assertEqual([(os.path.basename(row['path']), row['limit'])
+                          for row in summary['limited']], [('deep.py', 'bytes')])
+
+    def test_arguments(self):
+        args = pycerfl.parse_Arguments(['directory', '.', '--max-nodes', '10',
+                                        '--over-budget', 'degrade'])
+        self.assertEqual(args.max_nodes, 10)
+        self.assertEqual(args.over_budget, 'degrade')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+import unittest
+import os
+import sys
+import json
+import subprocess
+import tempfile
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import checkpoint
+import events
+import pycerfl
+
+
+GOOD_CODE = "x = [1, 2, 3]\nfor i in x:\n    print(i)\n"
+
+
+class Crash(BaseException):
+    """Stands for a kill or preemption in the middle of a run."""
+
+
+class TestFaultIsolation(unittest.TestCase):
+    """Tests for per-file errors, checkpoints and --resume."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.tmp.name, 'project')
+        os.makedirs(os.path.join(self.project, 'pkg'))
+        for name in ('a.py', 'b.py', 'c.py', os.path.join('pkg', 'd.py')):
+            with open(os.path.join(self.project, name), 'w') as f:
+                # Distinct contents, so that no file is deduplicated
+                f.write(GOOD_CODE + '# ' + name + '\n')
+        self.received = []
+        events.subscribe(self.received.append)
+        # Outputs are written to the current directory
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        events.unsubscribe(self.received.append)
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def read(self, name):
+        with open(name) as f:
+            return f.read()
+
+    def test_bad_file_does_not_stop_directory(self):
+        with open(os.path.join(self.project, 'bad.py'), 'w') as f:
+            f.write("def broken(:\n")
+        pycerfl.analyze('directory', self.project, quiet_mode=True)
+
+        summary = json.loads(self.read(pycerfl.RUN_SUMMARY_FILE))
+        self.assertEqual(summary['analyzed'], 4)
+        self.assertEqual(len(summary['errors']), 1)
+        self.assertTrue(summary['errors'][0]['path'].endswith('bad.py'))
+        self.assertEqual(summary['errors'][0]['error'], 'SyntaxError')
+        errors = [e for e in self.received if e['event'] == events.ERROR]
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(self.received[-1]['errors'], 1)
+
+    def test_resume_after_crash(self):
+        pycerfl.analyze('directory', self.project, quiet_mode=True)
+        expected = self.read('data.csv')
+        self.assertFalse(os.path.exists(checkpoint.CHECKPOINT_FILE))
+
+        # Crash while analyzing the third file
+        original = pycerfl.iterate_List
+        calls = []
+        def crashing(tree, pos, repo, **kwargs):
+            calls.append(pos)
+            if len(calls) == 3:
+                raise Crash()
+            return original(tree, pos, repo, **kwargs)
+        pycerfl.iterate_List = crashing
+        try:
+            with self.assertRaises(Crash):
+                pycerfl.analyze('directory', self.project, quiet_mode=True,
+                                journal=True)
+        finally:
+            pycerfl.iterate_List = original
+        self.assertTrue(os.path.exists(checkpoint.CHECKPOINT_FILE))
+
+        # A cut last line is ignored
+        with open(checkpoint.CHECKPOINT_FILE, 'a') as f:
+            f.write('{"repo": "cut')
+        del self.received[:]
+        pycerfl.analyze('directory', self.project, quiet_mode=True,
+                        resume=True)
+
+        done = [e for e in self.received if e['event'] == events.FILE_DONE]
+        self.assertEqual(len(done), 2)
+        self.assertEqual(self.read('data.csv'), expected)
+        summary = json.loads(self.read(pycerfl.RUN_SUMMARY_FILE))
+        self.assertEqual(summary['restored'], 2)
+        self.assertFalse(os.path.exists(checkpoint.CHECKPOINT_FILE))
+
+    def crash_Run(self, **kwargs):
+        """ Run the analysis of the project, killed at its third file. """
+        original = pycerfl.iterate_List
+        calls = []
+        def crashing(tree, pos, repo, **kw):
+            calls.append(pos)
+            if len(calls) == 3:
+                raise Crash()
+            return original(tree, pos, repo, **kw)
+        pycerfl.iterate_List = crashing
+        try:
+            with self.assertRaises(Crash):
+                pycerfl.analyze('directory', self.project, quiet_mode=True,
+                                **kwargs)
+        finally:
+            pycerfl.iterate_List = original
+        return calls
+
+    def test_no_journal_unless_asked(self):
+        self.crash_Run()
+        self.assertFalse(os.path.exists(checkpoint.CHECKPOINT_FILE))
+
+    def test_changed_file_analyzed_again(self):
+        calls = self.crash_Run(journal=True)
+        # Edit a completed file before resuming
+        edited = calls[0]
+        with open(edited, 'a') as f:
+            f.write("y = {1: 2}\n")
+        del self.received[:]
+        pycerfl.analyze('directory', self.project, quiet_mode=True,
+                        resume=True)
+        done = [e['path'] for e in self.received
+                if e['event'] == events.FILE_DONE]
+        self.assertIn(edited, done)
+        self.assertEqual(len(done), 3)
+        summary = json.loads(self.read(pycerfl.RUN_SUMMARY_FILE))
+        self.assertEqual(summary['restored'], 1)
+        self.assertIn('y = {1: 2}', open(edited).read())
+        rows = [row for result in pycerfl.global_results
+                if result.abs_path == edited for row in result.csv_Rows()]
+        self.assertIn('Dict', {row[8].split('.')[0] for row in rows})
+
+    def test_unparseable_single_file_fails(self):
+        bad = os.path.join(self.project, 'bad.py')
+        with open(bad, 'w') as f:
+            f.write("def broken(:\n")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        run = subprocess.run([sys.executable,
+                              os.path.join(root, 'pycerfl.py'), 'file', bad,
+                              '--quiet'], capture_output=True, text=True)
+        self.assertEqual(run.returncode, 1)
+        run = subprocess.run([sys.executable,
+                              os.path.join(root, 'pycerfl.py'), 'file',
+                              os.path.join(self.project, 'a.py'), '--quiet'],
+                             capture_output=True, text=True)
+        self.assertEqual(run.returncode, 0)
+
+    def test_journal_of_other_target_ignored(self):
+        journal = checkpoint.Checkpoint('directory', '/elsewhere')
+        journal.start()
+        journal.close(completed=False)
+        pycerfl.analyze('directory', self.project, quiet_mode=True,
+                        resume=True)
+        summary = json.loads(self.read(pycerfl.RUN_SUMMARY_FILE))
+        self.assertEqual(summary['restored'], 0)
+        self.assertEqual(summary['analyzed'], 4)
+
+    def test_argument(self):
+        args = pycerfl.parse_Arguments(['directory', '.', '--resume'])
+        self.assertTrue(args.resume)
+        self.assertFalse(args.checkpoint)
+        args = pycerfl.parse_Arguments(['directory', '.', '--checkpoint'])
+        self.assertTrue(args.checkpoint)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import os
+import sys
+import socket
+import threading
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import daemon
+import pycerfl
+
+
+SOURCE = "def f(a=1):\n    return [x for x in range(a)]\n"
+
+
+class TestDaemon(unittest.TestCase):
+    """Tests for the serve daemon and its in-process fallback."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = daemon.create_Server(port=0, workers=1)
+        cls.port = cls.server.server_port
+        cls.thread = threading.Thread(target=cls.server.serve_forever,
+                                      daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.server.pool.shutdown()
+
+    def test_inline_source(self):
+        """The daemon analyzes inline source like the in-process path."""
+        request = {'source': SOURCE, 'path': 'snippet.py'}
+        served = daemon.analyze(request, port=self.port)
+        self.assertEqual(served['served_by'], 'daemon')
+        local = daemon.analyze_Request(request)
+        self.assertEqual(served['elements'], local['elements'])
+        self.assertEqual(served['levels'], local['levels'])
+        self.assertIn('C1', served['levels'])
+
+    def test_file_path(self):
+        """Relative paths are resolved by the client before sending."""
+        path = os.path.relpath(os.path.abspath(daemon.__file__))
+        served = daemon.analyze({'path': path}, port=self.port)
+        self.assertEqual(served['path'], os.path.abspath(path))
+        self.assertTrue(served['elements'])
+
+    def test_syntax_error(self):
+        """Invalid source is reported, not retried in-process."""
+        served = daemon.analyze({'source': 'def (:'}, port=self.port)
+        self.assertIn('error', served)
+        self.assertEqual(served['served_by'], 'daemon')
+
+    def test_bad_requests_are_answered(self):
+        """A body that is not an object, or a failing analysis, gets a reply."""
+        answer = daemon.request_Daemon([SOURCE], port=self.port)
+        self.assertIn('JSON object', answer['error'])
+        answer = daemon.request_Daemon({'source': 5}, port=self.port)
+        self.assertTrue(answer['error'].startswith('TypeError'))
+        # The daemon still serves the next request
+        served = daemon.analyze({'source': SOURCE}, port=self.port)
+        self.assertIn('C1', served['levels'])
+
+    def test_fallback_without_daemon(self):
+        """Without a daemon the client analyzes in-process."""
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            free_port = sock.getsockname()[1]
+        result = daemon.analyze({'source': SOURCE, 'path': 'snippet.py'},
+                                port=free_port)
+        self.assertEqual(result['served_by'], 'local')
+        self.assertIn('C1', result['levels'])
+
+    def test_address_defaults_come_from_the_daemon(self):
+        args = pycerfl.parse_Arguments(['client', 'x.py'])
+        self.assertEqual(pycerfl.daemon_Address(args), {})
+        args = pycerfl.parse_Arguments(['serve', '--host', '0.0.0.0',
+                                        '--port', '9000'])
+        self.assertEqual(pycerfl.daemon_Address(args),
+                         {'host': '0.0.0.0', 'port': 9000})
+
+
+if __name__ == '__main__':
+    unittest.main()
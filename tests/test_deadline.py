@@ -0,0 +1,112 @@
+import unittest
+import os
+import sys
+import csv
+import json
+import tempfile
+import time
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pycerfl
+import checkpoint
+from ClassIterTree import Budget
+
+
+CODE = "def f(items):\n    return [i * 2 for i in items]\n"
+
+
+class TestDeadline(unittest.TestCase):
+    """Tests for time-budgeted runs with partial results."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.tmp.name, 'org')
+        for repo in ('one', 'two'):
+            os.makedirs(os.path.join(self.project, repo))
+            for i in range(3):
+                path = os.path.join(self.project, repo, f'm{i}.py')
+                with open(path, 'w') as f:
+                    f.write(CODE + f'x = "{repo}{i}"\n')
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        pycerfl.run_deadline = None
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_round_robin_alternates_directories(self):
+        manifest = [('a/1.py', 'a'), ('a/2.py', 'a'), ('a/3.py', 'a'),
+                    ('b/1.py', 'b')]
+        ordered = [path for path, _ in pycerfl.round_Robin(manifest)]
+        self.assertEqual(ordered, ['a/1.py', 'b/1.py', 'a/2.py', 'a/3.py'])
+
+    def test_expired_deadline_writes_partial_outputs(self):
+        pycerfl.analyze('directory', self.project, quiet_mode=True,
+                        deadline=0, journal=True)
+        with open(pycerfl.RUN_SUMMARY_FILE) as f:
+            summary = json.load(f)
+        self.assertEqual(summary['deadline'],
+                         {'seconds': 0, 'partial': True, 'coverage': 0.0})
+        # The outputs are still valid, only empty
+        with open('data.json') as f:
+            self.assertEqual(json.load(f), {})
+        with open('data.csv') as f:
+            self.assertEqual(len(list(csv.reader(f))), 1)
+        # The journal of a --checkpoint run is kept for --resume
+        self.assertTrue(os.path.exists(checkpoint.CHECKPOINT_FILE))
+
+    def test_generous_deadline_is_complete(self):
+        pycerfl.analyze('directory', self.project, quiet_mode=True,
+                        deadline=60)
+        with open(pycerfl.RUN_SUMMARY_FILE) as f:
+            deadline = json.load(f)['deadline']
+        self.assertFalse(deadline['partial'])
+        self.assertEqual(deadline['coverage'], 100.0)
+        with open('data.json') as f:
+            data = json.load(f)
+        self.assertEqual(sum(len(files) for files in data.values()), 6)
+        self.assertFalse(os.path.exists(checkpoint.CHECKPOINT_FILE))
+
+    def test_coverage_counts_analyzed_files(self):
+        with open(os.path.join(self.project, 'one', 'bad.py'), 'w') as f:
+            f.write("def broken(:\n")
+        pycerfl.analyze('directory', self.project, quiet_mode=True,
+                        deadline=60)
+        with open(pycerfl.RUN_SUMMARY_FILE) as f:
+            summary = json.load(f)
+        self.assertEqual(summary['files'], 7)
+        self.assertEqual(summary['deadline']['coverage'],
+                         round(6 / 7 * 100, 1))
+
+    def test_coverage_leaves_out_budget_skips(self):
+        with open(os.path.join(self.project, 'one', 'm0.py'), 'a') as f:
+            f.write("TABLE = [" + ", ".join(str(i) for i in range(100)) + "]\n")
+        pycerfl.analyze('directory', self.project, quiet_mode=True,
+                        deadline=60, budget=Budget(max_nodes=50))
+        with open(pycerfl.RUN_SUMMARY_FILE) as f:
+            summary = json.load(f)
+        self.assertEqual([row['action'] for row in summary['limited']],
+                         ['skipped'])
+        self.assertEqual(summary['deadline']['coverage'],
+                         round(5 / 6 * 100, 1))
+
+    def test_file_budget_is_cut_at_the_deadline(self):
+        pycerfl.run_deadline = time.perf_counter() - 1
+        pycerfl.file_budget = Budget(max_nodes=10, max_seconds=5)
+        try:
+            budget = pycerfl.run_Budget()
+        finally:
+            pycerfl.file_budget = None
+        self.assertEqual(budget.max_seconds, 0.0)
+        self.assertEqual(budget.max_nodes, 10)
+
+    def test_arguments(self):
+        args = pycerfl.parse_Arguments(['directory', 'org', '--deadline', '30'])
+        self.assertEqual(args.deadline, 30.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
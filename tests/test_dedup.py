@@ -0,0 +1,67 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pycerfl
+
+
+SETUP_CODE = "from setuptools import setup\nsetup(name='x', packages=['x'])\n"
+OWN_CODE = "def f(items):\n    return [i * 2 for i in items]\n"
+
+
+class TestDeduplication(unittest.TestCase):
+    """Tests for the content-hash deduplication of a run."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.tmp.name, 'org')
+        # Two forks sharing setup.py, and a file of their own each
+        for repo in ('fork1', 'fork2'):
+            os.makedirs(os.path.join(self.project, repo))
+            with open(os.path.join(self.project, repo, 'setup.py'), 'w') as f:
+                f.write(SETUP_CODE)
+            with open(os.path.join(self.project, repo, 'own.py'), 'w') as f:
+                f.write(OWN_CODE + '# ' + repo + '\n')
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_identical_files_analyzed_once(self):
+        parsed = []
+        original = pycerfl.iterate_List
+        def counting(tree, pos, repo, **kwargs):
+            parsed.append(pos)
+            return original(tree, pos, repo, **kwargs)
+        pycerfl.iterate_List = counting
+        try:
+            pycerfl.analyze('directory', self.project, quiet_mode=True)
+        finally:
+            pycerfl.iterate_List = original
+
+        self.assertEqual(len(parsed), 3)
+        with open(pycerfl.RUN_SUMMARY_FILE) as f:
+            dedup = json.load(f)['dedup']
+        self.assertEqual(dedup['unique'], 3)
+        self.assertEqual(dedup['duplicates'], 1)
+        self.assertEqual(dedup['ratio'], 0.25)
+        self.assertEqual(dedup['bytes_saved'], len(SETUP_CODE))
+
+        # Each copy is reported under its own repository and path
+        with open('data.json') as f:
+            data = json.load(f)
+        self.assertEqual(sorted(data), ['fork1', 'fork2'])
+        self.assertEqual(data['fork1']['setup.py'], data['fork2']['setup.py'])
+        paths = {row.split(',')[1] for row in open('data.csv').read().splitlines()[1:]}
+        self.assertEqual(len(paths), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discovery
+import pycerfl
+
+
+CODE = "x = [1, 2, 3]\n"
+FILES = {
+    'app.py': CODE,
+    'models_pb2.py': CODE,
+    'schema.py': "# -*- coding: utf-8 -*-\n# Generated by the protocol buffer compiler.  DO NOT EDIT!\n" + CODE,
+    'docs.py': '"""Values generated by the user."""\n' + CODE,
+    os.path.join('migrations', '0001_initial.py'): CODE,
+    os.path.join('lib', 'site-packages', 'six.py'): CODE,
+    os.path.join('tests', 'test_app.py'): CODE,
+}
+
+
+class TestDiscoveryFilter(unittest.TestCase):
+    """Tests for the generated and vendored code filter."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.tmp.name, 'project')
+        for name, code in FILES.items():
+            path = os.path.join(self.project, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(code)
+        # Outputs are written to the current directory
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def run_analysis(self, **options):
+        pycerfl.analyze('directory', self.project, quiet_mode=True, **options)
+        with open('data.json') as f:
+            analyzed = sorted(name for files in json.load(f).values()
+                              for name in files)
+        with open(pycerfl.RUN_SUMMARY_FILE) as f:
+            excluded = {os.path.relpath(row['path'], self.project): row['reason']
+                        for row in json.load(f)['excluded']}
+        return analyzed, excluded
+
+    def test_heuristics(self):
+        analyzed, excluded = self.run_analysis()
+        # migrations, like build or vendor, may be the project's own code
+        self.assertEqual(analyzed, ['0001_initial.py', 'app.py', 'docs.py',
+                                    'test_app.py'])
+        self.assertIn('generated file name', excluded['models_pb2.py'])
+        self.assertIn('generated header', excluded['schema.py'])
+        self.assertIn('site-packages', excluded[os.path.join('lib', 'site-packages')])
+        self.assertEqual(pycerfl.total_files_found, 4)
+
+    def test_allow_and_deny_lists(self):
+        analyzed, excluded = self.run_analysis(include=['lib/site-packages/*'],
+                                               exclude=['tests/*'])
+        self.assertEqual(analyzed, ['0001_initial.py', 'app.py', 'docs.py',
+                                    'six.py'])
+        self.assertIn('excluded by pattern', excluded[os.path.join('tests', 'test_app.py')])
+
+    def test_all_files(self):
+        analyzed, excluded = self.run_analysis(skip_generated=False)
+        self.assertEqual(len(analyzed), len(FILES))
+        self.assertEqual(excluded, {})
+
+    def test_header_sniff_limited_to_head(self):
+        path = os.path.join(self.project, 'late.py')
+        with open(path, 'w') as f:
+            f.write(CODE * 2000 + "# auto-generated\n")
+        self.assertIsNone(discovery.sniff_Header(path))
+
+    def test_header_ends_at_the_first_statement(self):
+        path = os.path.join(self.project, 'tool.py')
+        with open(path, 'w') as f:
+            f.write("import re\n# Do not edit the pattern below\n" + CODE)
+        self.assertIsNone(discovery.sniff_Header(path))
+        # Comments after the module docstring are still the header
+        with open(path, 'w') as f:
+            f.write("#!/usr/bin/env python\n'''Module.\n\n# not a comment\n'''\n"
+                    "\n# @generated by tool\n" + CODE)
+        self.assertEqual(discovery.sniff_Header(path), '# @generated by tool')
+
+    def test_arguments(self):
+        args = pycerfl.parse_Arguments(['directory', '.', '--include', 'a/*',
+                                        '--exclude', 'b/*', '--exclude', 'c',
+                                        '--all-files'])
+        self.assertEqual(args.include, ['a/*'])
+        self.assertEqual(args.exclude, ['b/*', 'c'])
+        self.assertTrue(args.all_files)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+import os
+import sys
+import tempfile
+import io
+import json
+import threading
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import events
+import pycerfl
+
+
+SAMPLE_CODE = """
+def add(a, b=1):
+    return a + b
+
+for i in range(3):
+    print(add(i))
+"""
+
+
+class TestInProcessAnalysis(unittest.TestCase):
+    """Tests for pycerfl.analyze and the progress events it emits."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.tmp.name, 'project')
+        os.makedirs(os.path.join(self.project, 'pkg'))
+        for name in ('one.py', os.path.join('pkg', 'two.py')):
+            with open(os.path.join(self.project, name), 'w') as f:
+                f.write(SAMPLE_CODE)
+        self.received = []
+        events.subscribe(self.received.append)
+        # Outputs are written to the current directory
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        events.unsubscribe(self.received.append)
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def kinds(self):
+        return [e['event'] for e in self.received]
+
+    def test_directory_events(self):
+        """A directory run reports discovery, each file and a summary."""
+        pycerfl.analyze('directory', self.project)
+
+        self.assertEqual(self.kinds()[0], events.DISCOVERED)
+        self.assertEqual(self.received[0]['total'], 2)
+        done = [e for e in self.received if e['event'] == events.FILE_DONE]
+        self.assertEqual(sorted(e['file'] for e in done), ['one.py', 'two.py'])
+        self.assertTrue(all(e['elements'] > 0 for e in done))
+        self.assertEqual(self.kinds()[-1], events.SUMMARY)
+        summary = self.received[-1]
+        self.assertEqual(summary['files'], 2)
+        self.assertEqual(summary['elements'], sum(e['elements'] for e in done))
+        self.assertEqual(sum(summary['levels'].values()), summary['elements'])
+
+    def test_repeated_runs_do_not_accumulate(self):
+        """Each in-process run starts from empty global storage."""
+        pycerfl.analyze('directory', self.project)
+        first = self.received[-1]
+        pycerfl.analyze('directory', self.project)
+        second = self.received[-1]
+        self.assertEqual(first['elements'], second['elements'])
+        self.assertEqual(first['levels'], second['levels'])
+
+    def test_no_listener_no_events(self):
+        """Emitting without listeners is a no-op."""
+        events.unsubscribe(self.received.append)
+        events.emit(events.ERROR, message='ignored')
+        self.assertEqual(self.received, [])
+
+    def test_listener_gets_only_its_run(self):
+        """A run waiting for the lock does not receive the running one's events."""
+        own = []
+        waiting = threading.Thread(target=pycerfl.analyze, args=(
+            'directory', self.project), kwargs={'quiet_mode': True,
+                                                'listener': own.append})
+        with pycerfl.analysis_lock:
+            waiting.start()
+            # Stands for the events of the run holding the lock
+            events.emit(events.ERROR, message='other session')
+        waiting.join()
+        self.assertNotIn('other session', [e.get('message') for e in own])
+        self.assertEqual(own[-1]['event'], events.SUMMARY)
+        self.assertNotIn(own.append, events.listeners)
+
+
+class TestNdjsonEvents(unittest.TestCase):
+    """Tests for the NDJSON event stream of the command line."""
+
+    def test_one_json_object_per_line(self):
+        """Each event becomes one parseable line."""
+        stream = io.StringIO()
+        writer = events.NdjsonWriter(stream, interval=3600)
+        writer({'event': events.DISCOVERED, 'total': 2})
+        writer({'event': events.FILE_DONE, 'file': 'a.py', 'elements': 4})
+        lines = stream.getvalue().splitlines()
+        self.assertEqual([json.loads(l)['event'] for l in lines],
+                         [events.DISCOVERED, events.FILE_DONE])
+
+    def test_flush_is_rate_limited(self):
+        """Every event is a line; the stream is flushed once per interval."""
+        class CountingStream(io.StringIO):
+            flushes = 0
+            def flush(self):
+                self.flushes += 1
+
+        stream = CountingStream()
+        writer = events.NdjsonWriter(stream, interval=3600)
+        for i in range(100):
+            writer({'event': events.FILE_DONE, 'file': f'f{i}.py',
+                    'elements': i, 'duration': 0.001})
+        self.assertEqual(stream.flushes, 1)
+        writer({'event': events.SUMMARY, 'files': 100})
+        self.assertEqual(stream.flushes, 2)
+        # Each file keeps its own line with its counts and duration
+        lines = [json.loads(l) for l in stream.getvalue().splitlines()]
+        done = [line for line in lines if line['event'] == events.FILE_DONE]
+        self.assertEqual([line['file'] for line in done],
+                         [f'f{i}.py' for i in range(100)])
+        self.assertEqual(sum(line['elements'] for line in done), 4950)
+        self.assertEqual(lines[-1]['event'], events.SUMMARY)
+
+    def test_arguments(self):
+        """The command line accepts the event and quiet options."""
+        args = pycerfl.parse_Arguments(['directory', '.', '--events', 'ndjson',
+                                        '--quiet'])
+        self.assertEqual(args.type_option, 'directory')
+        self.assertEqual(args.events, 'ndjson')
+        self.assertTrue(args.quiet)
+        args = pycerfl.parse_Arguments(['file', 'x.py'])
+        self.assertEqual(args.events, 'text')
+        self.assertFalse(args.quiet)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import getjson
+import getcsv
+from ClassIterTree import FileResult
+
+
+def element(clase, level):
+    return {'Class': clase, 'Start Line': '1', 'End Line': '1',
+            'Displacement': '0', 'Level': level}
+
+
+class TestExtractLevels(unittest.TestCase):
+    """Tests for the level and class summaries."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        # Summaries are written to DATA_JSON in the current directory
+        os.chdir(self.tmp.name)
+        getjson.reset_Results()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+        getjson.reset_Results()
+
+    def test_counts_per_file_repository_and_total(self):
+        data = {
+            'repo1': {
+                'a.py': [element('Simple List', 'A1'),
+                         element('Nested List 2', 'B1'),
+                         element('Simple List', 'A1')],
+                'b.py': [element('Nested List 3', 'B1')],
+            },
+            'repo2': {
+                'c.py': [element('Lambda', 'C1'), element('Simple List', 'A1')],
+                'empty.py': [],
+            },
+        }
+        getjson.extract_Levels(data)
+
+        self.assertEqual(getjson.dict_total['repo1']['a.py'], {
+            'Levels': {'A1': 2, 'B1': 1},
+            'Class': {'Simple List': 2, 'Nested List': 1}})
+        self.assertEqual(getjson.dict_total['repo1']['b.py'], {
+            'Levels': {'B1': 1}, 'Class': {'Nested List': 1}})
+        self.assertEqual(getjson.dict_total['repo2']['empty.py'], {})
+        self.assertEqual(getjson.dict_repo['repo1']['Class'],
+                         {'Simple List': 2, 'Nested List': 2})
+        self.assertEqual(getjson.dict_summary['Levels'],
+                         {'A1': 3, 'B1': 2, 'C1': 1})
+        self.assertTrue(os.path.exists(os.path.join('DATA_JSON', 'repo1.json')))
+
+    def test_keys_in_order_of_appearance(self):
+        data = {'repo': {'a.py': [element('If', 'B2'), element('Call', 'A1')],
+                         'b.py': [element('Call', 'A1'), element('If', 'B2')]}}
+        getjson.extract_Levels(data)
+
+        self.assertEqual(list(getjson.dict_total['repo']['b.py']['Levels']),
+                         ['A1', 'B2'])
+        self.assertEqual(list(getjson.dict_summary['Levels']), ['B2', 'A1'])
+
+
+class TestFileCsv(unittest.TestCase):
+    """Tests for the per-file CSV files."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_header_matches_the_rows(self):
+        result = FileResult('repo', '/t/a.py', 'a.py')
+        result.append('Simple List', 'List.simple', 1, 1, 0, 'A1')
+        rows = result.csv_Rows()
+        self.assertEqual(len(getcsv.CSV_HEADER), len(rows[0]))
+        getcsv.write_FileCsv([getcsv.CSV_HEADER] + rows, '/t/a.py')
+        with open(os.path.join('DATA_CSV', 'a.csv'), newline='') as f:
+            header, row = list(getcsv.csv.reader(f))
+        self.assertEqual(dict(zip(header, row))['Level'], 'A1')
+        self.assertEqual(dict(zip(header, row))['Absolute Path'], '/t/a.py')
+
+    def test_each_file_written_once(self):
+        rows = [getcsv.CSV_HEADER]
+        for name in ('a', 'b'):
+            result = FileResult('repo', f'/t/{name}.py', f'{name}.py')
+            for line in range(1, 4):
+                result.append('Simple List', 'List.simple', line, line, 0,
+                              'A1')
+            rows += result.csv_Rows()
+        written = []
+        original = getcsv.write_FileCsv
+        getcsv.write_FileCsv = lambda data, name: written.append(
+            (name, len(data)))
+        try:
+            getcsv.create_csv(rows)
+        finally:
+            getcsv.write_FileCsv = original
+        self.assertEqual(written, [('/t/a.py', 4), ('/t/b.py', 4)])
+
+
+if __name__ == '__main__':
+    unittest.main()
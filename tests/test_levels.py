@@ -264,6 +264,46 @@ class TestLevels(unittest.TestCase):
         self.assertEqual(mock.level, 'B1')
         self.assertIn('With', mock.clase)
 
+    def test_class_id_recorded(self):
+        code = "[[1, 2], [3, 4]]"
+        tree = ast.parse(code)
+        list_node = tree.body[0].value
+
+        mock = MockIterTree(list_node, 'ast.List')
+        levels.level_List(mock)
+
+        self.assertEqual(mock.class_id, 'List.nested')
+        self.assertEqual(levels.get_Categories()[mock.class_id], 'Data Structures')
+
+    def test_class_categories_cover_rules(self):
+        for section, key in levels.get_Rules():
+            class_id = section + '.' + key
+            self.assertIn(class_id, levels.get_Categories())
+            self.assertNotEqual(levels.get_Categories()[class_id], 'Other')
+
+    def test_rules_compiled_from_configuration(self):
+        rules = levels.compile_Rules(levels.CONFIG_FILE)
+        self.assertEqual(rules[('Loop', 'range')], 'A2')
+        self.assertEqual(rules[('Exception', 'assert')], 'B2')
+        self.assertEqual(rules, levels.get_Rules())
+
+    def test_dispatch_by_node_type(self):
+        code = "for i in range(10): pass"
+        tree = ast.parse(code)
+        for_node = tree.body[0]
+
+        # The handler is chosen from the node type, not the attribute string
+        mock = MockIterTree(for_node, '')
+        levels.levels(mock)
+
+        self.assertEqual(mock.level, 'A1')
+        self.assertEqual(mock.class_id, 'Loop.for-simple')
+
+    def test_dispatch_covers_analyzed_types(self):
+        from ClassIterTree import TYPE_MAP
+        for node_type in TYPE_MAP.values():
+            self.assertIn(node_type, levels.HANDLERS)
+
     def test_lambda(self):
         code = "lambda x: x+1"
         tree = ast.parse(code)
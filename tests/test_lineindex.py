@@ -0,0 +1,101 @@
+import unittest
+import os
+import sys
+import random
+import tempfile
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pycerfl
+import lineindex
+
+
+CODE = """import os
+
+
+def walk(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            yield path
+
+
+class Tree:
+    pass
+"""
+
+
+def covers(row, line, col):
+    """ Reference answer: does the element cover the position? """
+    if col is None:
+        return row[3] <= line <= row[4]
+    return ((row[3] < line or (row[3] == line and row[5] <= col))
+            and line <= row[4])
+
+
+class TestLineIndex(unittest.TestCase):
+    """Tests for the interval index of the elements of a file."""
+
+    def test_matches_a_scan_of_the_rows(self):
+        rng = random.Random(1)
+        for n in (0, 1, 2, 7, 16, 33, 300):
+            rows = []
+            for _ in range(n):
+                start = rng.randint(1, 200)
+                rows.append(['C', 'id', 'A1', start,
+                             start + rng.choice([0, 1, 3, 40, 150]),
+                             rng.randint(0, 40)])
+            rows.sort(key=lambda row: (row[3], row[5]))
+            index = lineindex.LineIndex(rows)
+            for _ in range(100):
+                line = rng.randint(0, 260)
+                col = rng.choice([None, 0, 4, 30])
+                found = [(e['Start Line'], e['End Line'], e['Displacement'])
+                         for e in index.lookup(line, col)]
+                expected = [(row[3], row[4], row[5]) for row in rows
+                            if covers(row, line, col)]
+                self.assertEqual(found, expected)
+
+    def test_column_on_the_start_line(self):
+        index = lineindex.LineIndex([['Outer', 'o', 'A1', 1, 3, 0],
+                                     ['Inner', 'i', 'B1', 2, 2, 8]])
+        self.assertEqual([e['Class'] for e in index.lookup(2, 4)], ['Outer'])
+        self.assertEqual([e['Class'] for e in index.lookup(2, 8)],
+                         ['Outer', 'Inner'])
+        self.assertEqual([e['Class'] for e in index.lookup(2)],
+                         ['Outer', 'Inner'])
+        self.assertEqual(index.lookup(4), [])
+
+
+class TestPersistedIndex(unittest.TestCase):
+    """Tests for the index written next to the results of a run."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'walk.py')
+        with open(self.path, 'w') as f:
+            f.write(CODE)
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_lookup_after_a_run(self):
+        pycerfl.analyze('file', self.path, quiet_mode=True)
+        self.assertTrue(os.path.exists(lineindex.INDEX_FILE))
+        found = lineindex.lookup(self.path, 6, 12)
+        starts = [e['Start Line'] for e in found]
+        self.assertEqual(starts, sorted(starts))
+        self.assertIn('FunctionDef.simple',
+                      [e['Class ID'] for e in found])
+        # Every element of data.csv on that line is found
+        lines = [row for result in pycerfl.global_results
+                 for row in result.csv_Rows() if row[4] <= 6 <= row[5]]
+        self.assertEqual(len(lineindex.lookup(self.path, 6)), len(lines))
+        self.assertEqual(lineindex.lookup('missing.py', 1), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+import unittest
+import os
+import sys
+import ast
+import io
+import json
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lsp
+from ClassIterTree import FileAnalyzer
+from lineindex import element_Rows
+
+
+CODE = """import os
+
+
+def first(items):
+    return [i * 2 for i in items]
+
+
+@staticmethod
+def second(a, b=1):
+    if a:
+        return a
+    return b
+
+
+class Third:
+    x = {'a': (1, 2)}
+"""
+URI = 'file:///tmp/buffer.py'
+
+
+def full_Rows(text):
+    """ Rows of a complete analysis of the text. """
+    result = FileAnalyzer(ast.parse(text), 'buffer.py', '/tmp',
+                          '/tmp/buffer.py').analyze()
+    return sorted(map(tuple, element_Rows(result)))
+
+
+def edit(line, start, end, text, end_line=None):
+    """ An incremental contentChanges entry. """
+    return {'range': {'start': {'line': line, 'character': start},
+                      'end': {'line': line if end_line is None else end_line,
+                              'character': end}},
+            'text': text}
+
+
+class TestDocument(unittest.TestCase):
+    """Tests for the incremental analysis of an open buffer."""
+
+    def setUp(self):
+        self.document = lsp.Document(URI, CODE)
+
+    def assertMatchesFullAnalysis(self):
+        self.assertEqual(sorted(map(tuple, self.document.rows())),
+                         full_Rows(self.document.text()))
+
+    def test_open(self):
+        self.assertEqual(len(self.document.segments), 4)
+        self.assertEqual(self.document.segments[2].start, 8)
+        self.assertMatchesFullAnalysis()
+
+    def test_only_the_changed_statement_is_classified(self):
+        before = self.document.classified
+        self.document.apply_Change(edit(11, 14, 14, ' + 1'))
+        self.assertTrue(self.document.analyze_Changes())
+        self.assertEqual(self.document.classified - before, 1)
+        self.assertMatchesFullAnalysis()
+
+    def test_lines_added_above_shift_cached_statements(self):
+        before = self.document.classified
+        self.document.apply_Change(edit(1, 0, 0, 'x = 1\ny = 2\n'))
+        self.assertTrue(self.document.analyze_Changes())
+        self.assertEqual(self.document.classified - before, 2)
+        self.assertMatchesFullAnalysis()
+
+    def test_edit_joining_statements(self):
+        # Indenting the class makes it part of the function above
+        self.document.apply_Change(edit(15, 0, 0, '    '))
+        self.document.apply_Change(edit(16, 0, 0, '    '))
+        self.document.apply_Change(edit(14, 0, 0, '    '))
+        self.assertTrue(self.document.analyze_Changes())
+        self.assertEqual(len(self.document.segments), 3)
+        self.assertMatchesFullAnalysis()
+
+    def test_invalid_edit_keeps_the_last_results(self):
+        rows = self.document.rows()
+        self.document.apply_Change(edit(4, 12, 12, '(('))
+        self.assertFalse(self.document.analyze_Changes())
+        self.assertEqual(len(self.document.rows()), len(rows) - 3)
+        self.document.apply_Change(edit(4, 12, 14, ''))
+        self.assertTrue(self.document.analyze_Changes())
+        self.assertEqual(self.document.rows(), rows)
+
+    def test_string_opened_beyond_the_region(self):
+        text = 'a = 1\nb = 2\nc = 3\nd = 4\nt = 5  #\'\'\'\n'
+        self.document = lsp.Document(URI, text)
+        self.document.apply_Change(edit(0, 4, 5, "'''"))
+        self.assertTrue(self.document.analyze_Changes())
+        self.assertEqual(len(self.document.segments), 1)
+        self.assertMatchesFullAnalysis()
+
+    def test_hover_and_hints(self):
+        hover = self.document.hover(4, 12)
+        self.assertIn('Function with Simple argument', hover)
+        self.assertIn('List Comprehension', hover)
+        hints = self.document.inlay_Hints(0, 16)
+        self.assertEqual([hint['position']['line'] for hint in hints],
+                         sorted({row[3] - 1 for row in self.document.rows()}))
+
+    def test_utf16_columns(self):
+        line = 'x = "\U0001F600" + y'
+        self.assertEqual(lsp.byte_Column(line, 10), 12)
+        self.assertEqual(lsp.lsp_Column(line, 12), 10)
+        self.assertEqual(lsp.level_Rank('B1C1'), lsp.LEVELS.index('C1'))
+
+
+def frame(message):
+    body = json.dumps(message).encode('utf-8')
+    return b'Content-Length: %d\r\n\r\n' % len(body) + body
+
+
+class TestServer(unittest.TestCase):
+    """Tests for the JSON-RPC session over stdio."""
+
+    def run_Session(self, messages):
+        reader = io.BytesIO(b''.join(frame(m) for m in messages))
+        writer = io.BytesIO()
+        self.log = io.StringIO()
+        code = lsp.Server(reader, writer, self.log).run()
+        replies = lsp.Server(io.BytesIO(writer.getvalue()), io.BytesIO())
+        out = []
+        while True:
+            message = replies.read_Message()
+            if message is None:
+                return code, out
+            out.append(message)
+
+    def test_session(self):
+        code, out = self.run_Session([
+            {'jsonrpc': '2.0', 'id': 1, 'method': 'initialize',
+             'params': {'initializationOptions': {'diagnosticLevel': 'B1'}}},
+            {'jsonrpc': '2.0', 'method': 'initialized', 'params': {}},
+            {'jsonrpc': '2.0', 'method': 'textDocument/didOpen',
+             'params': {'textDocument': {'uri': URI, 'version': 1,
+                                         'text': CODE}}},
+            {'jsonrpc': '2.0', 'method': 'textDocument/didChange',
+             'params': {'textDocument': {'uri': URI, 'version': 2},
+                        'contentChanges': [edit(16, 0, 0, '    y = lambda: 0\n')]}},
+            {'jsonrpc': '2.0', 'id': 2, 'method': 'textDocument/hover',
+             'params': {'textDocument': {'uri': URI},
+                        'position': {'line': 16, 'character': 10}}},
+            {'jsonrpc': '2.0', 'id': 3, 'method': 'unknown/method'},
+            {'jsonrpc': '2.0', 'id': 4, 'method': 'shutdown'},
+            {'jsonrpc': '2.0', 'method': 'exit'}])
+        self.assertEqual(code, 0)
+        capabilities = out[0]['result']['capabilities']
+        self.assertEqual(capabilities['textDocumentSync']['change'],
+                         lsp.SYNC_INCREMENTAL)
+        published = [m['params'] for m in out
+                     if m.get('method') == 'textDocument/publishDiagnostics']
+        self.assertEqual([p['version'] for p in published], [1, 2])
+        self.assertIn('B1: Lambda',
+                      [d['message'] for d in published[1]['diagnostics']])
+        replies = {m['id']: m for m in out if 'id' in m}
+        self.assertIn('Lambda', replies[2]['result']['contents']['value'])
+        self.assertEqual(replies[3]['error']['code'], lsp.METHOD_NOT_FOUND)
+        self.assertIsNone(replies[4]['result'])
+
+    def test_bad_requests_do_not_stop_the_server(self):
+        hover = {'textDocument': {'uri': URI},
+                 'position': {'line': 3, 'character': 12}}
+        original = lsp.Document.inlay_Hints
+        def recursing(document, first, last):
+            raise RecursionError('maximum recursion depth exceeded')
+        messages = [
+            {'jsonrpc': '2.0', 'id': 1, 'method': 'initialize',
+             'params': {'initializationOptions': {'diagnosticLevel': 'Z9'}}},
+            {'jsonrpc': '2.0', 'method': 'textDocument/didOpen',
+             'params': {'textDocument': {'uri': URI, 'text': CODE}}},
+            {'jsonrpc': '2.0', 'id': 2, 'method': 'textDocument/inlayHint',
+             'params': {'textDocument': {'uri': URI}}},
+            {'jsonrpc': '2.0', 'method': 'textDocument/didChange',
+             'params': {'textDocument': {'uri': URI}}},
+            {'jsonrpc': '2.0', 'id': 3, 'method': 'textDocument/inlayHint',
+             'params': {'textDocument': {'uri': URI},
+                        'range': {'start': {'line': 0, 'character': 0},
+                                  'end': {'line': 5, 'character': 0}}}},
+            {'jsonrpc': '2.0', 'id': 4, 'method': 'textDocument/hover',
+             'params': hover},
+            {'jsonrpc': '2.0', 'id': 5, 'method': 'shutdown'},
+            {'jsonrpc': '2.0', 'method': 'exit'}]
+        lsp.Document.inlay_Hints = recursing
+        try:
+            code, out = self.run_Session(messages)
+        finally:
+            lsp.Document.inlay_Hints = original
+        self.assertEqual(code, 0)
+        replies = {m['id']: m for m in out if 'id' in m}
+        self.assertEqual(replies[1]['error']['code'], lsp.INVALID_PARAMS)
+        self.assertEqual(replies[2]['error']['code'], lsp.INVALID_PARAMS)
+        self.assertEqual(replies[3]['error']['code'], lsp.INTERNAL_ERROR)
+        self.assertIn('Simple', replies[4]['result']['contents']['value'])
+        self.assertIn('textDocument/didChange failed', self.log.getvalue())
+
+    def test_malformed_message(self):
+        reader = io.BytesIO(b'Content-Length: 5\r\n\r\n{bad}'
+                            + frame({'jsonrpc': '2.0', 'method': 'exit'}))
+        writer = io.BytesIO()
+        self.assertEqual(lsp.Server(reader, writer, io.StringIO()).run(), 1)
+        reply = lsp.Server(io.BytesIO(writer.getvalue())).read_Message()
+        self.assertEqual(reply['error']['code'], lsp.PARSE_ERROR)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+import tracemalloc
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmark
+import memprofile
+import pycerfl
+import tracing
+
+#-- Memory budget of the reference corpus below, in bytes
+REFERENCE_BUDGET = 64 * 1024 * 1024
+
+
+class TestMemoryProfile(unittest.TestCase):
+    """Tests for the tracemalloc memory accounting."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.corpus = os.path.join(self.tmp.name, 'corpus')
+        benchmark.generate_Corpus(self.corpus, files=4, seed=0)
+        # Outputs are written to the current directory
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        memprofile.disable()
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_stages_and_files(self):
+        memprofile.enable()
+        pycerfl.analyze('directory', self.corpus, quiet_mode=True)
+        memprofile.disable()
+
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertFalse(tracing.active)
+        memprofile.save_Report('memprofile.json')
+        with open('memprofile.json') as f:
+            summary = json.load(f)
+        stages = [row['stage'] for row in summary['stages']]
+        self.assertEqual(stages[-1], 'analysis')
+        self.assertIn('write_outputs', stages)
+        self.assertEqual(len(summary['files']), 4)
+        self.assertTrue(all(row['peak'] > 0 for row in summary['files']))
+        self.assertTrue(summary['top_sites'])
+        # The check CI runs on the reference corpus
+        self.assertLess(summary['peak'], REFERENCE_BUDGET)
+        self.assertIn('MEMORY PROFILE', memprofile.report())
+
+    def test_argument(self):
+        args = pycerfl.parse_Arguments(['directory', '.', '--memprofile'])
+        self.assertTrue(args.memprofile)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,7 +6,8 @@ import os
 # Add parent directory to path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from ClassIterTree import IterTree, TYPE_MAP, REVERSE_TYPE_MAP
+from ClassIterTree import (IterTree, FileAnalyzer, FileResult, TYPE_MAP,
+                           REVERSE_TYPE_MAP, CLASS_ID_TABLE, LEVEL_TABLE)
 import levels
 
 
@@ -161,6 +162,25 @@ except Exception:
         self.assertEqual(len(single_csv), len(multi_csv))
         self.assertEqual(single_json, multi_json)
 
+    def test_file_analyzer_matches_multi_pass(self):
+        """One FileAnalyzer gives the rows of one IterTree per attribute."""
+        code = """
+def fibonacci(n):
+    if n <= 1:
+        return n
+    return [fibonacci(i) for i in range(n)]
+
+with open('f') as f:
+    data = {'a': f.read()}
+"""
+        multi_csv, multi_json = self._get_results_multi_pass(code)
+        analyzer = FileAnalyzer(ast.parse(code), 'test.py', 'test_repo')
+        analyzer.analyze()
+        single_csv, single_json = analyzer.get_results()
+
+        self.assertEqual(single_csv, multi_csv)
+        self.assertEqual(single_json, multi_json)
+
     def test_pre_collected_nodes_mode(self):
         """IterTree should work when receiving pre-collected nodes."""
         code = "[1, 2, 3]"
@@ -174,7 +194,57 @@ except Exception:
         csv_rows, json_data = obj.get_results()
 
         self.assertTrue(len(csv_rows) > 0)
-        self.assertEqual(csv_rows[0][6], 'A1')  # Level should be A1 for simple list
+        self.assertEqual(csv_rows[0][7], 'A1')  # Level should be A1 for simple list
+
+
+
+class TestFileResult(unittest.TestCase):
+    """Tests for the compact per-file element container."""
+
+    def test_layouts_at_sink(self):
+        """FileResult converts to the data.csv and data.json layouts."""
+        result = FileResult('repo', '/abs/repo/a.py', 'a.py')
+        result.append('Simple List', 'List.simple', 3, 4, 8, 'A1')
+        result.append('Simple List', 'List.simple', 5, 5, 0, 'A1')
+
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result.csv_Rows()[0],
+                         ['repo', '/abs/repo/a.py', 'a.py', 'Simple List', 3, 4,
+                          8, 'A1', 'List.simple', 'Data Structures'])
+        json_data = {}
+        result.add_Json(json_data)
+        self.assertEqual(json_data['repo']['a.py'][1]['Start Line'], '5')
+        self.assertEqual(json_data['repo']['a.py'][1]['Level'], 'A1')
+
+    def test_strings_interned(self):
+        """Rule IDs and levels are stored once and rows keep integer codes."""
+        result = FileResult('repo', '/abs/repo/a.py', 'a.py')
+        for line in range(1, 100):
+            result.append('Simple List', 'List.simple', line, line, 0, 'A1')
+        self.assertEqual(len(set(result.class_ids)), 1)
+        self.assertEqual(len(set(result.levels)), 1)
+        self.assertEqual(result.starts.typecode, 'i')
+
+    def test_class_strings_kept_per_result(self):
+        """Classes naming identifiers do not pile up in the shared tables."""
+        sizes = (len(CLASS_ID_TABLE.values), len(LEVEL_TABLE.values))
+        result = FileResult('repo', '/abs/repo/a.py', 'a.py')
+        for i in range(100):
+            result.append(f'Inherited Class from Base{i}', 'Class.inherited',
+                          i + 1, i + 1, 0, 'B1')
+        self.assertLessEqual(len(CLASS_ID_TABLE.values), sizes[0] + 1)
+        self.assertLessEqual(len(LEVEL_TABLE.values), sizes[1] + 1)
+        self.assertEqual(result.csv_Rows()[99][3], 'Inherited Class from Base99')
+
+    def test_extend(self):
+        """Results of the same file can be merged."""
+        first = FileResult('repo', '/abs/repo/a.py', 'a.py')
+        first.append('Simple List', 'List.simple', 1, 1, 0, 'A1')
+        second = FileResult('repo', '/abs/repo/a.py', 'a.py')
+        second.append('Simple Tuple', 'Tuple.simple', 2, 2, 0, 'A1')
+        first.extend(second)
+        self.assertEqual([row[3] for row in first.csv_Rows()],
+                         ['Simple List', 'Simple Tuple'])
 
 
 class TestIsinstanceChecks(unittest.TestCase):
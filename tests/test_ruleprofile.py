@@ -0,0 +1,81 @@
+import unittest
+import os
+import sys
+import ast
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import levels
+import pycerfl
+import ruleprofile
+from ClassIterTree import FileAnalyzer
+
+
+SAMPLE_CODE = """
+def fact(n):
+    return 1 if n < 2 else n * fact(n - 1)
+
+class Point:
+    def __init__(self):
+        self.x = [1, 2]
+"""
+
+
+def analyze(code, path='/repo/sample.py'):
+    return FileAnalyzer(ast.parse(code), 'sample.py', '/repo', path).analyze()
+
+
+class TestRuleProfile(unittest.TestCase):
+    """Tests for the opt-in rule profiler."""
+
+    def setUp(self):
+        ruleprofile.reset()
+
+    def tearDown(self):
+        ruleprofile.disable()
+        ruleprofile.reset()
+
+    def test_disabled_by_default(self):
+        """Without --profile-rules the dispatch holds the plain rules."""
+        self.assertIs(levels.HANDLERS[ast.ClassDef], levels.level_Class)
+        self.assertIs(levels.LOOP_HANDLERS[ast.For], levels.level_For)
+
+    def test_disable_restores_rules(self):
+        handlers = dict(levels.HANDLERS)
+        recursive = levels.level_RecursiveFunction
+        ruleprofile.enable()
+        self.assertIsNot(levels.HANDLERS[ast.ClassDef], levels.level_Class)
+        ruleprofile.disable()
+        self.assertEqual(levels.HANDLERS, handlers)
+        self.assertIs(levels.level_RecursiveFunction, recursive)
+
+    def test_counts_rules_and_files(self):
+        """Dispatched and nested rules are counted; files get a ledger entry."""
+        plain = analyze(SAMPLE_CODE).csv_Rows()
+        ruleprofile.enable()
+        profiled = analyze(SAMPLE_CODE).csv_Rows()
+        ruleprofile.disable()
+
+        self.assertEqual(profiled, plain)
+        rules = {row['rule']: row for row in ruleprofile.rule_Rows()}
+        self.assertEqual(rules['level_FunctionDef']['calls'], 2)
+        self.assertEqual(rules['level_RecursiveFunction']['calls'], 2)
+        self.assertEqual(rules['level_Class']['calls'], 1)
+        # Time per call of the rule, not per node of the file
+        row = rules['level_FunctionDef']
+        self.assertAlmostEqual(row['per_call_us'],
+                               row['seconds'] / row['calls'] * 1e6)
+        files = ruleprofile.file_Rows()
+        self.assertEqual(files[0]['path'], '/repo/sample.py')
+        self.assertGreater(files[0]['nodes'], 0)
+        self.assertIn('level_Class', ruleprofile.report())
+        self.assertIn('us/call', ruleprofile.report())
+
+    def test_argument(self):
+        args = pycerfl.parse_Arguments(['directory', '.', '--profile-rules'])
+        self.assertTrue(args.profile_rules)
+
+
+if __name__ == '__main__':
+    unittest.main()
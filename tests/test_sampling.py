@@ -0,0 +1,154 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pycerfl
+import sampling
+
+
+CODE = "def f(items):\n    return [i * 2 for i in items]\n"
+
+
+def make_Manifest(root, repos, files):
+    """ Write small distinct files and return their manifest. """
+    manifest = []
+    for repo in repos:
+        os.makedirs(os.path.join(root, repo))
+        for i in range(files):
+            path = os.path.join(root, repo, f'm{i}.py')
+            with open(path, 'w') as f:
+                f.write(CODE + f'x = {i}\n')
+            manifest.append((path, repo))
+    return manifest
+
+
+class TestSampler(unittest.TestCase):
+    """Tests for the stratified sampler."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manifest = make_Manifest(self.tmp.name, ('a', 'b', 'c'), 150)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_seed_is_deterministic(self):
+        first = sampling.Sampler(self.manifest, self.tmp.name, seed=3)
+        second = sampling.Sampler(self.manifest, self.tmp.name, seed=3)
+        self.assertEqual(first.next_Batch(), second.next_Batch())
+
+    def test_first_round_covers_every_stratum(self):
+        sampler = sampling.Sampler(self.manifest, self.tmp.name)
+        batch = sampler.next_Batch()
+        # Proportional shares are rounded per stratum
+        self.assertLessEqual(abs(len(batch) - sampling.FIRST_ROUND),
+                             len(sampler.strata))
+        self.assertEqual({key for key, _, _ in batch}, set(sampler.strata))
+
+    def test_stops_on_precision(self):
+        sampler = sampling.Sampler(self.manifest, self.tmp.name, precision=0.5)
+        for key, _, _ in sampler.next_Batch():
+            sampler.add(key, ['A1', 'A1', 'B2'])
+        self.assertEqual(sampler.stop_Reason(), 'precision')
+        row = sampler.report('precision')['levels']['A1']
+        self.assertAlmostEqual(row['estimate'], 2 / 3, places=3)
+        self.assertEqual(row['elements'], 900)
+
+    def test_stops_on_time(self):
+        sampler = sampling.Sampler(self.manifest, self.tmp.name,
+                                   precision=0.0, seconds=1e-9)
+        for i, (key, _, _) in enumerate(sampler.next_Batch()):
+            sampler.add(key, ['A1'] if i % 2 else ['C2'])
+        self.assertEqual(sampler.stop_Reason(), 'time')
+
+    def test_left_out_files_are_not_estimated(self):
+        sampler = sampling.Sampler(self.manifest, self.tmp.name)
+        batch = sampler.next_Batch()
+        for i, (key, _, _) in enumerate(batch):
+            if i % 3 == 0:
+                sampler.leave_Out(key, 'failed' if i % 2 else 'skipped')
+            else:
+                sampler.add(key, ['B1'])
+        report = sampler.report('precision')
+        # No level is pulled towards zero by the files without elements
+        self.assertEqual(report['levels']['B1']['estimate'], 1.0)
+        self.assertEqual(report['files_sampled'], len(batch))
+        self.assertEqual(report['files_failed'] + report['files_skipped'],
+                         len(range(0, len(batch), 3)))
+        # Left out files are drawn: the next round does not redraw them
+        self.assertEqual(sampler.sampled(), len(batch))
+
+
+class TestSampleRun(unittest.TestCase):
+    """Tests for a --sample run of a directory."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.tmp.name, 'org')
+        make_Manifest(self.project, ('one', 'two'), 5)
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_small_tree_is_exhausted_and_exact(self):
+        pycerfl.analyze('directory', self.project, quiet_mode=True)
+        totals = dict(pycerfl.getjson.dict_summary['Levels'])
+        pycerfl.analyze('directory', self.project, quiet_mode=True,
+                        sample={'precision': 0.02, 'seconds': None, 'seed': 0})
+        with open(pycerfl.RUN_SUMMARY_FILE) as f:
+            sample = json.load(f)['sample']
+        self.assertEqual(sample['stopped'], 'exhausted')
+        self.assertEqual(sample['files_sampled'], 10)
+
+        elements = sum(totals.values())
+        for level, row in sample['levels'].items():
+            self.assertEqual(row['elements'], totals.get(level, 0))
+            self.assertAlmostEqual(row['estimate'],
+                                   totals.get(level, 0) / elements, places=3)
+            self.assertLessEqual(row['low'], row['estimate'])
+            self.assertLessEqual(row['estimate'], row['high'])
+
+    def test_failed_files_are_reported(self):
+        with open(os.path.join(self.project, 'one', 'bad.py'), 'w') as f:
+            f.write("def broken(:\n")
+        pycerfl.analyze('directory', self.project, quiet_mode=True)
+        totals = dict(pycerfl.getjson.dict_summary['Levels'])
+        pycerfl.analyze('directory', self.project, quiet_mode=True,
+                        sample={'precision': 0.02, 'seconds': None, 'seed': 0})
+        with open(pycerfl.RUN_SUMMARY_FILE) as f:
+            sample = json.load(f)['sample']
+        self.assertEqual(sample['files_sampled'], 11)
+        self.assertEqual(sample['files_failed'], 1)
+        for level, row in sample['levels'].items():
+            self.assertEqual(row['elements'], totals.get(level, 0))
+        self.assertIn('1 failed', sampling.show_Estimate(sample))
+
+    def test_time_limit_checked_per_file(self):
+        pycerfl.analyze('directory', self.project, quiet_mode=True,
+                        sample={'seconds': 1e-9, 'seed': 0})
+        with open(pycerfl.RUN_SUMMARY_FILE) as f:
+            sample = json.load(f)['sample']
+        # Over before the first file of the first round
+        self.assertEqual(sample['stopped'], 'time')
+        self.assertEqual(sample['files_sampled'], 0)
+        self.assertEqual(sample['levels'], {})
+
+    def test_arguments(self):
+        args = pycerfl.parse_Arguments(['directory', 'org', '--sample',
+                                        '--precision', '0.05', '--seed', '7'])
+        self.assertTrue(args.sample)
+        self.assertEqual(args.precision, 0.05)
+        self.assertEqual(args.seed, 7)
+        self.assertIsNone(args.sample_seconds)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import os
+import sys
+import json
+import subprocess
+import tempfile
+
+# Add parent directory to path to import modules
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+import levels
+
+#-- Upper bound for 'import pycerfl' in a fresh interpreter, in seconds
+IMPORT_BUDGET = 0.5
+
+
+def run_python(code, cwd):
+    """Run code in a fresh interpreter and return its stdout."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run([sys.executable, '-c', code], cwd=cwd, env=env,
+                          capture_output=True, text=True, check=True).stdout
+
+
+class TestStartup(unittest.TestCase):
+    """Tests for import time and cwd independence."""
+
+    def test_import_time(self):
+        """Importing the analyzer is fast and loads no network modules."""
+        with tempfile.TemporaryDirectory() as cwd:
+            out = run_python(
+                "import time, sys\n"
+                "start = time.perf_counter()\n"
+                "import pycerfl\n"
+                "print(time.perf_counter() - start)\n"
+                "print('requests' in sys.modules)\n"
+                "print('ssl' in sys.modules or 'http.server' in sys.modules)\n"
+                "print(sys.modules['levels'].RULES is not None)\n", cwd)
+            elapsed, network, server, loaded = out.split()
+            self.assertLess(float(elapsed), IMPORT_BUDGET)
+            self.assertEqual(network, 'False')
+            # The daemon and its HTTP modules load only in the serve/client modes
+            self.assertEqual(server, 'False')
+            self.assertEqual(loaded, 'False')
+            # Importing must not write anything in the working directory
+            self.assertEqual(os.listdir(cwd), [])
+
+    def test_analysis_outside_repository(self):
+        """A file is analyzed from a directory without dicc.txt."""
+        with tempfile.TemporaryDirectory() as cwd:
+            with open(os.path.join(cwd, 'sample.py'), 'w') as f:
+                f.write("x = [1, 2, 3]\n")
+            run_python("import pycerfl\n"
+                       "pycerfl.analyze('file', 'sample.py', quiet_mode=True)\n",
+                       cwd)
+            with open(os.path.join(cwd, 'data.json')) as f:
+                data = json.load(f)
+            elements = list(data.values())[0]['sample.py']
+            self.assertEqual(elements[0]['Level'], 'A1')
+
+
+class TestRuleCache(unittest.TestCase):
+    """Tests for the precompiled rule table."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = os.path.join(self.tmp.name, 'configuration.cfg')
+        self.cache = os.path.join(self.tmp.name, 'cache', 'rules.json')
+        with open(self.config, 'w') as f:
+            f.write("[List]\nsimple = A1\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_cache_written_and_used(self):
+        rules = levels.load_Rules(self.config, self.cache)
+        self.assertEqual(rules, {('List', 'simple'): 'A1'})
+        self.assertTrue(os.path.exists(self.cache))
+        self.assertEqual(levels.load_Rules(self.config, self.cache), rules)
+
+    def test_cache_invalidated_by_mtime(self):
+        levels.load_Rules(self.config, self.cache)
+        with open(self.config, 'w') as f:
+            f.write("[List]\nsimple = B2\n")
+        stat = os.stat(self.config)
+        os.utime(self.config, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        rules = levels.load_Rules(self.config, self.cache)
+        self.assertEqual(rules, {('List', 'simple'): 'B2'})
+
+
+if __name__ == '__main__':
+    unittest.main()
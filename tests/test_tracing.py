@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pycerfl
+import tracing
+
+
+class TestTracing(unittest.TestCase):
+    """Tests for the stage spans and the Chrome trace export."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.tmp.name, 'project')
+        os.makedirs(self.project)
+        with open(os.path.join(self.project, 'one.py'), 'w') as f:
+            f.write("x = [1, 2, 3]\nfor i in x:\n    print(i)\n")
+        # Outputs are written to the current directory
+        os.chdir(self.tmp.name)
+        tracing.reset()
+
+    def tearDown(self):
+        tracing.disable()
+        tracing.reset()
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_disabled_records_nothing(self):
+        self.assertIs(tracing.span('file', path='x.py'), tracing.NULL_SPAN)
+        pycerfl.analyze('directory', self.project, quiet_mode=True)
+        self.assertEqual(tracing.spans, [])
+
+    def test_pipeline_stages(self):
+        """Every stage of an analysis is recorded with its attributes."""
+        tracing.enable()
+        pycerfl.analyze('directory', self.project, quiet_mode=True)
+        names = [span[0] for span in tracing.spans]
+        for stage in ('discovery', 'read', 'parse', 'classify', 'file',
+                      'write_outputs', 'aggregate', 'csv_split', 'analysis'):
+            self.assertIn(stage, names)
+        args = {span[0]: span[5] for span in tracing.spans}
+        self.assertEqual(args['discovery']['files'], 1)
+        self.assertTrue(args['parse']['path'].endswith('one.py'))
+        self.assertGreater(args['parse']['size'], 0)
+        self.assertGreater(args['classify']['elements'], 0)
+
+    def test_chrome_trace_export(self):
+        tracing.enable()
+        with tracing.span('outer', path='a.py'):
+            with tracing.span('inner') as inner:
+                inner.set(elements=3)
+        tracing.save_Trace('trace.json')
+        with open('trace.json') as f:
+            events = json.load(f)['traceEvents']
+        complete = {e['name']: e for e in events if e['ph'] == 'X'}
+        self.assertEqual(complete['inner']['args'], {'elements': 3})
+        self.assertEqual(complete['outer']['ts'], 0)
+        self.assertGreaterEqual(complete['outer']['dur'],
+                                complete['inner']['dur'])
+        self.assertTrue(any(e['ph'] == 'M' for e in events))
+
+    def test_argument(self):
+        args = pycerfl.parse_Arguments(['directory', '.', '--trace', 'out.json'])
+        self.assertEqual(args.trace, 'out.json')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+import json
+import os
+import sys
+import random
+import tempfile
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pycerfl
+import getjson
+import dirtree
+from ClassIterTree import FileResult
+
+
+LEVELS = ['A1', 'A2', 'B1', 'B2', 'C1', 'C2']
+
+
+def make_Result(path, elements):
+    """ File result with (class, level) elements. """
+    result = FileResult('repo', path, os.path.basename(path))
+    for i, (clase, level) in enumerate(elements):
+        result.append(clase, clase + '.id', i + 1, i + 1, 0, level)
+    return result
+
+
+def file_Totals(results, prefix):
+    """ Reference answer: level totals of the files below a directory. """
+    totals = {}
+    for result in results:
+        if result.abs_path.startswith(prefix):
+            for level in result.level_Names():
+                totals[level] = totals.get(level, 0) + 1
+    return totals
+
+
+class TestBuildTree(unittest.TestCase):
+    """Tests for the rollups of every directory."""
+
+    def test_every_directory_sums_its_files(self):
+        rng = random.Random(3)
+        results = []
+        for i in range(300):
+            depth = rng.randint(0, 4)
+            dirs = [f'd{rng.randint(0, 3)}' for _ in range(depth)]
+            path = '/'.join(['/root_dir'] + dirs + [f'f{i}.py'])
+            results.append(make_Result(path, [
+                (f'Call {rng.randint(0, 9)}', rng.choice(LEVELS))
+                for _ in range(rng.randint(1, 20))]))
+        tree = dirtree.build_Tree(results, '/root_dir')
+        nodes = tree['nodes']
+        self.assertEqual(nodes[0]['files'], 300)
+        for node in nodes:
+            prefix = '/root_dir/' + ('' if node['path'] == '.'
+                                     else node['path'] + '/')
+            self.assertEqual(node['Levels'], file_Totals(results, prefix))
+            self.assertEqual(dirtree.range_Levels(tree, node['first'],
+                                                  node['last']),
+                             node['Levels'])
+            # Subtrees are contiguous ranges of the files
+            for path, _ in tree['files'][node['first']:node['last']]:
+                self.assertTrue(node['path'] == '.'
+                                or path.startswith(node['path'] + '/'))
+            for child in node['children']:
+                self.assertEqual(nodes[child]['parent'], nodes.index(node))
+        # Class names lose their numbers, as in the other summaries
+        self.assertEqual(set(nodes[0]['Class']), {'Call'})
+        self.assertEqual(sum(nodes[0]['Class'].values()),
+                         sum(nodes[0]['Levels'].values()))
+
+    def test_find_node(self):
+        results = [make_Result('/r/pkg/sub/a.py', [('If', 'A2')]),
+                   make_Result('/r/pkg/b.py', [('With', 'B2')]),
+                   make_Result('/r/top.py', [('Lambda', 'C1')])]
+        tree = dirtree.build_Tree(results, '/r')
+        self.assertEqual(dirtree.find_Node(tree, '.'), 0)
+        sub = tree['nodes'][dirtree.find_Node(tree, 'pkg/sub')]
+        self.assertEqual(sub['Levels'], {'A2': 1})
+        pkg = tree['nodes'][dirtree.find_Node(tree, 'pkg/')]
+        self.assertEqual(pkg['Levels'], {'A2': 1, 'B2': 1})
+        self.assertEqual(pkg['files'], 2)
+        self.assertIsNone(dirtree.find_Node(tree, 'pkg/missing'))
+
+    def test_classes_rolled_up_sparsely(self):
+        # Names without digits, which the summaries strip
+        names = [chr(97 + i // 26) + chr(97 + i % 26) for i in range(50)]
+        results = [make_Result(f'/r/{name}/f.py',
+                               [(f'Private Methods {name}', 'B1')])
+                   for name in names]
+        tree = dirtree.build_Tree(results, '/r')
+        nodes = tree['nodes']
+        self.assertEqual(len(nodes[0]['Class']), 50)
+        for node in nodes[1:]:
+            self.assertEqual(node['Class'],
+                             {f"Private Methods {node['name']}": 1})
+        # Only the pairs that occur: each directory and the root
+        import numpy as np
+        parents = np.array([node['parent'] or 0 for node in nodes])
+        depths = np.array([node['depth'] for node in nodes])
+        element_nodes = np.arange(1, 51)
+        pairs = dirtree.sparse_Rollup(np, element_nodes, np.arange(50),
+                                      parents, depths)
+        self.assertEqual(len(pairs[0]), 100)
+
+    def test_empty_tree(self):
+        tree = dirtree.build_Tree([], '/r')
+        self.assertEqual(len(tree['nodes']), 1)
+        self.assertEqual(tree['nodes'][0]['files'], 0)
+        self.assertEqual(tree['prefix'], [[]])
+
+
+class TestSavedTree(unittest.TestCase):
+    """Tests for the tree written with the results of a run."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.tmp.name, 'project')
+        for relative, code in (('main.py', 'print("hi")\n'),
+                               ('pkg/util.py', 'x = [i for i in range(3)]\n'),
+                               ('pkg/sub/deep.py', 'with open("f") as f:\n'
+                                                   '    pass\n')):
+            path = os.path.join(self.project, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(code)
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_root_matches_the_summary(self):
+        pycerfl.analyze('directory', self.project, quiet_mode=True)
+        with open(os.path.join('DATA_JSON', dirtree.TREE_FILE)) as f:
+            tree = json.load(f)
+        root = tree['nodes'][0]
+        self.assertEqual(tree['root'], self.project)
+        self.assertEqual(root['files'], 3)
+        self.assertEqual(root['Levels'], getjson.dict_summary['Levels'])
+        self.assertEqual(root['Class'], getjson.dict_summary['Class'])
+        self.assertEqual([tree['nodes'][i]['path'] for i in root['children']],
+                         ['pkg'])
+        deep = tree['nodes'][dirtree.find_Node(tree, 'pkg/sub')]
+        self.assertEqual([path for path, _ in
+                          tree['files'][deep['first']:deep['last']]],
+                         ['pkg/sub/deep.py'])
+
+
+if __name__ == '__main__':
+    unittest.main()
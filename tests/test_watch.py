@@ -0,0 +1,160 @@
+import unittest
+import os
+import sys
+import copy
+import csv
+import json
+import tempfile
+import time
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pycerfl
+import getjson
+import watch
+
+
+CODE = "def f(items):\n    return [i * 2 for i in items]\n"
+NEW_CODE = "class A:\n    x = {'a': (1, 2)}\n    y = lambda z: z\n"
+
+
+def summaries():
+    """ Copy of the getjson summaries, comparable regardless of key order. """
+    return copy.deepcopy((getjson.dict_total, getjson.dict_repo,
+                          getjson.dict_summary))
+
+
+class TestAggregates(unittest.TestCase):
+    """Tests for the incremental maintenance of the summaries."""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.tmp.name, 'org')
+        for repo in ('one', 'two'):
+            os.makedirs(os.path.join(self.project, repo))
+            for i in range(3):
+                self.write(os.path.join(repo, f'm{i}.py'), CODE + f'x = {i}\n')
+        os.chdir(self.tmp.name)
+        pycerfl.analyze('directory', self.project, quiet_mode=True)
+        self.aggregates = watch.Aggregates(pycerfl.global_results)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def write(self, relative, code):
+        path = os.path.join(self.project, relative)
+        with open(path, 'w') as f:
+            f.write(code)
+        return path
+
+    def assertMatchesFullRun(self):
+        incremental = summaries()
+        pycerfl.analyze('directory', self.project, quiet_mode=True)
+        self.assertEqual(incremental, summaries())
+
+    def test_modified_file(self):
+        path = self.write('one/m1.py', NEW_CODE)
+        pycerfl.update_Watched({path}, self.aggregates)
+        with open(os.path.join('DATA_JSON', 'one.json')) as f:
+            self.assertEqual(json.load(f)['one']['m1.py'],
+                             getjson.dict_total['one']['m1.py'])
+        self.assertMatchesFullRun()
+
+    def test_created_and_deleted_files(self):
+        created = self.write('two/new.py', NEW_CODE)
+        removed = os.path.join(self.project, 'one', 'm0.py')
+        os.remove(removed)
+        pycerfl.update_Watched({created, removed}, self.aggregates)
+        self.assertIn('new.py', getjson.dict_total['two'])
+        self.assertNotIn('m0.py', getjson.dict_total['one'])
+        self.assertMatchesFullRun()
+
+    def test_deleted_file_keeps_the_csv_of_its_namesake(self):
+        removed = os.path.join(self.project, 'one', 'm0.py')
+        os.remove(removed)
+        pycerfl.update_Watched({removed}, self.aggregates)
+        with open(os.path.join('DATA_CSV', 'm0.csv')) as f:
+            rows = list(csv.reader(f))[1:]
+        self.assertTrue(rows)
+        self.assertEqual({row[1] for row in rows},
+                         {os.path.join(self.project, 'two', 'm0.py')})
+        os.remove(os.path.join(self.project, 'two', 'm0.py'))
+        pycerfl.update_Watched({os.path.join(self.project, 'two', 'm0.py')},
+                               self.aggregates)
+        self.assertFalse(os.path.exists(os.path.join('DATA_CSV', 'm0.csv')))
+
+    def test_new_directory_and_removed_repository(self):
+        os.makedirs(os.path.join(self.project, 'three'))
+        self.write('three/a.py', NEW_CODE)
+        for i in range(3):
+            os.remove(os.path.join(self.project, 'two', f'm{i}.py'))
+        pycerfl.update_Watched({os.path.join(self.project, 'three'),
+                                os.path.join(self.project, 'two')},
+                               self.aggregates)
+        self.assertNotIn('two', getjson.dict_total)
+        self.assertFalse(os.path.exists(os.path.join('DATA_JSON', 'two.json')))
+        self.assertMatchesFullRun()
+
+    def test_syntax_error_removes_the_file(self):
+        path = self.write('one/m2.py', 'def broken(:\n')
+        pycerfl.update_Watched({path}, self.aggregates)
+        self.assertNotIn('m2.py', getjson.dict_total['one'])
+        self.assertEqual(pycerfl.global_errors[-1]['path'], path)
+
+    def test_whole_tree_outputs(self):
+        path = self.write('one/m1.py', NEW_CODE)
+        pycerfl.update_Watched({path}, self.aggregates)
+        self.assertTrue(self.aggregates.dirty)
+        pycerfl.write_Watched(self.aggregates)
+        self.assertFalse(self.aggregates.dirty)
+        with open('data.json') as f:
+            data = json.load(f)
+        self.assertEqual(len(data['one']['m1.py']),
+                         len(self.aggregates.results[path]))
+
+
+class TestWatchers(unittest.TestCase):
+    """Tests for the change notification of watch mode."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        os.makedirs(os.path.join(self.root, 'pkg'))
+        self.path = os.path.join(self.root, 'pkg', 'a.py')
+        with open(self.path, 'w') as f:
+            f.write(CODE)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def check(self, watcher, timeout):
+        try:
+            with open(self.path, 'a') as f:
+                f.write('y = 1\n')
+            deadline = time.monotonic() + timeout
+            paths = set()
+            while self.path not in paths and time.monotonic() < deadline:
+                paths |= watcher.changes(0.2)
+            self.assertIn(self.path, paths)
+        finally:
+            watcher.close()
+
+    def test_polling(self):
+        watcher = watch.make_Watcher(self.root, os.path.isdir, polling=True,
+                                     interval=0.05)
+        self.assertEqual(watcher.kind, 'polling')
+        self.check(watcher, 2)
+
+    def test_inotify(self):
+        try:
+            watcher = watch.InotifyWatcher(self.root, os.path.isdir)
+        except OSError:
+            self.skipTest('inotify is not available')
+        self.check(watcher, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+#-- STAGE TRACING SPANS AND THEIR CHROME TRACE EXPORT
+
+import json
+import os
+import threading
+import time
+
+#-- Spans are only recorded after enable()
+enabled = False
+#-- Objects told when a span starts and ends (span_Start and span_End)
+observers = []
+#-- Spans are created while recording or observed; otherwise NULL_SPAN
+active = False
+#-- Finished spans: (name, start, duration, pid, thread id, attributes)
+spans = []
+#-- Names of the threads that recorded spans
+thread_names = {}
+
+
+class Span():
+    """ A timed stage; attributes can be added while it runs. """
+
+    __slots__ = ('name', 'args', 'start')
+
+    def __init__(self, name, args):
+        """ Class constructor. """
+        self.name = name
+        self.args = args
+        self.start = 0.0
+
+    def set(self, **args):
+        """ Add attributes to the span. """
+        self.args.update(args)
+
+    def __enter__(self):
+        for observer in observers:
+            observer.span_Start(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter() - self.start
+        if enabled:
+            thread = threading.current_thread()
+            thread_names.setdefault(thread.ident, thread.name)
+            spans.append((self.name, self.start, duration, os.getpid(),
+                          thread.ident, self.args))
+        for observer in observers:
+            observer.span_End(self)
+
+
+class NullSpan():
+    """ Span used while tracing is disabled: records nothing. """
+
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+def span(name, **args):
+    """ Context manager timing a stage with the given attributes. """
+    if not active:
+        return NULL_SPAN
+    return Span(name, args)
+
+
+def enable():
+    """ Start recording spans. """
+    global enabled, active
+    enabled = active = True
+
+
+def disable():
+    """ Stop recording spans. """
+    global enabled, active
+    enabled = False
+    active = bool(observers)
+
+
+def observe(observer):
+    """ Register an object told when each span starts and ends. """
+    global active
+    observers.append(observer)
+    active = True
+
+
+def unobserve(observer):
+    """ Remove a registered observer. """
+    global active
+    if observer in observers:
+        observers.remove(observer)
+    active = enabled or bool(observers)
+
+
+def reset():
+    """ Forget the recorded spans. """
+    spans.clear()
+    thread_names.clear()
+
+
+def chrome_Trace():
+    """ Recorded spans in the Chrome trace-event format. """
+    origin = min((start for _, start, _, _, _, _ in spans), default=0.0)
+    trace = []
+    for ident, name in thread_names.items():
+        trace.append({'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(),
+                      'tid': ident, 'args': {'name': name}})
+    for name, start, duration, pid, ident, args in spans:
+        #-- Complete events, timestamps in microseconds
+        trace.append({'name': name, 'cat': 'pycefrl', 'ph': 'X',
+                      'ts': (start - origin) * 1e6, 'dur': duration * 1e6,
+                      'pid': pid, 'tid': ident, 'args': args})
+    return {'traceEvents': trace, 'displayTimeUnit': 'ms'}
+
+
+def save_Trace(path):
+    """ Write the spans to a file that Perfetto or chrome://tracing opens. """
+    with open(path, 'w') as f:
+        json.dump(chrome_Trace(), f)
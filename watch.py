@@ -0,0 +1,275 @@
+#-- WATCH MODE: FILE CHANGE NOTIFICATION AND INCREMENTAL AGGREGATES
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+import getjson
+
+#-- Seconds between two scans of the polling watcher
+POLL_INTERVAL = 1.0
+#-- Events arriving this soon after another one are handled together
+SETTLE_SECONDS = 0.05
+#-- data.csv, data.json and total_data.json cover the whole tree and are
+#-- rewritten at most once per interval; the other outputs on every change
+FULL_WRITE_SECONDS = 5.0
+
+#-- inotify event masks (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF)
+#-- Header of an inotify event: wd, mask, cookie, length of the name
+EVENT = struct.Struct('iIII')
+
+
+class InotifyWatcher():
+    """ Changed paths of a tree, told by the Linux kernel. """
+
+    kind = 'inotify'
+
+    def __init__(self, root, enter):
+        """ Class constructor; OSError where inotify is not available. """
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            self.add_watch = libc.inotify_add_watch
+            self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (AttributeError, OSError, TypeError) as e:
+            raise OSError(f'inotify is not available: {e}')
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.root = root
+        #-- Predicate of the directories worth watching
+        self.enter = enter
+        #-- Watch descriptor -> directory
+        self.watches = {}
+        self.add_Tree(root)
+
+    def add_Tree(self, path):
+        """ Watch a directory and the directories below it. """
+        wd = self.add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            return
+        self.watches[wd] = path
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            return
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False) and self.enter(entry.path):
+                self.add_Tree(entry.path)
+
+    def read_Events(self):
+        """ Paths named by the pending events. """
+        paths = set()
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return paths
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, offset)
+            offset += EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                #-- Events were lost: everything may have changed
+                paths.add(self.root)
+                continue
+            directory = self.watches.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.watches[wd]
+                continue
+            path = os.path.join(directory, name) if name else directory
+            if (mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO)
+                    and self.enter(path)):
+                self.add_Tree(path)
+            paths.add(path)
+        return paths
+
+    def changes(self, timeout):
+        """ Paths changed within the timeout (seconds); may be empty. """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        paths = self.read_Events()
+        #-- An editor saving a file sends several events
+        while select.select([self.fd], [], [], SETTLE_SECONDS)[0]:
+            paths |= self.read_Events()
+        return paths
+
+    def close(self):
+        """ Stop watching. """
+        os.close(self.fd)
+
+
+class PollingWatcher():
+    """ Changed .py files of a tree, found by comparing periodic scans. """
+
+    kind = 'polling'
+
+    def __init__(self, root, enter, interval=POLL_INTERVAL):
+        """ Class constructor. """
+        self.root = root
+        self.enter = enter
+        self.interval = interval
+        self.last_scan = time.monotonic()
+        self.state = self.scan()
+
+    def scan(self):
+        """ Modification time and size of each .py file. """
+        state = {}
+        pending = [self.root]
+        while pending:
+            try:
+                entries = list(os.scandir(pending.pop()))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if self.enter(entry.path):
+                            pending.append(entry.path)
+                    elif entry.name.endswith('.py'):
+                        stat = entry.stat()
+                        state[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue
+        return state
+
+    def changes(self, timeout):
+        """ Paths changed since the last scan, scanning once per interval. """
+        wait = self.last_scan + self.interval - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return set()
+        time.sleep(max(0.0, wait))
+        self.last_scan = time.monotonic()
+        state = self.scan()
+        paths = {path for path in state.keys() | self.state.keys()
+                 if state.get(path) != self.state.get(path)}
+        self.state = state
+        return paths
+
+    def close(self):
+        """ Stop watching. """
+
+
+def make_Watcher(root, enter, polling=False, interval=POLL_INTERVAL):
+    """ inotify watcher of the tree, or the polling one where unavailable. """
+    if not polling:
+        try:
+            return InotifyWatcher(root, enter)
+        except OSError:
+            pass
+    return PollingWatcher(root, enter, interval)
+
+
+def file_Counts(result):
+    """ Level and class counts of a file, as extract_Levels counts them. """
+    counts = {'Levels': {}, 'Class': {}}
+    for level, clase in zip(result.level_Names(), result.classes):
+        clase = getjson.CLASS_NUMBERS.sub("", clase)
+        for type, key in (('Levels', level), ('Class', clase)):
+            if key != "":
+                counts[type][key] = counts[type].get(key, 0) + 1
+    return counts
+
+
+class Aggregates():
+    """ The getjson summaries kept up to date one changed file at a time. """
+
+    def __init__(self, results):
+        """ Class constructor, from the results of a complete run. """
+        #-- Path -> result, and the (repository, file name, counts) it adds
+        self.results = {}
+        self.files = {}
+        #-- (repository, file name) -> paths merged under that entry
+        self.names = {}
+        for result in results:
+            if len(result):
+                self.add(result)
+        #-- The whole-tree outputs are out of date
+        self.dirty = False
+
+    def __contains__(self, path):
+        return path in self.files
+
+    def under(self, directory):
+        """ Known files below a directory. """
+        prefix = directory.rstrip(os.sep) + os.sep
+        return [path for path in self.files if path.startswith(prefix)]
+
+    def add(self, result):
+        """ Register a file result without touching the summaries. """
+        path = result.abs_path
+        self.results[path] = result
+        self.files[path] = (result.repo, result.name, file_Counts(result))
+        self.names.setdefault((result.repo, result.name), set()).add(path)
+
+    def update(self, path, result):
+        """ Replace the counts of a file (None: removed); changed repos. """
+        repos = set()
+        old = self.files.pop(path, None)
+        if old is not None:
+            repo, name, counts = old
+            del self.results[path]
+            self.names[(repo, name)].discard(path)
+            self.apply(repo, name, counts, -1)
+            repos.add(repo)
+        if result is not None and len(result):
+            self.add(result)
+            self.apply(result.repo, result.name, self.files[path][2], 1)
+            repos.add(result.repo)
+        self.dirty = True
+        return repos
+
+    def apply(self, repo, name, counts, sign):
+        """ Add (sign 1) or subtract (sign -1) counts from every summary. """
+        file_values = getjson.dict_total.setdefault(repo, {}).setdefault(
+            name, {})
+        repo_values = getjson.dict_repo.setdefault(repo, {})
+        for type, values in counts.items():
+            if not values:
+                continue
+            for target in (file_values, repo_values, getjson.dict_summary):
+                totals = target.setdefault(type, {})
+                for key, count in values.items():
+                    total = totals.get(key, 0) + sign * count
+                    if total:
+                        totals[key] = total
+                    else:
+                        totals.pop(key, None)
+                if not totals:
+                    del target[type]
+        #-- Entries left without files disappear, as in a complete run
+        if not self.names.get((repo, name)):
+            self.names.pop((repo, name), None)
+            del getjson.dict_total[repo][name]
+            if not getjson.dict_total[repo]:
+                del getjson.dict_total[repo]
+                getjson.dict_repo.pop(repo, None)
+
+    def write(self, repos):
+        """ Rewrite the outputs of the changed repositories and the summary. """
+        for repo in repos:
+            if repo in getjson.dict_total:
+                getjson.write_Repo(repo)
+            else:
+                path = os.path.join(getjson.data_Folder(),
+                                    os.path.basename(repo) + '.json')
+                if os.path.exists(path):
+                    os.remove(path)
+        getjson.write_Summary()